@@ -0,0 +1,1253 @@
+"""
+선석 배정 최적화 벤치마크 스크립트
+
+사용법:
+    python benchmark.py build            # 모델 생성 시간 비교 (N = 10 ... 150)
+    python benchmark.py formulations     # 정식화/쌍 전처리별 목적함수 일치 검증 (보관된 일일 인스턴스)
+    python benchmark.py warmstart        # 휴리스틱 MIP start 유무에 따른 첫 incumbent / 최적해 도달 시간
+    python benchmark.py backends         # 설치된 솔버 백엔드별 스케줄 검증 및 목적함수 비교
+    python benchmark.py decompose        # 연결 요소 분해 vs 단일 모델 (긴 기간 가상 인스턴스)
+    python benchmark.py insertion        # ETD 계산기 증분 삽입 vs 전체 재최적화
+    python benchmark.py cache            # 솔루션 캐시 적중 / 비슷한 캐시 해로 만든 초기해
+    python benchmark.py rolling          # rolling horizon vs 단일 모델 (2025년 2월)
+    python benchmark.py load             # /schedule/prepare 동시 요청 처리량 (가짜 크롤링 + 실제 예측)
+    python benchmark.py crawl            # 비동기 크롤러 hedged request / 재시도 / circuit breaker (가짜 HPNT 서버)
+    python benchmark.py crawlcache       # 크롤링 캐시 적중 (같은 기간 / 하위 기간 / 디스크 캐시) 지연 시간
+    python benchmark.py parse            # HPNT 페이지 파싱: BeautifulSoup 3회 vs 단일 스캔 (보관된 크롤링 결과)
+    python benchmark.py model            # 요청마다 모델 unpickle vs 상주 모델 레지스트리, hot reload 확인
+    python benchmark.py vessels          # 선박 제원 조회: 요청마다 ship_info.csv 병합 vs 상주 색인
+    python benchmark.py batch            # /predict/batch 처리량 (행/초): 일괄 예측 vs 선박별 예측
+    python benchmark.py memo             # 호출일별 시나리오 재실행: 피처 단위 예측 캐시의 모델 호출 행 수, 시간
+    python benchmark.py trees            # NumPy 트리 앙상블 vs LightGBM: 예측값 일치 (bit 단위), 지연 시간, 시작 시간
+    python benchmark.py localsearch      # simulated annealing vs MILP 해 품질 및 실행 시간
+"""
+import argparse
+import glob
+import json
+import os
+import re
+import time
+
+import gurobipy as gp
+from gurobipy import GRB
+import numpy as np
+import pandas as pd
+
+from heuristics import first_fit_schedule, insert_ship, simulated_annealing, waiting_upper_bound
+from optimization import build_milp_model, set_mip_start
+from schedule import extract_model_inputs, validate_schedule
+from solvers import available_backends, solve_inputs, solve_schedule
+from solution_cache import SolutionCache
+from decomposition import interaction_components, solve_decomposed
+from rolling_horizon import solve_rolling_horizon
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+ARCHIVE_GLOB = os.path.join(BACKEND_DIR, '..', 'submission', 'results_*', 'work_time_predictions_*.csv')
+
+
+def make_synthetic_df(n_ships, days=5, seed=0):
+    """HPNT 일일 데이터와 비슷한 분포의 가상 선박 데이터프레임 생성"""
+    rng = np.random.default_rng(seed)
+    arrivals = pd.Timestamp('2025-02-01') + pd.to_timedelta(np.sort(rng.uniform(0, days * 24 * 60, n_ships)), unit='min')
+    return pd.DataFrame({
+        '선사': rng.choice(['HMM', 'MSC', 'ONE', 'CMA', 'YML'], n_ships),
+        '선명': [f"SHIP {i:03d}" for i in range(n_ships)],
+        '모선항차': [f"V{i:04d}" for i in range(n_ships)],
+        '접안예정일시': arrivals,
+        'predicted_work_time': rng.uniform(300, 1500, n_ships),
+        'LOA': rng.uniform(150, 400, n_ships).round(),
+    })
+
+
+def load_february_2025():
+    """
+    submission/final_report/scenario_fixed_target 의 2025년 2월 시나리오 결과에서 한 달 전체 인스턴스 구성.
+
+    호출일마다 같은 항차가 반복되므로 가장 늦은 호출일의 예측 작업 시간을 사용합니다.
+    """
+    paths = glob.glob(os.path.join(os.path.dirname(__file__), '..', 'submission', 'final_report',
+                                   'scenario_fixed_target', '*', '*.csv'))
+    df = pd.concat([pd.read_csv(path) for path in paths], ignore_index=True)
+    df = df.sort_values('호출일').drop_duplicates(subset=['선사', '선명', '모선항차', '선사항차'], keep='last')
+    df['접안예정일시'] = pd.to_datetime(df['접안예정일시'])
+    df = df.rename(columns={'Service_min': 'predicted_work_time', 'Length_m': 'LOA'})
+    return df.sort_values('접안예정일시').reset_index(drop=True)
+
+
+def load_archived_instances():
+    """submission/results_*/work_time_predictions_*.csv 에 저장된 일일 인스턴스 로드"""
+    instances = {}
+    for path in sorted(glob.glob(ARCHIVE_GLOB)):
+        df = pd.read_csv(path)
+        df['접안예정일시'] = pd.to_datetime(df['접안예정일시'])
+        instances[os.path.basename(path)] = df
+    return instances
+
+
+def build_legacy_model(inputs):
+    """이전 버전의 쌍별 addConstr 루프 모델 생성 (비교 기준)"""
+    s, a, l = inputs['s'].tolist(), inputs['a'].tolist(), inputs['l'].tolist()
+    N, L, buffer_minutes = inputs['N'], inputs['L'], inputs['buffer']
+
+    model = gp.Model("BAIPOT")
+    t = model.addVars(N, vtype=GRB.CONTINUOUS, lb=0, name="start_time")
+    p = model.addVars(N, vtype=GRB.CONTINUOUS, lb=0, ub=L, name="position")
+    w = model.addVars(N, vtype=GRB.CONTINUOUS, lb=0, name="waiting_time")
+    x = model.addVars(N, N, vtype=GRB.BINARY, name="left_of")
+    y = model.addVars(N, N, vtype=GRB.BINARY, name="before")
+
+    model.setObjective(gp.quicksum(w[i] for i in range(N)), GRB.MINIMIZE)
+    model.addConstrs((w[i] == t[i] - a[i] for i in range(N)), name="waiting_time")
+    model.addConstrs((t[i] >= a[i] for i in range(N)), name="arrival_constraints")
+    model.addConstrs((p[i] + l[i] <= L for i in range(N)), name="berth_length_constraints")
+
+    M_time = sum(s) + max(a)
+    M_space = 2 * L
+    for i in range(N):
+        for j in range(N):
+            if i != j:
+                model.addConstr(p[i] + l[i] <= p[j] + M_space * (1 - x[i, j]), name=f"spatial_left_{i}_{j}")
+                model.addConstr(p[j] + l[j] <= p[i] + M_space * (1 - x[j, i]), name=f"spatial_right_{i}_{j}")
+                model.addConstr(t[i] + s[i] + buffer_minutes <= t[j] + M_time * (1 - y[i, j]), name=f"temporal_before_{i}_{j}")
+                model.addConstr(t[j] + s[j] + buffer_minutes <= t[i] + M_time * (1 - y[j, i]), name=f"temporal_after_{i}_{j}")
+    model.addConstrs((x[i, j] + x[j, i] + y[i, j] + y[j, i] >= 1 for i in range(N) for j in range(i + 1, N)), name="separation_required")
+    return model
+
+
+def _timed_build(build_fn):
+    start = time.perf_counter()
+    model = build_fn()
+    model.update()
+    elapsed = time.perf_counter() - start
+    size = (model.NumVars, model.NumConstrs)
+    model.dispose()
+    return elapsed, size
+
+
+def bench_build(sizes):
+    """모델 생성(update 포함) 시간 측정: 레거시 루프 vs 행렬 API (이름 사용/미사용)"""
+    gp.Model().dispose()  # 라이선스/환경 초기화 비용을 측정에서 제외
+    rows = []
+    for n in sizes:
+        inputs = extract_model_inputs(make_synthetic_df(n))
+        legacy_s, legacy_size = _timed_build(lambda: build_legacy_model(inputs))
+        named_s, _ = _timed_build(lambda: build_milp_model(inputs, constraint_names=True)[0])
+        matrix_s, matrix_size = _timed_build(lambda: build_milp_model(inputs)[0])
+        rows.append({
+            'N': n,
+            'legacy_s': legacy_s,
+            'matrix_named_s': named_s,
+            'matrix_s': matrix_s,
+            'speedup': legacy_s / matrix_s,
+            'legacy_vars/constrs': f"{legacy_size[0]}/{legacy_size[1]}",
+            'matrix_vars/constrs': f"{matrix_size[0]}/{matrix_size[1]}",
+        })
+        print(f"N={n:4d} legacy={legacy_s:8.3f}s matrix(named)={named_s:7.3f}s matrix={matrix_s:7.3f}s")
+    return pd.DataFrame(rows)
+
+
+def _solve_objective(model):
+    model.Params.OutputFlag = 0
+    model.optimize()
+    if model.status != GRB.OPTIMAL:
+        return None
+    return model.ObjVal
+
+
+FORMULATION_CONFIGS = [
+    ('full', False),
+    ('full', True),
+    ('compact', False),
+    ('compact', True),
+]
+
+
+def verify_formulations(rtol=1e-6):
+    """
+    보관된 일일 인스턴스에서 정식화(full / compact) 및 쌍 전처리 사용 여부에 관계없이
+    최적 목적함수 값이 같은지 검증합니다. 기준은 전처리 없는 full 정식화입니다.
+
+    Raises:
+        AssertionError: 최적 목적함수 값이 기준과 다른 경우.
+    """
+    rows = []
+    for name, df in load_archived_instances().items():
+        inputs = extract_model_inputs(df)
+        row = {'instance': name, 'N': inputs['N']}
+        for formulation, preprocess in FORMULATION_CONFIGS:
+            label = f"{formulation}{'+pre' if preprocess else ''}"
+            model, variables = build_milp_model(inputs, formulation=formulation, preprocess=preprocess)
+            model.update()
+            stats = variables['stats']
+            row[f'{label}_bin'] = stats['binaries_total'] - stats['binaries_eliminated']
+            start = time.perf_counter()
+            try:
+                row[f'{label}_obj'] = _solve_objective(model)
+            except gp.GurobiError as e:
+                # 크기 제한 라이선스에서는 큰 full 모델을 풀 수 없음
+                print(f"{name} ({label}) skipped: {e}")
+                row[f'{label}_obj'] = None
+            row[f'{label}_s'] = time.perf_counter() - start
+            model.dispose()
+
+        reference = row['full_obj']
+        for formulation, preprocess in FORMULATION_CONFIGS[1:]:
+            label = f"{formulation}{'+pre' if preprocess else ''}"
+            if reference is not None and row[f'{label}_obj'] is not None:
+                assert np.isclose(reference, row[f'{label}_obj'], rtol=rtol, atol=1e-4), \
+                    f"{name}: full={reference} {label}={row[f'{label}_obj']}"
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def _solve_with_incumbent_trace(model, time_limit):
+    """최적화하면서 첫 incumbent 발견 시각을 기록"""
+    trace = {}
+
+    def callback(model, where):
+        if where == GRB.Callback.MIPSOL and 'first_incumbent_s' not in trace:
+            trace['first_incumbent_s'] = model.cbGet(GRB.Callback.RUNTIME)
+            trace['first_incumbent_obj'] = model.cbGet(GRB.Callback.MIPSOL_OBJ)
+
+    model.Params.OutputFlag = 0
+    model.Params.TimeLimit = time_limit
+    model.optimize(callback)
+    trace['optimal_s'] = model.Runtime if model.status == GRB.OPTIMAL else None
+    trace['obj'] = model.ObjVal if model.SolCount else None
+    return trace
+
+
+def bench_warm_start(time_limit=120):
+    """보관된 일일 인스턴스에서 휴리스틱 MIP start 유무에 따른 풀이 시간 비교"""
+    rows = []
+    for name, df in load_archived_instances().items():
+        inputs = extract_model_inputs(df)
+        heuristic_start = time.perf_counter()
+        initial = first_fit_schedule(inputs['a'], inputs['s'], inputs['l'], inputs['fixed'], inputs['L'], inputs['buffer'])
+        heuristic_ms = (time.perf_counter() - heuristic_start) * 1000
+        upper_bound = waiting_upper_bound(inputs, initial)
+
+        row = {'instance': name, 'N': inputs['N'], 'heuristic_ms': heuristic_ms,
+               'heuristic_obj': float((initial[0] - inputs['a']).sum())}
+        for label, warm in (('cold', False), ('warm', True)):
+            model, variables = build_milp_model(inputs, upper_bound=upper_bound)
+            if warm:
+                set_mip_start(variables, inputs, *initial)
+            trace = _solve_with_incumbent_trace(model, time_limit)
+            model.dispose()
+            for key, value in trace.items():
+                row[f'{label}_{key}'] = value
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def bench_local_search(time_limit=10, milp_time_limit=120, seeds=(0, 1, 2)):
+    """보관된 일일 인스턴스에서 simulated annealing과 MILP의 총 대기 시간 / 실행 시간 비교"""
+    rows = []
+    for name, df in load_archived_instances().items():
+        inputs = extract_model_inputs(df)
+        args = (inputs['a'], inputs['s'], inputs['l'], inputs['fixed'], inputs['L'], inputs['buffer'])
+        row = {'instance': name, 'N': inputs['N']}
+
+        results = [simulated_annealing(*args, time_limit=time_limit, seed=seed) for seed in seeds]
+        for result in results:
+            violations = validate_schedule(inputs, result['start'], result['position'])
+            assert not violations, f"{name}: {violations}"
+        row['sa_best'] = min(r['objective'] for r in results)
+        row['sa_mean'] = np.mean([r['objective'] for r in results])
+        row['sa_s'] = np.mean([r['runtime'] for r in results])
+
+        model, _ = build_milp_model(inputs)
+        model.Params.OutputFlag = 0
+        model.Params.TimeLimit = milp_time_limit
+        model.optimize()
+        row['milp_obj'] = model.ObjVal if model.SolCount else None
+        row['milp_gap'] = model.MIPGap if model.SolCount else None
+        row['milp_s'] = model.Runtime
+        model.dispose()
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def verify_backends(time_limit=30, synthetic_sizes=(12, 20), backends=None):
+    """
+    모든 솔버 백엔드가 같은 입력에 대해 유효한 스케줄을 반환하는지 확인합니다.
+
+    보관된 일일 인스턴스와 합성 인스턴스 (첫 선박을 고정한 경우 포함)를 각 백엔드로 풀고,
+    반환된 스케줄의 제약 위반 여부와 보고된 목적함수 값이 스케줄의 총 대기 시간과 같은지 검사합니다.
+    """
+    import threading
+
+    instances = dict(load_archived_instances())
+    for n in synthetic_sizes:
+        instances[f"synthetic_{n}"] = make_synthetic_df(n)
+
+    rows = []
+    for name, df in instances.items():
+        first_key = extract_model_inputs(df)['merge_keys'][0]
+        for fixed_keys in (None, [first_key]):
+            inputs = extract_model_inputs(df, fixed_keys)
+            row = {'instance': name, 'N': inputs['N'], 'fixed': int(inputs['fixed'].sum())}
+            for backend in backends or available_backends():
+                result = solve_schedule(df, threading.Event(), fixed_keys, backend=backend, time_limit=time_limit)
+                assert result is not None, f"{name} ({backend}): no schedule"
+                start = result['Start_h'].to_numpy() * 60
+                violations = validate_schedule(inputs, start, result['Position_m'].to_numpy())
+                assert not violations, f"{name} ({backend}): {violations}"
+                info = result.attrs['solve_info']
+                waiting = float((start - inputs['a']).sum())
+                assert abs(info['objective'] - waiting) <= 1e-3 * max(1.0, waiting), f"{name} ({backend}): objective mismatch"
+                row[f"{backend}_obj"] = info['objective']
+                row[f"{backend}_status"] = info['status']
+                row[f"{backend}_s"] = info['runtime']
+            rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def bench_decomposition(sizes, ships_per_day=1.5, backend='cpsat', time_limit=60):
+    """
+    긴 기간 합성 인스턴스에서 단일 모델과 연결 요소 분해 풀이의 실행 시간 / 목적함수 비교.
+
+    선박 수에 비례해 기간을 늘리므로 (하루 ships_per_day척) 분해하면 요소 크기는 거의 일정하고
+    실행 시간은 선박 수에 대략 선형으로 늘어납니다.
+    """
+    import threading
+
+    rows = []
+    for n in sizes:
+        df = make_synthetic_df(n, days=n / ships_per_day)
+        inputs = extract_model_inputs(df)
+        components = interaction_components(inputs)
+        row = {'N': n, 'components': len(components), 'largest': max(len(c) for c in components)}
+
+        for name, solve in (('mono', solve_schedule), ('decomp', solve_decomposed)):
+            begin = time.time()
+            result = solve(df, threading.Event(), backend=backend, time_limit=time_limit)
+            row[f"{name}_s"] = time.time() - begin
+            if result is None:
+                row[f"{name}_obj"] = None
+                continue
+            start = result['Start_h'].to_numpy() * 60
+            violations = validate_schedule(inputs, start, result['Position_m'].to_numpy())
+            assert not violations, f"N={n} ({name}): {violations}"
+            row[f"{name}_obj"] = result.attrs['solve_info']['objective']
+            row[f"{name}_status"] = result.attrs['solve_info']['status']
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def bench_insertion(backend=None, time_limit=30, ships_per_instance=3, seed=0):
+    """
+    ETD 계산기의 증분 배정 검증: 보관된 인스턴스에서 선박 한 척을 빼고 최적화한 기본 스케줄에
+    그 선박을 `insert_ship()`으로 넣은 결과와, 전체를 다시 최적화한 결과의 ETD / 실행 시간 비교.
+    """
+    import threading
+
+    rng = np.random.default_rng(seed)
+    rows = []
+    for name, df in load_archived_instances().items():
+        if len(df) < 2:
+            continue
+        for k in rng.choice(len(df), size=min(ships_per_instance, len(df)), replace=False):
+            base_df = df.drop(index=df.index[k]).reset_index(drop=True)
+            combined_df = pd.concat([base_df, df.iloc[[k]]], ignore_index=True)
+            base = solve_schedule(base_df, threading.Event(), backend=backend, time_limit=time_limit)
+            inputs = extract_model_inputs(combined_df)
+            offset = (extract_model_inputs(base_df)['start_time_ref'] - inputs['start_time_ref']).total_seconds() / 60
+            start, position = base['Start_h'].to_numpy() * 60 + offset, base['Position_m'].to_numpy()
+
+            begin = time.perf_counter()
+            t, x = insert_ship(start, position, inputs['s'][:-1], inputs['l'][:-1],
+                               inputs['a'][-1], inputs['s'][-1], inputs['l'][-1], inputs['L'], inputs['buffer'])
+            insert_ms = (time.perf_counter() - begin) * 1000
+            violations = validate_schedule(inputs, np.append(start, t), np.append(position, x))
+            assert not violations, f"{name}: {violations}"
+
+            begin = time.time()
+            full = solve_schedule(combined_df, threading.Event(), backend=backend, time_limit=time_limit)
+            full_s = time.time() - begin
+            rows.append({
+                'instance': name, 'N': inputs['N'], 'ship': k,
+                'insert_etd_h': (t + inputs['s'][-1]) / 60, 'insert_ms': insert_ms,
+                'full_etd_h': full['Completion_h'].iloc[-1], 'full_s': full_s,
+                'insert_total_wait_h': (np.append(start, t) - inputs['a']).sum() / 60,
+                'full_total_wait_h': full.attrs['solve_info']['objective'] / 60,
+            })
+    return pd.DataFrame(rows)
+
+
+def bench_solution_cache(backend=None, time_limit=60, min_ships=10):
+    """
+    솔루션 캐시 효과: 같은 입력 재요청 (캐시 적중)과, 한 척을 뺀 입력을 캐시 없이 푼 경우 대비
+    가장 비슷한 캐시 해로 초기해를 만든 경우의 최적해 도달 시간.
+    """
+    import threading
+
+    rows = []
+    for name, df in load_archived_instances().items():
+        if len(df) < min_ships:
+            continue
+        inputs = extract_model_inputs(df)
+        changed = extract_model_inputs(df.drop(index=df.index[len(df) // 2]).reset_index(drop=True))
+        cache = SolutionCache(directory=None)
+
+        def _timed(instance, use_cache):
+            begin = time.time()
+            solution, info = solve_inputs(instance, threading.Event(), backend, time_limit, cache=cache if use_cache else None)
+            return time.time() - begin, info
+
+        cold_s, info = _timed(inputs, True)
+        hit_s, hit_info = _timed(inputs, True)
+        assert hit_info['cached'] and abs(hit_info['objective'] - info['objective']) < 1e-6
+        changed_cold_s, cold_info = _timed(changed, False)
+        changed_warm_s, warm_info = _timed(changed, True)
+        rows.append({
+            'instance': name, 'N': inputs['N'], 'cold_s': cold_s, 'hit_ms': hit_s * 1000,
+            'changed_cold_s': changed_cold_s, 'changed_cold_obj': cold_info['objective'],
+            'changed_warm_s': changed_warm_s, 'changed_warm_obj': warm_info['objective'],
+        })
+    return pd.DataFrame(rows)
+
+
+ROLLING_CONFIGS = [(48, 12), (72, 24), (120, 24), (168, 48)]  # (slice_hours, overlap_hours)
+
+
+def bench_rolling_horizon(backend=None, time_limit=300, configs=ROLLING_CONFIGS, compress=(1, 1.5, 2)):
+    """
+    2025년 2월 한 달 데이터에서 단일 모델 대비 rolling horizon의 실행 시간과 목적함수 차이.
+
+    실제 2월 데이터는 대기 시간이 거의 없으므로, 입항 시각 간격을 compress배로 줄여 혼잡한
+    경우도 함께 비교합니다.
+    """
+    import threading
+
+    february = load_february_2025()
+    rows = []
+    for factor in compress:
+        df = february.copy()
+        t0 = df['접안예정일시'].min()
+        df['접안예정일시'] = t0 + (df['접안예정일시'] - t0) / factor
+        inputs = extract_model_inputs(df)
+
+        def _run(name, solve, **kwargs):
+            begin = time.time()
+            result = solve(df, threading.Event(), backend=backend, time_limit=time_limit, **kwargs)
+            runtime = time.time() - begin
+            assert result is not None, f"{name}: no schedule"
+            start = result['Start_h'].to_numpy() * 60
+            violations = validate_schedule(inputs, start, result['Position_m'].to_numpy())
+            assert not violations, f"{name}: {violations}"
+            info = result.attrs['solve_info']
+            return {'compress': factor, 'config': name, 'status': info['status'], 'objective': info['objective'],
+                    'runtime_s': runtime}
+
+        case = [_run('monolithic', solve_schedule)]
+        for slice_hours, overlap_hours in configs:
+            case.append(_run(f"rolling {slice_hours}h/{overlap_hours}h", solve_rolling_horizon,
+                             slice_hours=slice_hours, overlap_hours=overlap_hours))
+        reference = case[0]['objective']
+        for row in case:
+            row['gap_pct'] = (row['objective'] - reference) / max(reference, 1e-9) * 100
+        rows.extend(case)
+
+    print(f"February 2025: {len(february)} ships, {february['접안예정일시'].min()} ~ {february['접안예정일시'].max()}")
+    return pd.DataFrame(rows)
+
+
+def _crawled_records(df):
+    """보관된 예측 결과를 크롤러 (`crawling.PortScheduleCrawler`) 출력 형식의 레코드로 되돌립니다."""
+    columns = ['선석', '선사', '모선항차', '선사항차', '선명', '항로', '반입마감시한', '접안예정일시', '출항예정일시',
+               '양하', '적하', 'Shift', 'AMP', '상태']
+    crawled = df.rename(columns={'shift': 'Shift'}).copy()
+    crawled['접안예정일시'] = crawled['접안예정일시'].dt.strftime('%Y-%m-%d %H:%M')
+    return crawled[columns].fillna('').astype(str).to_dict('records')
+
+
+def bench_api_load(concurrency=(1, 2, 4, 8), n_requests=8, crawl_latency=0.5):
+    """
+    /schedule/prepare 동시 요청 부하 테스트.
+
+    HPNT 크롤링은 crawl_latency초 뒤 보관된 일일 인스턴스를 반환하는 가짜 함수로 대체하고, 예측은
+    실제 LightGBM 모델을 사용합니다. 요청마다 기간을 달리해 single-flight 병합 없이 n_requests개를
+    동시 concurrency개씩 보내고, 그동안 /ships 응답 시간을 재서 이벤트 루프가 막히는지 확인합니다.
+    크롤링과 예측을 이벤트 루프에서 직접 실행하던 이전 방식 ('event loop')과 비교합니다.
+    """
+    import asyncio
+    from datetime import date, timedelta
+
+    import httpx
+
+    import main as api
+    from prediction import predict_work_time
+
+    records = _crawled_records(next(iter(load_archived_instances().values())))
+
+    async def fake_fetch(start_date, end_date):
+        await asyncio.sleep(crawl_latency)
+        return {'schedule_data': records}
+
+    async def blocking_crawl_and_predict(start_date, end_date):
+        time.sleep(crawl_latency)
+        return predict_work_time(pd.DataFrame(records))
+
+    async def _load(level, offset):
+        transport = httpx.ASGITransport(app=api.app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://baipot') as client:
+            semaphore = asyncio.Semaphore(level)
+            probes, done = [], asyncio.Event()
+
+            async def prepare(k):
+                async with semaphore:
+                    day = date(2025, 1, 1) + timedelta(days=offset + k)
+                    response = await client.post('/schedule/prepare', json={'start_date': str(day), 'end_date': str(day)})
+                    assert response.status_code == 200, response.text
+
+            async def probe():
+                while not done.is_set():
+                    begin = time.perf_counter()
+                    await client.get('/')
+                    probes.append(time.perf_counter() - begin)
+                    await asyncio.sleep(0.05)
+
+            begin = time.perf_counter()
+            prober = asyncio.create_task(probe())
+            await asyncio.gather(*(prepare(k) for k in range(n_requests)))
+            elapsed = time.perf_counter() - begin
+            done.set()
+            await prober
+            return elapsed, probes
+
+    original_fetch, original_prepare = api.fetch_work_plan_data, api._crawl_and_predict
+    api.fetch_work_plan_data = fake_fetch
+    rows = []
+    try:
+        offset = 0
+        for mode in ('event loop', 'offloaded'):
+            api._crawl_and_predict = blocking_crawl_and_predict if mode == 'event loop' else original_prepare
+            for level in concurrency:
+                offset += n_requests
+                elapsed, probes = asyncio.run(_load(level, offset))
+                rows.append({'mode': mode, 'concurrency': level, 'requests': n_requests, 'total_s': elapsed,
+                             'throughput_rps': n_requests / elapsed, 'probe_p50_ms': np.median(probes) * 1000,
+                             'probe_max_ms': np.max(probes) * 1000})
+    finally:
+        api.fetch_work_plan_data, api._crawl_and_predict = original_fetch, original_prepare
+    return pd.DataFrame(rows)
+
+
+def bench_batch_predict(sizes=(10, 100, 1000, 10000, 100000), sample=100):
+    """
+    /predict/batch 처리량.
+
+    보관된 일일 인스턴스 중 ship_info.csv에 제원이 있는 선박들로 (선박 x ETA 5개 x shift 2개 x 적하 물량)
+    grid를 만들어 행 수별로 첫 응답 chunk까지의 시간과 전체 시간 (행/초)을 재고, 처음 sample행을
+    `/schedule/calculate-etd`처럼 선박마다 `predict_work_time()`을 호출하는 방식과 비교합니다 (같은 예측값인지 확인).
+    """
+    import asyncio
+
+    import httpx
+
+    import main as api
+    from prediction import predict_work_time
+    from vessel_registry import VESSEL_REGISTRY
+
+    records = [record for df in load_archived_instances().values() for record in _crawled_records(df)]
+    ships = {(record['선사'], record['선명']) for record in records if VESSEL_REGISTRY.lookup(record['선사'], record['선명'])}
+    ships = [{'ship_name': name, 'shipping_company': company} for company, name in sorted(ships)[:20]]
+    etas = [str(pd.Timestamp('2025-11-03 02:00') + pd.Timedelta(hours=13 * k)) for k in range(5)]
+
+    async def _stream(body):
+        transport = httpx.ASGITransport(app=api.app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://baipot', timeout=None) as client:
+            begin = time.perf_counter()
+            first_chunk, lines = None, []
+            async with client.stream('POST', '/predict/batch', json=body) as response:
+                assert response.status_code == 200, await response.aread()
+                async for line in response.aiter_lines():
+                    if first_chunk is None:
+                        first_chunk = time.perf_counter() - begin
+                    if line:
+                        lines.append(line)
+            return first_chunk, time.perf_counter() - begin, [json.loads(line) for line in lines]
+
+    rows = []
+    for size in sizes:
+        size_ships = ships[:max(1, min(len(ships), size // (len(etas) * 2)))]
+        n_loads = max(1, size // (len(size_ships) * len(etas) * 2))
+        grid = {'ships': size_ships, 'etas': etas, 'cargo_loads': [int(v) for v in np.linspace(0, 3000, n_loads)],
+                'cargo_unloads': [800], 'shifts': [0, 1]}
+        first_chunk, elapsed, predicted = asyncio.run(_stream({'grid': grid}))
+
+        # 선박마다 한 번씩 예측 (처음 sample행)
+        begin = time.perf_counter()
+        single = []
+        for row in predicted[:sample]:
+            crawled = pd.DataFrame([{'선명': row['ship_name'], '선사': row['shipping_company'],
+                                     '접안예정일시': pd.Timestamp(row['eta']), '양하': row['cargo_unload'],
+                                     '적하': row['cargo_load'], 'Shift': row['shift']}])
+            single.append(predict_work_time(crawled)['predicted_work_time'].iloc[0])
+        per_row_s = (time.perf_counter() - begin) / len(single)
+        same = np.allclose(single, [row['predicted_work_time'] for row in predicted[:sample]], rtol=1e-12)
+        rows.append({'rows': len(predicted), 'first_chunk_ms': first_chunk * 1000, 'total_s': elapsed,
+                     'batch_rows_per_s': len(predicted) / elapsed, 'per_ship_rows_per_s': 1 / per_row_s,
+                     'speedup': per_row_s * len(predicted) / elapsed, 'same_as_per_ship': same})
+    return pd.DataFrame(rows)
+
+
+def _scenario_calls():
+    """
+    submission/final_report/scenario_fixed_target 의 시나리오를 실행 순서대로 재구성한 예측 호출 목록.
+
+    파일 (목표일, 기간)마다 호출일별로 그날 크롤링된 선박 (크롤링 열만)이 하나의 `predict_work_time()`
+    호출입니다.
+    """
+    crawl_columns = ['선석', '선사', '선사항차', '모선항차', '선명', '항로', '반입마감시한', '접안예정일시',
+                     '출항예정일시', '양하', '적하', 'Shift', 'AMP', '상태']
+    paths = sorted(glob.glob(os.path.join(BACKEND_DIR, '..', 'submission', 'final_report', 'scenario_fixed_target',
+                                          '*', '*.csv')))
+    calls = []
+    for path in paths:
+        df = pd.read_csv(path)
+        for _, crawled in df.groupby('호출일', sort=True):
+            calls.append(crawled[crawl_columns].reset_index(drop=True))
+    return calls
+
+
+def bench_prediction_cache():
+    """
+    피처 단위 예측 캐시 (`prediction_cache.PredictionCache`).
+
+    시나리오 (목표일 x 기간 x 호출일)의 예측 호출을 순서대로 캐시 없이 / 빈 캐시로 / 파일에서 불러온 캐시로
+    (다음 실행) 실행해 모델로 예측한 행 수, 전체 시간, 예측값이 캐시 없이 예측한 값과 같은지 비교합니다.
+    """
+    import tempfile
+
+    from prediction import predict_work_time
+    from prediction_cache import PredictionCache
+
+    calls = _scenario_calls()
+    reference = [predict_work_time(crawled.copy(), cache=None)['predicted_work_time'].to_numpy() for crawled in calls]
+
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'prediction_cache.json')
+        caches = [('no cache', lambda: None), ('first run', lambda: PredictionCache(path=path)),
+                  ('next run (loaded from file)', lambda: PredictionCache(path=path))]
+        for name, make_cache in caches:
+            cache = make_cache()
+            loaded = 0 if cache is None else len(cache)
+            begin = time.perf_counter()
+            predicted = [predict_work_time(crawled.copy(), cache=cache)['predicted_work_time'].to_numpy()
+                         for crawled in calls]
+            elapsed = time.perf_counter() - begin
+            if cache is not None:
+                cache.save()
+            total = sum(len(crawled) for crawled in calls)
+            rows.append({'run': name, 'calls': len(calls), 'rows': total, 'loaded_entries': loaded,
+                         'model_rows': total if cache is None else cache.stats['misses'], 'total_s': elapsed,
+                         'identical': all(np.array_equal(a, b) for a, b in zip(predicted, reference))})
+        file_kb = os.path.getsize(path) / 1024
+    print(f"cache file: {file_kb:.0f} KB")
+    return pd.DataFrame(rows)
+
+
+def _hpnt_page(records, start_date, end_date, csrf_token='bench-token'):
+    """크롤러가 파싱하는 HPNT 선석 배정 현황 페이지 구조 (기간 입력, 검색 폼, CSRF 스크립트, tblType_08 표)를 흉내 낸 HTML"""
+    columns = ['선석', '선사', '모선항차', '선사항차', '선명', '항로', '반입마감시한', '접안예정일시', '출항예정일시',
+               '양하', '적하', 'Shift', 'AMP', '상태']
+    header = ''.join(f'<th>{column}</th>' for column in columns)
+    rows = ''.join('<tr>' + ''.join(f'<td>\n  {record[column]}\n</td>' for column in columns) + '</tr>\n'
+                   for record in records)
+    return (f'<html><head><script>var param = {{ name: "CSRF_TOKEN", value: "{csrf_token}" }};</script></head><body>'
+            f'<form name="submitForm" method="post"><input type="text" name="strdStDate" value="{start_date}"/>'
+            f'<input type="text" name="strdEdDate" value="{end_date}"/></form>'
+            f'<div class="tblType_08"><table><thead><tr>{header}</tr></thead><tbody>\n{rows}</tbody></table></div>'
+            f'</body></html>')
+
+
+def bench_crawl(n_requests=100, latency=0.02, slow_latency=1.0, slow_rate=0.05, error_rate=0.3, hedge_after=0.1, seed=0):
+    """
+    비동기 HPNT 크롤러 (`crawling.AsyncPortScheduleCrawler`)의 지연 시간과 장애 대응.
+
+    httpx.MockTransport로 보관된 일일 인스턴스를 담은 HPNT 페이지를 흉내 냅니다. 요청마다 latency초,
+    slow_rate 비율은 slow_latency초가 걸리고 error_rate 비율은 503을 반환하는 서버에 대해
+    - 'tail': 느린 응답만 있을 때 hedged request 유무에 따른 p50/p99,
+    - 'errors': 503이 섞일 때 재시도 유무에 따른 새 크롤링 비율 (나머지는 이전 결과로 대체),
+    - 'outage': 서버가 완전히 내려갔을 때 circuit breaker가 열린 뒤 HPNT로 보낸 요청 수와
+      이전 결과 (stale) 반환 여부를 확인합니다.
+    """
+    import asyncio
+
+    import httpx
+
+    from crawl_cache import CrawlCache
+    from crawling import AsyncPortScheduleCrawler, CrawlUnavailableError
+
+    records = _crawled_records(next(iter(load_archived_instances().values())))
+    page = _hpnt_page(records, '2025-01-01', '2025-01-01')
+    rng = np.random.default_rng(seed)
+
+    def make_transport(slow_rate, error_rate, down=False):
+        calls = []
+
+        async def handler(request):
+            calls.append(request.method)
+            if down:
+                raise httpx.ConnectError("HPNT is down", request=request)
+            await asyncio.sleep(slow_latency if rng.random() < slow_rate else latency)
+            if rng.random() < error_rate:
+                return httpx.Response(503, text='Service Unavailable')
+            return httpx.Response(200, text=page, headers={'Set-Cookie': 'JSESSIONID=bench; Path=/'})
+
+        return httpx.MockTransport(handler), calls
+
+    async def _run(crawler, n):
+        latencies, fresh = [], 0
+        for _ in range(n):
+            begin = time.perf_counter()
+            try:
+                result = await crawler.get_schedule_data('2025-01-01', '2025-01-01')
+                assert result['data_count'] == len(records)
+                fresh += not result['stale']
+            except CrawlUnavailableError:
+                pass
+            latencies.append(time.perf_counter() - begin)
+        await crawler.aclose()
+        return latencies, fresh
+
+    rows = []
+    for scenario, slow, errors, settings in (
+            ('tail', slow_rate, 0.0, {'hedge_after': None}),
+            ('tail', slow_rate, 0.0, {'hedge_after': hedge_after}),
+            ('errors', 0.0, error_rate, {'max_retries': 0}),
+            ('errors', 0.0, error_rate, {'max_retries': 2, 'backoff': latency})):
+        transport, calls = make_transport(slow, errors)
+        crawler = AsyncPortScheduleCrawler(transport=transport, failure_threshold=n_requests + 1, cache=CrawlCache(0),
+                                           **dict({'hedge_after': None}, **settings))
+        latencies, fresh = asyncio.run(_run(crawler, n_requests))
+        rows.append({'scenario': scenario, 'settings': str(settings), 'requests': n_requests,
+                     'fresh_rate': fresh / n_requests, 'http_calls': len(calls),
+                     'p50_ms': np.percentile(latencies, 50) * 1000, 'p99_ms': np.percentile(latencies, 99) * 1000})
+
+    async def _outage():
+        healthy, _ = make_transport(0.0, 0.0)
+        crawler = AsyncPortScheduleCrawler(transport=healthy, max_retries=1, backoff=0.0, cache=CrawlCache(0))
+        await crawler.get_schedule_data('2025-01-01', '2025-01-01')
+        await crawler.aclose()
+        crawler.transport, calls = make_transport(0.0, 0.0, down=True)
+        stale = 0
+        for _ in range(n_requests):
+            stale += (await crawler.get_schedule_data('2025-01-01', '2025-01-01'))['stale']
+        try:
+            await crawler.get_schedule_data('2025-01-02', '2025-01-02')
+            unavailable = False
+        except CrawlUnavailableError:
+            unavailable = True
+        await crawler.aclose()
+        return stale, len(calls), crawler.breaker.state, unavailable
+
+    stale, calls, state, unavailable = asyncio.run(_outage())
+    print(f"outage: {stale}/{n_requests} crawls served the last good snapshot, {calls} HTTP attempts reached HPNT, "
+          f"breaker {state}, uncached window -> CrawlUnavailableError: {unavailable}")
+    return pd.DataFrame(rows)
+
+
+def bench_crawl_cache(n_requests=50, latency=1.0):
+    """
+    크롤링 캐시 (`crawl_cache.CrawlCache`) 적중 시 지연 시간과 HPNT 요청 수.
+
+    latency초가 걸리는 가짜 HPNT 서버 (조회 기간과 접안 ~ 출항 기간이 겹치는 선박을 반환)에 보관된
+    일일 인스턴스의 전체 기간을 한 번 크롤링한 뒤, 같은 기간 (exact), 하루씩의 하위 기간 (superset),
+    같은 디스크 캐시를 쓰는 다른 프로세스 (disk)로 조회합니다. 하위 기간 결과가 서버에 직접 조회한
+    결과와 다른 경우를 mismatches로 셉니다.
+    """
+    import asyncio
+    import tempfile
+    from datetime import date, timedelta
+
+    import httpx
+
+    from crawl_cache import CrawlCache, _in_window
+    from crawling import AsyncPortScheduleCrawler
+
+    records = _crawled_records(next(iter(load_archived_instances().values())))
+    window = (min(record['접안예정일시'][:10] for record in records), max(record['출항예정일시'][:10] for record in records))
+    first, last = date.fromisoformat(window[0]), date.fromisoformat(window[1])
+    days = [str(first + timedelta(days=k)) for k in range((last - first).days + 1)]
+    calls = []
+
+    def served(start_date, end_date):
+        return [record for record in records if _in_window(record, start_date, end_date)]
+
+    async def handler(request):
+        calls.append(request.method)
+        await asyncio.sleep(latency)
+        if request.method == 'GET':
+            return httpx.Response(200, text=_hpnt_page(records, *window))
+        form = dict(httpx.QueryParams(request.content.decode()))
+        return httpx.Response(200, text=_hpnt_page(served(form['strdStDate'], form['strdEdDate']),
+                                                   form['strdStDate'], form['strdEdDate']))
+
+    def key(record):
+        return record['선사'], record['선명'], record['모선항차']
+
+    async def _lookups(crawler, windows):
+        before, latencies, mismatches = len(calls), [], 0
+        for start_date, end_date in windows:
+            begin = time.perf_counter()
+            result = await crawler.get_schedule_data(start_date, end_date)
+            latencies.append(time.perf_counter() - begin)
+            mismatches += sorted(map(key, result['schedule_data'])) != sorted(map(key, served(start_date, end_date)))
+        return {'lookups': len(windows), 'http_calls': len(calls) - before, 'mismatches': mismatches,
+                'p50_us': np.percentile(latencies, 50) * 1e6, 'max_us': np.max(latencies) * 1e6}
+
+    async def _run(directory):
+        rows = []
+        uncached = AsyncPortScheduleCrawler(transport=httpx.MockTransport(handler), cache=CrawlCache(0))
+        rows.append(dict(case='no cache', **await _lookups(uncached, [window] * 3)))
+        crawler = AsyncPortScheduleCrawler(transport=httpx.MockTransport(handler), cache=CrawlCache(directory=directory))
+        rows.append(dict(case='cold', **await _lookups(crawler, [window])))
+        rows.append(dict(case='exact', **await _lookups(crawler, [window] * n_requests)))
+        rows.append(dict(case='superset', **await _lookups(crawler, [(day, day) for day in days])))
+        # 같은 디스크 캐시를 쓰는 다른 uvicorn worker
+        worker = AsyncPortScheduleCrawler(transport=httpx.MockTransport(handler), cache=CrawlCache(directory=directory))
+        rows.append(dict(case='disk', **await _lookups(worker, [(days[1], days[-2])])))
+        for instance in (uncached, crawler, worker):
+            await instance.aclose()
+        return rows
+
+    with tempfile.TemporaryDirectory() as directory:
+        rows = asyncio.run(_run(directory))
+    print(f"window {window[0]} ~ {window[1]}: {len(records)} ships, server latency {latency}s")
+    return pd.DataFrame(rows)
+
+
+HPNT_CRAWL_GLOB = os.path.join(BACKEND_DIR, '..', 'submission', 'results_*', 'hpnt_crawled_data_????????.csv')
+
+
+def _hpnt_fixture(records, start_date, end_date, seed=0):
+    """
+    보관된 크롤링 결과로 만든 실제 페이지 크기의 HPNT 페이지.
+
+    `_hpnt_page()`에 메뉴 / 스크립트 / 주석 (주석 처리된 표 포함) 등 페이지의 나머지 부분과,
+    셀 안의 태그, HTML 엔티티, 헤더 행, 조회 대상이 아닌 상태 (DEPARTED)의 행을 추가합니다.
+    """
+    rng = np.random.default_rng(seed)
+    columns = ['선석', '선사', '모선항차', '선사항차', '선명', '항로', '반입마감시한', '접안예정일시', '출항예정일시',
+               '양하', '적하', 'Shift', 'AMP', '상태']
+    menu = ''.join(f'<li class="depth2"><a href="/infoservice/menu{k}.jsp" title="메뉴 {k}"><span>메뉴 &amp; 안내 {k}</span></a></li>\n'
+                   for k in range(400))
+    scripts = ''.join(f'<script type="text/javascript">function fn{k}(a) {{ if (a < {k}) {{ return "<td>" + a + "</td>"; }} '
+                      f'return a; }}</script>\n' for k in range(40))
+    csrf = '<script>$.ajaxSetup({ data: { name: "CSRF_TOKEN", value: "3f9c2a7e-51d4-4c0b-9a8e-fixture" } });</script>'
+
+    def cell(record, column):
+        value = str(record[column]).replace('&', '&amp;')
+        if column == '선명':
+            return f'<td class="left"><a href="#" onclick="fnVslInfo(\'{value}\'); return false;">{value}</a></td>'
+        if column == '상태':
+            return f'<td><span class="state">\n\t\t{value}\n\t</span></td>'
+        return f'<td>\n\t\t{value}\n\t</td>'
+
+    rows = []
+    for record in records:
+        rows.append('<tr>' + ''.join(cell(record, column) for column in columns) + '</tr>')
+        if rng.random() < 0.3:
+            rows.append('<tr>' + ''.join(cell(dict(record, 상태='DEPARTED'), column) for column in columns) + '</tr>')
+    header = '<tr>' + ''.join(f'<th scope="col">{column}</th>' for column in columns) + '</tr>'
+    table = (f'<div class="tblType_08 scroll"><table summary="선석 배정 현황"><caption>선석 배정 현황</caption>'
+             f'<thead>{header}</thead><tbody>\n{header}\n' + '\n'.join(rows) + '\n</tbody></table></div>')
+    return (f'<!DOCTYPE html><html lang="ko"><head><meta charset="utf-8"><title>HPNT</title>{scripts}{csrf}</head><body>'
+            f'<div id="header"><ul class="gnb">{menu}</ul></div>'
+            f'<!-- <div class="tblType_08"><table><tr><td>old</td></tr></table></div> -->'
+            f'<form name="submitForm" id="submitForm" method="post" action="vslScheduleList.jsp">'
+            f'<input type="hidden" name="isSearch" value="Y"/>'
+            f'<input type="text" name="strdStDate" id="strdStDate" value="{start_date}" class="datepicker"/>'
+            f'<input type="text" name="strdEdDate" id="strdEdDate" value="{end_date}" class="datepicker"/></form>'
+            f'{table}<div id="footer">{menu[:20000]}</div></body></html>')
+
+
+def _bs4_crawl_parse(crawler, initial_html, result_html, start_date, end_date):
+    """이전 BeautifulSoup 방식: 첫 페이지를 두 번 (기간, 폼 + CSRF 토큰 (`str(soup)`)), 결과 페이지를 한 번 파싱"""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(initial_html, 'html.parser')
+    start_input, end_input = soup.find('input', {'name': 'strdStDate'}), soup.find('input', {'name': 'strdEdDate'})
+    current = (start_input.get('value', '') if start_input else '', end_input.get('value', '') if end_input else '')
+
+    soup = BeautifulSoup(initial_html, 'html.parser')
+    assert soup.find('form', {'name': 'submitForm'})
+    token = re.search(r"name\s*:\s*['\"]CSRF_TOKEN['\"].*?value\s*:\s*['\"]([^'\"]+)['\"]", str(soup), re.DOTALL)
+
+    soup = BeautifulSoup(result_html, 'html.parser')
+    table = soup.find('div', class_='tblType_08').find('table')
+    tbody = table.find('tbody')
+    rows = [[cell.text for cell in row.find_all('td')]
+            for row in (tbody.find_all('tr') if tbody else table.find_all('tr'))
+            if not row.find('th') and row.find('td')]
+    return current, token.group(1) if token else '', crawler._extract_vessel_data(rows)
+
+
+def bench_parse(repeat=20):
+    """
+    HPNT 페이지 파싱: 이전 BeautifulSoup (html.parser) 3회 파싱 vs `hpnt_page.parse_hpnt_page()` 단일 스캔.
+
+    보관된 크롤링 결과 (submission/results_*/hpnt_crawled_data_*.csv)마다 `_hpnt_fixture()`로 첫 페이지와
+    결과 페이지를 만들어, 크롤링 한 번 (기간이 다른 경우: 첫 페이지 + 결과 페이지)의 파싱 시간과
+    추출한 기간, CSRF 토큰, 선박 데이터가 같은지 확인합니다.
+    """
+    from crawling import PortScheduleCrawler
+    from hpnt_page import parse_hpnt_page
+
+    crawler = PortScheduleCrawler()
+    rows = []
+    for path in sorted(glob.glob(HPNT_CRAWL_GLOB)):
+        records = pd.read_csv(path, dtype=str, encoding='utf-8-sig').fillna('').to_dict('records')
+        initial_html = _hpnt_fixture(records[:5], '2025-01-01', '2025-01-07')
+        result_html = _hpnt_fixture(records, '2025-01-02', '2025-01-09', seed=1)
+
+        def fast():
+            initial = parse_hpnt_page(initial_html)
+            result = parse_hpnt_page(result_html)
+            return ((initial['start'], initial['end']), initial['csrf_token'],
+                    crawler._schedule_from_page(result, 'list', '2025-01-02', '2025-01-09'))
+
+        timings = {}
+        for name, parse in (('bs4', lambda: _bs4_crawl_parse(crawler, initial_html, result_html, '2025-01-02', '2025-01-09')),
+                            ('fast', fast)):
+            result = parse()
+            begin = time.perf_counter()
+            for _ in range(repeat):
+                parse()
+            timings[name] = ((time.perf_counter() - begin) / repeat, result)
+
+        reference, extracted = timings['bs4'][1], timings['fast'][1]
+        rows.append({'file': os.path.basename(path), 'page_kb': (len(initial_html) + len(result_html)) / 2 / 1024,
+                     'ships': len(extracted[2]), 'bs4_ms': timings['bs4'][0] * 1000, 'fast_ms': timings['fast'][0] * 1000,
+                     'speedup': timings['bs4'][0] / timings['fast'][0], 'identical': reference == extracted})
+    return pd.DataFrame(rows)
+
+
+def bench_model_registry(repeat=20, n_threads=4):
+    """
+    작업 시간 예측: 요청마다 lgbm_weight.pkl을 unpickle하던 이전 방식 vs `model_registry.ModelRegistry`.
+
+    보관된 일일 인스턴스 하나에 대해 모델 준비 시간과 `predict_work_time()` 전체 시간을 비교하고,
+    n_threads개 스레드가 예측하는 동안 모델 파일을 (임시 파일 + os.replace로) 다른 버전으로 교체해
+    실패한 예측 없이 새 version으로 바뀌는지, 손상된 파일을 배포하면 이전 모델을 유지하는지 확인합니다.
+    """
+    import pickle
+    import shutil
+    import tempfile
+    import threading
+
+    import prediction
+    from model_registry import MODEL_PATH, ModelRegistry
+
+    crawled = pd.DataFrame(_crawled_records(next(iter(load_archived_instances().values()))))
+
+    def legacy_load():
+        with open(MODEL_PATH, 'rb') as f:
+            return pickle.load(f)
+
+    registry = ModelRegistry(MODEL_PATH)
+    registry.load()
+    rows = []
+    for name, load in (('unpickle per call', legacy_load), ('registry', lambda: registry.get()['model'])):
+        begin = time.perf_counter()
+        for _ in range(repeat):
+            load()
+        load_ms = (time.perf_counter() - begin) / repeat * 1000
+        rows.append({'model': name, 'load_ms': load_ms})
+
+    begin = time.perf_counter()
+    for _ in range(repeat):
+        prediction.predict_work_time(crawled.copy())
+    registry_total = (time.perf_counter() - begin) / repeat * 1000
+    rows[0]['predict_ms'] = registry_total + rows[0]['load_ms'] - rows[1]['load_ms']
+    rows[1]['predict_ms'] = registry_total
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'lgbm_weight.pkl')
+        shutil.copy(MODEL_PATH, path)
+        registry = ModelRegistry(path, check_interval=0)
+        first = registry.load()['version']
+        versions, errors, stop = set(), [], threading.Event()
+
+        def predict():
+            while not stop.is_set():
+                try:
+                    loaded = registry.get()
+                    features = prediction.preprocess_for_prediction(crawled.copy())
+                    loaded['model'].predict(features[['입항시간', '입항요일', '입항분기', '입항계절', '총톤수', '양적하물량', 'shift']])
+                    versions.add(loaded['version'])
+                except Exception as e:
+                    errors.append(repr(e))
+
+        def deploy(data):
+            tmp_path = path + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+
+        threads = [threading.Thread(target=predict) for _ in range(n_threads)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.5)
+        # 같은 모델을 다른 pickle 프로토콜로 저장한 새 "버전"
+        deploy(pickle.dumps(legacy_load(), protocol=2))
+        time.sleep(0.5)
+        second = registry.info()['version']
+        deploy(b'truncated')
+        time.sleep(0.5)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        info = registry.info()
+    print(f"hot reload under {n_threads} predicting threads: {first} -> {second}, versions seen {sorted(versions)}, "
+          f"failed predictions {len(errors)}; after a corrupt deploy still on {info['version']} "
+          f"(reloads {info['reloads']}, error {info['error']!r})")
+    return pd.DataFrame(rows)
+
+
+def _legacy_enrich(df):
+    """이전 방식: 요청마다 ship_info.csv를 읽고 merge_key를 만들어 중복 제거 후 병합"""
+    ship_info_df = pd.read_csv(os.path.join(BACKEND_DIR, 'ship_info.csv'))
+    ship_info_df['merge_key'] = ship_info_df['선사'].astype(str) + '_' + ship_info_df['선명'].str.replace(r'\s+', '', regex=True)
+    ship_info_df.drop_duplicates(subset=['merge_key'], inplace=True)
+    df['merge_key'] = df['선사'].astype(str) + '_' + df['선명'].str.replace(r'\s+', '', regex=True)
+    df = pd.merge(df, ship_info_df[['merge_key', '총톤수', 'LOA']], on='merge_key', how='left', suffixes=['_original', '_from_csv'])
+    for column in ('총톤수', 'LOA'):
+        if f'{column}_original' in df.columns:
+            df[column] = df[f'{column}_original'].combine_first(df[f'{column}_from_csv'])
+            df.drop(columns=[f'{column}_original', f'{column}_from_csv'], inplace=True)
+    return df.drop(columns=['merge_key'])
+
+
+def bench_vessel_registry(repeat=50):
+    """
+    선박 제원 (총톤수, LOA) 조회: 요청마다 ship_info.csv를 읽어 병합하던 이전 방식 vs
+    `vessel_registry.VesselRegistry` 색인.
+
+    보관된 일일 인스턴스마다 선박당 조회 시간과, 두 방식의 총톤수 / LOA 및 예측 작업 시간이 같은지
+    확인합니다.
+    """
+    from prediction import predict_work_time
+    from vessel_registry import VESSEL_REGISTRY
+
+    VESSEL_REGISTRY.get()
+    rows = []
+    for name, df in load_archived_instances().items():
+        crawled = pd.DataFrame(_crawled_records(df))
+        timings = {}
+        for method, enrich in (('csv merge', lambda: _legacy_enrich(crawled.copy())),
+                               ('registry', lambda: VESSEL_REGISTRY.enrich(crawled['선사'].astype(str), crawled['선명']))):
+            begin = time.perf_counter()
+            for _ in range(repeat):
+                enrich()
+            timings[method] = (time.perf_counter() - begin) / repeat / len(crawled) * 1e6
+
+        legacy = _legacy_enrich(crawled.copy())
+        gross_tonnage, loa = VESSEL_REGISTRY.enrich(crawled['선사'].astype(str), crawled['선명'])
+        same_specs = (np.allclose(legacy['총톤수'].astype(float), gross_tonnage, equal_nan=True)
+                      and np.allclose(legacy['LOA'].astype(float), loa, equal_nan=True))
+        rows.append({'instance': name, 'ships': len(crawled), 'matched': int(np.isfinite(gross_tonnage).sum()),
+                     'csv_merge_us_per_ship': timings['csv merge'], 'registry_us_per_ship': timings['registry'],
+                     'speedup': timings['csv merge'] / timings['registry'], 'same_specs': same_specs})
+
+    # 예측 결과도 같은지 (ETD 계산기처럼 총톤수 / LOA가 이미 있는 선박 포함): 이전 방식으로 채운 제원은
+    # 색인보다 우선하므로 그대로 예측하면 이전 방식의 예측 결과
+    crawled = pd.DataFrame(_crawled_records(next(iter(load_archived_instances().values()))))
+    crawled['총톤수'] = crawled['LOA'] = np.nan
+    crawled.loc[0, ['총톤수', 'LOA']] = [12345.0, 150.0]
+    predicted = predict_work_time(crawled.copy())['predicted_work_time'].to_numpy()
+    legacy_predicted = predict_work_time(_legacy_enrich(crawled.copy()))['predicted_work_time'].to_numpy()
+    print(f"predicted work times identical to the csv merge path: {np.allclose(predicted, legacy_predicted)}")
+    return pd.DataFrame(rows)
+
+
+PREDICTION_FEATURES = ['입항시간', '입항요일', '입항분기', '입항계절', '총톤수', '양적하물량', 'shift']
+
+
+def _stress_features(n_rows, seed=0):
+    """결측 (NaN), 0 근처 값, 음수, 학습에 없던 범주가 섞인 가상 예측 입력"""
+    rng = np.random.default_rng(seed)
+    features = pd.DataFrame({
+        '입항시간': rng.choice([np.nan, 0.0, -3.0, 1e-40, 5.0, 12.5, 23.0], n_rows),
+        '입항요일': pd.Categorical(rng.choice(['월', '화', '일', '?', None], n_rows)),
+        '입항분기': rng.integers(-1, 6, n_rows).astype(float),
+        '입항계절': pd.Categorical(rng.choice(['봄', '여름', '가을', '겨울', '?'], n_rows)),
+        '총톤수': np.where(rng.random(n_rows) < 0.1, np.nan, rng.uniform(-1000, 200000, n_rows)),
+        '양적하물량': rng.uniform(0, 8000, n_rows).round(),
+        'shift': rng.integers(0, 3, n_rows),
+    })
+    features.loc[::7, '양적하물량'] = np.nan
+    return features
+
+
+def bench_tree_ensemble(repeat=20, batch_sizes=(1, 30, 1000, 5000)):
+    """
+    작업 시간 예측: `lightgbm` 모델의 predict() vs `tree_ensemble.TreeEnsemble` (lgbm_weight.npz).
+
+    보관된 일일 인스턴스 (크롤링 레코드를 `preprocess_for_prediction()`으로 만든 입력)와 가상 입력에서
+    두 예측값이 bit 단위로 같은지 (np.array_equal) 확인하고, 배치 크기별 예측 시간과 새 프로세스에서
+    첫 예측까지 걸리는 시간 (import 포함)을 비교합니다.
+    """
+    import pickle
+    import subprocess
+    import sys
+
+    import prediction
+    from model_registry import MODEL_PATH
+    from tree_ensemble import TreeEnsemble, compiled_path
+
+    with open(MODEL_PATH, 'rb') as f:
+        lgbm_model = pickle.load(f)
+    ensemble = TreeEnsemble.load(compiled_path(MODEL_PATH))
+
+    rows = []
+    for name, df in load_archived_instances().items():
+        features = prediction.preprocess_for_prediction(pd.DataFrame(_crawled_records(df)))[PREDICTION_FEATURES]
+        expected, predicted = lgbm_model.predict(features), ensemble.predict(features)
+        rows.append({'input': name, 'rows': len(features), 'identical': np.array_equal(expected, predicted),
+                     'max_abs_diff': np.abs(expected - predicted).max()})
+    stress = _stress_features(5000)
+    expected, predicted = lgbm_model.predict(stress), ensemble.predict(stress)
+    rows.append({'input': 'synthetic (NaN, zero, negative, unseen categories)', 'rows': len(stress),
+                 'identical': np.array_equal(expected, predicted), 'max_abs_diff': np.abs(expected - predicted).max()})
+
+    for n_rows in batch_sizes:
+        features = _stress_features(n_rows, seed=1)
+        timings = {}
+        for engine, predict in (('lightgbm', lgbm_model.predict), ('numpy', ensemble.predict)):
+            begin = time.perf_counter()
+            for _ in range(repeat):
+                predict(features)
+            timings[engine] = (time.perf_counter() - begin) / repeat * 1000
+        rows.append({'input': f'batch of {n_rows}', 'rows': n_rows, 'lightgbm_ms': timings['lightgbm'],
+                     'numpy_ms': timings['numpy'], 'speedup': timings['lightgbm'] / timings['numpy']})
+
+    # 새 프로세스에서 prediction을 import하고 첫 예측을 마칠 때까지의 시간
+    crawled = json.dumps(_crawled_records(next(iter(load_archived_instances().values()))), ensure_ascii=False)
+    script = ("import json, sys, time; begin = time.perf_counter(); import pandas as pd; import prediction; "
+              "prediction.predict_work_time(pd.DataFrame(json.loads(sys.stdin.read()))); "
+              "print(time.perf_counter() - begin, 'lightgbm' in sys.modules)")
+    for engine in ('lightgbm', 'auto'):
+        env = dict(os.environ, BAIPOT_MODEL_ENGINE=engine)
+        output = subprocess.run([sys.executable, '-c', script], input=crawled, capture_output=True, text=True,
+                                cwd=BACKEND_DIR, env=env, check=True).stdout.splitlines()[-1].split()
+        print(f"cold start with BAIPOT_MODEL_ENGINE={engine}: first prediction after {float(output[0]) * 1000:.0f} ms, "
+              f"lightgbm imported: {output[1]}")
+    return pd.DataFrame(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="BAIPOT optimization benchmarks")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help="model construction time for N = 10 ... 150")
+    build_parser.add_argument('--sizes', type=int, nargs='+', default=[10, 25, 50, 75, 100, 125, 150])
+
+    subparsers.add_parser('formulations', help="check formulations and pair preprocessing reach the same objective")
+
+    warm_parser = subparsers.add_parser('warmstart', help="time to first incumbent / optimum with and without MIP start")
+    warm_parser.add_argument('--time-limit', type=float, default=120)
+
+    backends_parser = subparsers.add_parser('backends', help="check every installed solver backend returns a valid schedule")
+    backends_parser.add_argument('--time-limit', type=float, default=30)
+    backends_parser.add_argument('--backends', nargs='+', default=None)
+
+    decomp_parser = subparsers.add_parser('decompose', help="monolithic vs component-decomposed solve on long horizons")
+    decomp_parser.add_argument('--sizes', type=int, nargs='+', default=[25, 50, 100, 200])
+    decomp_parser.add_argument('--ships-per-day', type=float, default=1.5)
+    decomp_parser.add_argument('--backend', default='cpsat')
+    decomp_parser.add_argument('--time-limit', type=float, default=60)
+
+    insert_parser = subparsers.add_parser('insertion', help="incremental ETD insertion vs full re-optimization")
+    insert_parser.add_argument('--backend', default=None)
+    insert_parser.add_argument('--time-limit', type=float, default=30)
+
+    cache_parser = subparsers.add_parser('cache', help="solution cache hits and warm starts from the closest cached schedule")
+    cache_parser.add_argument('--backend', default=None)
+    cache_parser.add_argument('--time-limit', type=float, default=60)
+
+    rolling_parser = subparsers.add_parser('rolling', help="rolling horizon vs monolithic solve on February 2025")
+    rolling_parser.add_argument('--backend', default=None)
+    rolling_parser.add_argument('--time-limit', type=float, default=300)
+
+    load_parser = subparsers.add_parser('load', help="concurrent /schedule/prepare throughput with a simulated crawl")
+    load_parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 2, 4, 8])
+    load_parser.add_argument('--requests', type=int, default=8)
+    load_parser.add_argument('--crawl-latency', type=float, default=0.5)
+
+    crawl_parser = subparsers.add_parser('crawl', help="async HPNT crawler tail latency, retries and circuit breaker")
+    crawl_parser.add_argument('--requests', type=int, default=100)
+    crawl_parser.add_argument('--hedge-after', type=float, default=0.1)
+
+    crawl_cache_parser = subparsers.add_parser('crawlcache', help="crawl cache hits for repeated, sub-range and cross-worker lookups")
+    crawl_cache_parser.add_argument('--requests', type=int, default=50)
+    crawl_cache_parser.add_argument('--latency', type=float, default=1.0)
+
+    parse_parser = subparsers.add_parser('parse', help="BeautifulSoup vs single-pass HPNT page parsing on archived crawls")
+    parse_parser.add_argument('--repeat', type=int, default=20)
+
+    model_parser = subparsers.add_parser('model', help="per-call unpickling vs the resident model registry, hot reload")
+    model_parser.add_argument('--repeat', type=int, default=20)
+
+    vessels_parser = subparsers.add_parser('vessels', help="per-request ship_info.csv merge vs the in-memory vessel registry")
+    vessels_parser.add_argument('--repeat', type=int, default=50)
+
+    batch_parser = subparsers.add_parser('batch', help="/predict/batch throughput vs one prediction per ship")
+    batch_parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000, 10000, 100000])
+
+    subparsers.add_parser('memo', help="replay the fixed-target scenarios with the feature-level prediction cache")
+
+    trees_parser = subparsers.add_parser('trees', help="NumPy tree ensemble vs LightGBM: identical predictions, latency, cold start")
+    trees_parser.add_argument('--repeat', type=int, default=20)
+
+    ls_parser = subparsers.add_parser('localsearch', help="simulated annealing vs MILP quality and runtime")
+    ls_parser.add_argument('--time-limit', type=float, default=10)
+    ls_parser.add_argument('--milp-time-limit', type=float, default=120)
+
+    args = parser.parse_args()
+    with pd.option_context('display.width', 250, 'display.max_columns', 30):
+        if args.command == 'build':
+            print(bench_build(args.sizes).round(3))
+        elif args.command == 'formulations':
+            print(verify_formulations().round(3))
+        elif args.command == 'warmstart':
+            print(bench_warm_start(args.time_limit).round(3))
+        elif args.command == 'backends':
+            print(verify_backends(args.time_limit, backends=args.backends).round(3).to_string())
+        elif args.command == 'decompose':
+            print(bench_decomposition(args.sizes, args.ships_per_day, args.backend, args.time_limit).round(3).to_string())
+        elif args.command == 'insertion':
+            print(bench_insertion(args.backend, args.time_limit).round(3).to_string())
+        elif args.command == 'cache':
+            print(bench_solution_cache(args.backend, args.time_limit).round(3).to_string())
+        elif args.command == 'rolling':
+            print(bench_rolling_horizon(args.backend, args.time_limit).round(3).to_string())
+        elif args.command == 'load':
+            print(bench_api_load(args.concurrency, args.requests, args.crawl_latency).round(3).to_string())
+        elif args.command == 'crawl':
+            print(bench_crawl(args.requests, hedge_after=args.hedge_after).round(3).to_string())
+        elif args.command == 'crawlcache':
+            print(bench_crawl_cache(args.requests, args.latency).round(1).to_string())
+        elif args.command == 'parse':
+            print(bench_parse(args.repeat).round(3).to_string())
+        elif args.command == 'model':
+            print(bench_model_registry(args.repeat).round(3).to_string())
+        elif args.command == 'vessels':
+            print(bench_vessel_registry(args.repeat).round(3).to_string())
+        elif args.command == 'batch':
+            print(bench_batch_predict(args.sizes).round(3).to_string())
+        elif args.command == 'memo':
+            print(bench_prediction_cache().round(3).to_string())
+        elif args.command == 'trees':
+            print(bench_tree_ensemble(args.repeat).to_string())
+        elif args.command == 'localsearch':
+            print(bench_local_search(args.time_limit, args.milp_time_limit).round(3))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,177 @@
+import json
+import logging
+import math
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+
+# 크롤링 결과를 다시 크롤링하지 않고 사용할 시간 (초), 메모리 캐시 최대 항목 수와 (선택) 여러 uvicorn
+# worker가 공유하는 디스크 캐시 경로
+CRAWL_CACHE_TTL = float(os.environ.get('BAIPOT_CRAWL_CACHE_TTL', 300))
+CRAWL_CACHE_SIZE = int(os.environ.get('BAIPOT_CRAWL_CACHE_SIZE', 32))
+CRAWL_CACHE_DIR = os.environ.get('BAIPOT_CRAWL_CACHE_DIR')
+
+_FILE_PATTERN = re.compile(r'^(\d{4}-\d{2}-\d{2})_(\d{4}-\d{2}-\d{2})\.json$')
+
+
+def _in_window(record, start_date, end_date):
+    """
+    선박이 start_date ~ end_date 조회 결과에 포함되는지 여부.
+
+    HPNT는 접안 ~ 출항 기간이 조회 기간과 겹치는 선박을 반환합니다 (보관된 크롤링 결과 기준).
+    날짜를 알 수 없는 선박은 포함합니다.
+    """
+    arrival = record.get('접안예정일시', '')[:10]
+    departure = record.get('출항예정일시', '')[:10]
+    if not arrival or not departure:
+        return True
+    return arrival <= end_date and departure >= start_date
+
+
+class CrawlCache:
+    """
+    기간 (start_date, end_date)별 HPNT 크롤링 결과 (`get_work_plan_data(..., output_format='json')`
+    형식의 딕셔너리) 캐시 (메모리 LRU) + 선택적 디스크 캐시.
+
+    요청 기간을 포함하는 더 긴 기간의 결과가 있으면 그 결과에서 요청 기간과 겹치는 선박만 골라
+    반환합니다. ttl_seconds가 지난 항목도 지우지 않고 남겨 두어 HPNT에 연결할 수 없을 때 이전 결과로
+    사용할 수 있습니다 (`latest()`).
+
+    디스크 캐시는 `<start_date>_<end_date>.json` 파일이며 임시 파일을 쓴 뒤 이름을 바꾸어 여러
+    프로세스가 동시에 써도 깨진 파일을 읽지 않습니다.
+    """
+
+    def __init__(self, ttl_seconds=CRAWL_CACHE_TTL, max_entries=CRAWL_CACHE_SIZE, directory=CRAWL_CACHE_DIR):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.directory = directory
+        self.stats = {'hits': 0, 'superset_hits': 0, 'misses': 0}
+        self._entries = OrderedDict()  # (start_date, end_date) -> {'fetched': epoch 초, 'result': dict}
+        self._lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def get(self, start_date, end_date):
+        """
+        start_date ~ end_date (YYYY-MM-DD)의 ttl_seconds 안에 크롤링한 결과. 없으면 None.
+
+        Returns:
+            dict: 크롤링 결과 사본. cached=True와 경과 시간 age (초)가 추가됩니다.
+        """
+        found = self._get(start_date, end_date, self.ttl_seconds)
+        if found is None:
+            self.stats['misses'] += 1
+            return None
+        key, result = found
+        self.stats['hits' if key == (start_date, end_date) else 'superset_hits'] += 1
+        return result
+
+    def latest(self, start_date, end_date):
+        """ttl_seconds와 관계없이 start_date ~ end_date의 가장 최근 크롤링 결과 (HPNT에 연결할 수 없을 때 사용). 없으면 None."""
+        found = self._get(start_date, end_date, math.inf)
+        return None if found is None else found[1]
+
+    def _get(self, start_date, end_date, max_age):
+        now = time.time()
+        found = self._lookup(start_date, end_date, now - max_age)
+        if found is None and self.directory:
+            self._load_covering(start_date, end_date)
+            found = self._lookup(start_date, end_date, now - max_age)
+        if found is None:
+            return None
+
+        key, entry = found
+        result = dict(entry['result'], cached=True, age=now - entry['fetched'])
+        if key != (start_date, end_date):
+            schedule_data = [record for record in result['schedule_data'] if _in_window(record, start_date, end_date)]
+            result.update(schedule_data=schedule_data, data_count=len(schedule_data),
+                          period=f"{start_date} ~ {end_date}")
+        else:
+            result['schedule_data'] = list(result['schedule_data'])
+        return key, result
+
+    def _lookup(self, start_date, end_date, fetched_after):
+        """기간을 포함하고 fetched_after 이후에 크롤링한 항목 중 가장 최근 (같으면 가장 짧은 기간) 항목"""
+        with self._lock:
+            candidates = [(key, entry) for key, entry in self._entries.items()
+                          if key[0] <= start_date and key[1] >= end_date and entry['fetched'] > fetched_after]
+            if not candidates:
+                return None
+            key, entry = max(candidates, key=lambda item: (item[1]['fetched'], -_days(item[0])))
+            self._entries.move_to_end(key)
+            return key, entry
+
+    def put(self, start_date, end_date, result):
+        """새로 크롤링한 결과를 저장합니다."""
+        entry = {'fetched': time.time(), 'result': result}
+        self._remember((start_date, end_date), entry)
+        self._save((start_date, end_date), entry)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _remember(self, key, entry):
+        with self._lock:
+            current = self._entries.get(key)
+            if current is not None and current['fetched'] > entry['fetched']:
+                return
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key[0]}_{key[1]}.json")
+
+    def _load_covering(self, start_date, end_date):
+        """디스크 캐시에서 요청 기간을 포함하는, 메모리에 있는 것보다 새로운 항목을 메모리로 올립니다."""
+        if not self.directory:
+            return
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return
+        for name in names:
+            match = _FILE_PATTERN.match(name)
+            if not match or match.group(1) > start_date or match.group(2) < end_date:
+                continue
+            key = (match.group(1), match.group(2))
+            path = self._path(key)
+            with self._lock:
+                current = self._entries.get(key)
+            try:
+                if current is not None and os.path.getmtime(path) <= current['fetched']:
+                    continue
+                with open(path, encoding='utf-8') as f:
+                    entry = json.load(f)
+            except (OSError, ValueError) as e:
+                logging.warning(f"Ignoring unreadable crawl cache file {path}: {e}")
+                continue
+            self._remember(key, entry)
+
+    def _save(self, key, entry):
+        if not self.directory:
+            return
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.json.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, self._path(key))
+        except OSError as e:
+            logging.warning(f"Could not write crawl cache file {self._path(key)}: {e}")
+
+
+def _days(key):
+    """기간 키의 길이 (일, 같은 날짜는 0)"""
+    return (date.fromisoformat(key[1]) - date.fromisoformat(key[0])).days
+
+
+CRAWL_CACHE = CrawlCache()
@@ -1,30 +1,49 @@
 import requests
-from bs4 import BeautifulSoup
 from datetime import datetime, timedelta
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+import asyncio
 import json
+import os
+import random
 import time
 import re
 from urllib.parse import urljoin
 import pandas as pd
 
+from crawl_cache import CRAWL_CACHE
+from hpnt_page import parse_hpnt_page
+
+# 비동기 크롤러의 연결/읽기 타임아웃 (초), 최대 재시도 횟수, hedged request를 보낼 때까지의 시간
+# (초, 비우면 사용 안 함), circuit breaker가 열려 있는 시간 (초)
+CRAWL_CONNECT_TIMEOUT = float(os.environ.get('BAIPOT_CRAWL_CONNECT_TIMEOUT', 5))
+CRAWL_READ_TIMEOUT = float(os.environ.get('BAIPOT_CRAWL_READ_TIMEOUT', 20))
+CRAWL_MAX_RETRIES = int(os.environ.get('BAIPOT_CRAWL_MAX_RETRIES', 2))
+CRAWL_HEDGE_AFTER = float(os.environ['BAIPOT_CRAWL_HEDGE_AFTER']) if os.environ.get('BAIPOT_CRAWL_HEDGE_AFTER') else None
+CRAWL_BREAKER_RESET = float(os.environ.get('BAIPOT_CRAWL_BREAKER_RESET', 60))
+
+HPNT_URL = "https://www.hpnt.co.kr/infoservice/vessel/vslScheduleList.jsp"
+
+#헤더 설정
+HPNT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
+    'Accept-Language': 'ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+    'Sec-Fetch-Dest': 'document',
+    'Sec-Fetch-Mode': 'navigate',
+    'Sec-Fetch-Site': 'same-origin',
+    'Sec-Fetch-User': '?1',
+}
+
 class PortScheduleCrawler:
-    def __init__(self):
-        self.base_url = "https://www.hpnt.co.kr/infoservice/vessel/vslScheduleList.jsp"
+    def __init__(self, connect_timeout=CRAWL_CONNECT_TIMEOUT, read_timeout=CRAWL_READ_TIMEOUT):
+        self.base_url = HPNT_URL
+        # 비동기 크롤러와 같은 (connect, read) 타임아웃: HPNT가 응답하지 않아도 무한정 기다리지 않음
+        self.timeout = (connect_timeout, read_timeout)
         self.session = requests.Session()
-        
-        #헤더 설정
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
-            'Accept-Language': 'ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-            'Sec-Fetch-Dest': 'document',
-            'Sec-Fetch-Mode': 'navigate',
-            'Sec-Fetch-Site': 'same-origin',
-            'Sec-Fetch-User': '?1',
-        })
+        self.session.headers.update(HPNT_HEADERS)
     
     def get_schedule_data(self, start_date, end_date, output_format='json'):
         """
@@ -37,21 +56,21 @@ class PortScheduleCrawler:
         """
         try:
             print(f"{start_date} ~ {end_date}")
-            initial_response = self.session.get(self.base_url)
+            initial_response = self.session.get(self.base_url, timeout=self.timeout)
             print(f"session: {initial_response.status_code}")
             
             if initial_response.status_code != 200:
                 print(f"session: {initial_response.status_code}")
                 return None
         
-            # 현재 설정된 날짜 범위 확인
-            current_dates = self._get_current_date_range(initial_response.text)
+            # 현재 설정된 날짜 범위 확인 (페이지는 한 번만 파싱)
+            page = parse_hpnt_page(initial_response.text)
             
             # 2단계: 날짜가 다르면 새로 검색, 같으면 현재 데이터 사용
-            if current_dates['start'] == start_date and current_dates['end'] == end_date:
-                result = self.parse_schedule_data(initial_response.text, output_format, start_date, end_date)
+            if page['start'] == start_date and page['end'] == end_date:
+                result = self._schedule_from_page(page, output_format, start_date, end_date)
             else:
-                result = self._search_with_date_range(initial_response.text, start_date, end_date, output_format)
+                result = self._search_with_date_range(page, start_date, end_date, output_format)
             
             return result
                 
@@ -61,36 +80,21 @@ class PortScheduleCrawler:
             print(f"{traceback.format_exc()}")
             return None
     
-    def _get_current_date_range(self, html_content):
-        """현재 페이지에 설정된 날짜 범위 추출"""
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
-        start_input = soup.find('input', {'name': 'strdStDate'})
-        end_input = soup.find('input', {'name': 'strdEdDate'})
-        
-        return {
-            'start': start_input.get('value', '') if start_input else '',
-            'end': end_input.get('value', '') if end_input else ''
-        }
-    
-    def _search_with_date_range(self, html_content, start_date, end_date, output_format):
-        """새로운 날짜 범위로 검색 실행"""
+    def _search_with_date_range(self, page, start_date, end_date, output_format):
+        """새로운 날짜 범위로 검색 실행 (page는 `parse_hpnt_page()`로 파싱한 첫 페이지)"""
         try:           
-            soup = BeautifulSoup(html_content, 'html.parser')
-            
-            submit_form = soup.find('form', {'name': 'submitForm'})
-            if not submit_form:
+            if not page['has_form']:
                 print("No submitForm")
                 return None
             
-            # CSRF 토큰 추출
-            csrf_token = self._extract_csrf_token_from_page(soup)
+            # CSRF 토큰 (첫 페이지 파싱 시 추출)
+            csrf_token = page['csrf_token']
             
             if not csrf_token:
                 print("토큰 없음")
             
             # 검색 폼 데이터 구성
-            form_data = self._build_form_data(submit_form, start_date, end_date, csrf_token)
+            form_data = self._build_form_data(None, start_date, end_date, csrf_token)
             
             # 검색 요청 실행
             response = self._submit_search_form(form_data)
@@ -106,28 +110,6 @@ class PortScheduleCrawler:
             print(f"{str(e)}")
             return None
     
-    def _extract_csrf_token_from_page(self, soup):
-            """전체 페이지에서 CSRF 토큰 찾기 (JS 코드 내에서)"""
-            page_text = str(soup)
-            
-            # name: 'CSRF_TOKEN', value:'...' 구조
-            # re.DOTALL 플래그는 줄바꿈(...)이 있어도 찾을 수 있음
-            # name\s*:\s*['\"]CSRF_TOKEN['\"] name 이라는 글자뒤 : 이 나오고 "CSRF_TOKEN" 찾음
-            # \s*은 공백이 0개 이상, 공백 처리 e.g. name: , name :
-            # .*? 는 value 까지의 모든 문자 (최소 매칭) .* : 어떤 문자든, ? : 짧게
-            # ['\"]([^'\"]+)['\"] value 뒤에 ' 또는 " 로 감싸진 값 추출, ([^'\"]+) 토큰값 (따옴표가 아닌 문자)
-            pattern = r"name\s*:\s*['\"]CSRF_TOKEN['\"].*?value\s*:\s*['\"]([^'\"]+)['\"]"
-            
-            match = re.search(pattern, page_text, re.DOTALL)
-            
-            if match:
-                token = match.group(1)
-                # print(f"name: 'CSRF_TOKEN', value:'...' 구조 : {token}")
-                return token
-
-            print("No CSRF")
-            return ''
-    
     def _build_form_data(self, form, start_date, end_date, csrf_token):
         """검색 폼 데이터 구성"""
         form_data = {
@@ -157,7 +139,7 @@ class PortScheduleCrawler:
             }
             
             print(f"Submitting Form Data: {form_data}")
-            response = self.session.post(self.base_url, data=form_data, headers=headers)
+            response = self.session.post(self.base_url, data=form_data, headers=headers, timeout=self.timeout)
             
             print(f"post: {response.status_code}")
             
@@ -173,14 +155,14 @@ class PortScheduleCrawler:
     
     def parse_schedule_data(self, html_content, output_format, start_date, end_date):
         """HTML에서 선박 스케줄 데이터 파싱"""
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
-        target_table = self._find_schedule_table(soup)
-        
-        if not target_table:
+        return self._schedule_from_page(parse_hpnt_page(html_content), output_format, start_date, end_date)
+    
+    def _schedule_from_page(self, page, output_format, start_date, end_date):
+        """`parse_hpnt_page()` 결과의 스케줄 표에서 선박 스케줄 데이터 추출"""
+        if page['rows'] is None:
             raise ValueError("No schedule table found")
         
-        schedule_data = self._extract_vessel_data(target_table)
+        schedule_data = self._extract_vessel_data(page['rows'])
         
         if not schedule_data:
             raise ValueError("No vessel data extracted")
@@ -198,33 +180,11 @@ class PortScheduleCrawler:
         else:
             return schedule_data
     
-    def _find_schedule_table(self, soup):
-        """선박 스케줄 테이블 찾기"""
-        table_div = soup.find('div', class_='tblType_08')
-        if table_div:
-            table = table_div.find('table')
-            if table:
-                return table
-        
-        return None
-    
-    def _extract_vessel_data(self, table):
-        """테이블에서 선박 데이터 추출"""
+    def _extract_vessel_data(self, rows):
+        """스케줄 표의 데이터 행 (셀 텍스트 목록)에서 선박 데이터 추출"""
         schedule_data = []
         
-        tbody = table.find('tbody')
-        rows = tbody.find_all('tr') if tbody else table.find_all('tr')
-                
-        data_rows = []
-        for row in rows:
-            if row.find('th'):
-                continue
-            if row.find('td'):
-                data_rows.append(row)
-        
-        for i, row in enumerate(data_rows):
-            cells = row.find_all('td')
-            
+        for i, cells in enumerate(rows):
             try:
                 vessel_data = self._parse_vessel_row(cells)
                 
@@ -239,22 +199,22 @@ class PortScheduleCrawler:
         return schedule_data
     
     def _parse_vessel_row(self, cells):
-        """선박 정보 행 파싱"""
+        """선박 정보 행 (셀 텍스트 목록) 파싱"""
         vessel_data = {
-            '선석': self.clean_text(cells[0].text),
-            '선사': self.clean_text(cells[1].text),
-            '모선항차': self.clean_text(cells[2].text),
-            '선사항차': self.clean_text(cells[3].text),
-            '선명': self.clean_text(cells[4].text),
-            '항로': self.clean_text(cells[5].text),
-            '반입마감시한': self.clean_text(cells[6].text),
-            '접안예정일시': self.clean_text(cells[7].text),
-            '출항예정일시': self.clean_text(cells[8].text),
-            '양하': self.clean_text(cells[9].text),
-            '적하': self.clean_text(cells[10].text),
-            'Shift': self.clean_text(cells[11].text),
-            'AMP': self.clean_text(cells[12].text),
-            '상태': self.clean_text(cells[13].text)
+            '선석': self.clean_text(cells[0]),
+            '선사': self.clean_text(cells[1]),
+            '모선항차': self.clean_text(cells[2]),
+            '선사항차': self.clean_text(cells[3]),
+            '선명': self.clean_text(cells[4]),
+            '항로': self.clean_text(cells[5]),
+            '반입마감시한': self.clean_text(cells[6]),
+            '접안예정일시': self.clean_text(cells[7]),
+            '출항예정일시': self.clean_text(cells[8]),
+            '양하': self.clean_text(cells[9]),
+            '적하': self.clean_text(cells[10]),
+            'Shift': self.clean_text(cells[11]),
+            'AMP': self.clean_text(cells[12]),
+            '상태': self.clean_text(cells[13])
             }
 
         return vessel_data
@@ -285,6 +245,267 @@ class PortScheduleCrawler:
         except Exception as e:
             print(f"{str(e)}")
 
+class CrawlUnavailableError(RuntimeError):
+    """HPNT에 연결할 수 없고 (또는 circuit breaker가 열려 있고) 돌려줄 이전 크롤링 결과도 없는 경우"""
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    연속 실패가 failure_threshold번이면 reset_timeout초 동안 요청을 막는 (open) circuit breaker.
+
+    reset_timeout이 지나면 한 요청만 시험 삼아 보내고 (half-open), 성공하면 다시 닫고 실패하면
+    다시 reset_timeout 동안 엽니다.
+    """
+
+    def __init__(self, failure_threshold=3, reset_timeout=60.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return 'half-open'
+        return 'open'
+
+    def allow(self):
+        """요청을 보내도 되는지 여부. half-open 상태에서는 동시에 한 요청만 허용합니다."""
+        state = self.state
+        if state == 'closed':
+            return True
+        if state == 'half-open' and not self._trial:
+            self._trial = True
+            return True
+        return False
+
+    def retry_after(self):
+        """open 상태에서 다시 시도할 수 있을 때까지 남은 시간 (초)"""
+        if self.opened_at is None:
+            return 0.0
+        return max(self.reset_timeout - (time.monotonic() - self.opened_at), 0.0)
+
+    def cancel_trial(self):
+        """half-open 상태의 시험 요청이 결과 없이 취소된 경우 다른 요청이 시험할 수 있게 합니다."""
+        self._trial = False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._trial = False
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+
+class _RetryableResponse(Exception):
+    """재시도할 HTTP 응답 (429, 5xx)"""
+
+
+class AsyncPortScheduleCrawler(PortScheduleCrawler):
+    """
+    httpx.AsyncClient 기반 비동기 HPNT 크롤러. 애플리케이션 수명 동안 하나를 만들어 공유합니다.
+
+    - 연결 풀을 재사용하므로 요청마다 TLS handshake를 다시 하지 않습니다. 세션 쿠키 (CSRF 토큰과
+      짝을 이룸)는 크롤링마다 따로 주고받아 동시 크롤링이 서로의 세션을 덮어쓰지 않습니다.
+    - connect/read 타임아웃, 연결 오류와 429/5xx 응답에 대한 최대 max_retries번의 지수 backoff
+      (full jitter) 재시도.
+    - hedge_after초 안에 첫 시도가 끝나지 않으면 같은 크롤링을 하나 더 보내 먼저 끝난 결과를 사용
+      (hedged request, None이면 사용 안 함).
+    - cache (`crawl_cache.CrawlCache`)에 TTL 안의 결과가 있으면 (요청 기간을 포함하는 더 긴 기간의
+      결과 포함) 크롤링하지 않고 반환합니다 (cached=True).
+    - 연속 실패 시 circuit breaker를 열고, cache의 마지막 성공 결과 (stale=True)를 대신 반환합니다.
+
+    페이지 파싱 (`hpnt_page.parse_hpnt_page()`)은 이벤트 루프를 막지 않도록 스레드에서 실행합니다.
+    """
+
+    def __init__(self, connect_timeout=CRAWL_CONNECT_TIMEOUT, read_timeout=CRAWL_READ_TIMEOUT,
+                 max_retries=CRAWL_MAX_RETRIES, backoff=0.5, hedge_after=CRAWL_HEDGE_AFTER,
+                 failure_threshold=3, reset_timeout=CRAWL_BREAKER_RESET, cache=CRAWL_CACHE, max_connections=10,
+                 transport=None):
+        self.base_url = HPNT_URL
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.hedge_after = hedge_after
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.cache = cache
+        self.max_connections = max_connections
+        self.transport = transport
+        self._client = None
+
+    def _get_client(self):
+        import httpx
+
+        if self._client is None:
+            connect_timeout, read_timeout = self.timeout
+            self._client = httpx.AsyncClient(
+                headers=HPNT_HEADERS,
+                timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+                limits=httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_connections),
+                follow_redirects=True,
+                # 크롤링마다 세션이 따로 있어야 하므로 공유 쿠키 저장소에는 아무 쿠키도 저장하지 않음
+                cookies=CookieJar(DefaultCookiePolicy(allowed_domains=[])),
+                transport=self.transport,
+            )
+        return self._client
+
+    async def aclose(self):
+        """연결 풀을 닫습니다 (애플리케이션 종료 시 호출)."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def get_schedule_data(self, start_date, end_date, output_format='json'):
+        """
+        원하는 날짜 범위의 선석 배정 현황을 크롤링 (output_format='json' 형식의 딕셔너리)
+
+        TTL 안의 캐시 결과가 있으면 그대로 반환하고 (cached=True), HPNT에 연결할 수 없으면 같은 기간의
+        마지막 성공 결과에 stale=True를 붙여 반환합니다.
+
+        Raises:
+            CrawlUnavailableError: HPNT에 연결할 수 없고 이전 결과도 없는 경우.
+            ValueError: 응답 페이지에서 스케줄 표나 선박 데이터를 찾지 못한 경우.
+        """
+        key = (start_date, end_date)
+        cached = self.cache.get(start_date, end_date)
+        if cached is not None:
+            return dict(cached, stale=False)
+        if not self.breaker.allow():
+            return self._snapshot_or_raise(key, f"HPNT circuit breaker is open after {self.breaker.failures} failures.")
+
+        try:
+            result = await self._hedged(lambda: self._crawl_with_retries(start_date, end_date))
+        except asyncio.CancelledError:
+            self.breaker.cancel_trial()
+            raise
+        except Exception as e:
+            if not _is_unavailable(e):
+                # 페이지 구조 문제 등 HPNT가 응답은 한 경우의 오류는 그대로 전달
+                self.breaker.record_success()
+                raise
+            self.breaker.record_failure()
+            return self._snapshot_or_raise(key, f"HPNT crawl failed: {e!r}.")
+
+        self.breaker.record_success()
+        self.cache.put(start_date, end_date, result)
+        return dict(result, stale=False, cached=False)
+
+    def _snapshot_or_raise(self, key, reason):
+        snapshot = self.cache.latest(*key)
+        if snapshot is None:
+            raise CrawlUnavailableError(f"{reason} No earlier crawl of {key[0]} ~ {key[1]} to fall back on.",
+                                        retry_after=self.breaker.retry_after() or None)
+        print(f"{reason} Serving the crawl of {snapshot['last_updated']}.")
+        return dict(snapshot, stale=True)
+
+    async def _hedged(self, attempt):
+        """attempt()를 실행하고, hedge_after초 안에 끝나지 않으면 하나 더 실행해 먼저 성공한 결과를 반환합니다."""
+        if self.hedge_after is None:
+            return await attempt()
+
+        tasks = [asyncio.create_task(attempt())]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.hedge_after)
+            if not done:
+                print(f"HPNT crawl slower than {self.hedge_after}s, sending a hedged request.")
+                tasks.append(asyncio.create_task(attempt()))
+            error = None
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _crawl_with_retries(self, start_date, end_date):
+        for attempt in range(self.max_retries + 1):
+            try:
+                return await self._crawl(start_date, end_date)
+            except Exception as e:
+                if attempt == self.max_retries or not _is_unavailable(e):
+                    raise
+                delay = random.uniform(0, self.backoff * 2 ** attempt)
+                print(f"HPNT crawl attempt {attempt + 1} failed ({e!r}), retrying in {delay:.2f}s.")
+                await asyncio.sleep(delay)
+
+    async def _crawl(self, start_date, end_date):
+        """GET으로 세션과 CSRF 토큰을 받고, 필요하면 기간 검색 폼을 POST하여 파싱합니다."""
+        client = self._get_client()
+        initial_response = await client.get(self.base_url)
+        _raise_for_retry(initial_response)
+        # 이 크롤링의 세션 쿠키를 POST에 직접 전달
+        cookie = '; '.join(f"{name}={value}" for name, value in initial_response.cookies.items())
+
+        page = await asyncio.to_thread(parse_hpnt_page, initial_response.text)
+        if page['start'] != start_date or page['end'] != end_date:
+            if not page['has_form']:
+                raise ValueError("No submitForm")
+            form_data = self._build_form_data(None, start_date, end_date, page['csrf_token'])
+            headers = {
+                'Referer': self.base_url,
+                'Origin': 'https://www.hpnt.co.kr',
+                'Content-Type': 'application/x-www-form-urlencoded',
+            }
+            if cookie:
+                headers['Cookie'] = cookie
+            response = await client.post(self.base_url, data=form_data, headers=headers)
+            print(f"post: {response.status_code}")
+            _raise_for_retry(response)
+            page = await asyncio.to_thread(parse_hpnt_page, response.text)
+
+        return self._schedule_from_page(page, 'json', start_date, end_date)
+
+
+def _raise_for_retry(response):
+    if response.status_code == 429 or response.status_code >= 500:
+        raise _RetryableResponse(f"HTTP {response.status_code}")
+    if response.status_code != 200:
+        raise ValueError(f"HTTP error: {response.status_code}")
+
+
+def _is_unavailable(e):
+    """재시도하고 breaker에 반영할 오류 (httpx 연결/타임아웃 오류, 429/5xx 응답)인지 여부"""
+    import httpx
+
+    return isinstance(e, (_RetryableResponse, httpx.TransportError))
+
+
+_async_crawler = None
+
+
+def get_async_crawler():
+    """애플리케이션 전체가 공유하는 `AsyncPortScheduleCrawler` (처음 사용할 때 생성)"""
+    global _async_crawler
+    if _async_crawler is None:
+        _async_crawler = AsyncPortScheduleCrawler()
+    return _async_crawler
+
+
+async def fetch_work_plan_data(start_date, end_date):
+    """
+    `get_work_plan_data(..., output_format='json')`의 비동기 버전. 공유 크롤러로 크롤링합니다.
+
+    반환 딕셔너리의 stale이 True이면 HPNT에 연결할 수 없어 같은 기간의 마지막 성공 결과를 반환한 것입니다.
+    """
+    return await get_async_crawler().get_schedule_data(start_date, end_date)
+
+
 def get_work_plan_data(start_date, end_date, output_format='list'):
     """
     지정된 기간의 선석 계획 데이터를 크롤링하여 DataFrame 또는 JSON으로 반환합니다.
@@ -0,0 +1,328 @@
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+
+from heuristics import first_fit_schedule, waiting_upper_bound
+from schedule import extract_model_inputs, build_solution_df
+from solution_cache import SOLUTION_CACHE, inputs_key
+from solvers import backend_name, cached_solution, solve_inputs
+from solver_pool import THREAD_BUDGET
+
+# 상태 우선순위: 여러 부분 문제의 상태 중 가장 앞쪽(나쁜) 것을 전체 상태로 보고
+STATUS_PRIORITY = ['INTERRUPTED', 'TIME_LIMIT', 'HEURISTIC', 'OPTIMAL']
+
+MAX_WORKERS = os.cpu_count() or 1
+
+_executor = None
+_manager = None
+_executor_lock = threading.Lock()
+
+
+def subset_inputs(inputs, idx):
+    """`extract_model_inputs()` 결과에서 idx 선박만 남긴 입력 (입항 시간 기준 시각은 유지)"""
+    idx = np.asarray(idx)
+    return dict(
+        inputs,
+        s=inputs['s'][idx],
+        a=inputs['a'][idx],
+        l=inputs['l'][idx],
+        fixed=inputs['fixed'][idx],
+        fixed_position=inputs['fixed_position'][idx],
+        merge_keys=[inputs['merge_keys'][i] for i in idx],
+        N=len(idx),
+    )
+
+
+def _merge_overlapping_windows(inputs, radius, labels):
+    """
+    선박 i가 점유할 수 있는 시간 창 [a_i, a_i + radius_i + s_i + buffer)이 겹치는 선박의 요소를 합칩니다.
+
+    시간 창으로 만든 그래프는 구간 그래프이므로 시작 시각 순으로 훑으며 겹치는 창을 병합하면
+    되고, 이미 같은 요소에 속한 선박도 함께 묶습니다.
+
+    Returns:
+        np.ndarray: 선박별 연결 요소 번호 (입항 순서대로 0, 1, ...).
+    """
+    a, s, b = inputs['a'], inputs['s'], inputs['buffer']
+    end = a + radius + s + b
+    parent = list(range(inputs['N']))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(i, j):
+        parent[find(i)] = find(j)
+
+    order = np.argsort(a, kind='stable')
+    reach_ship, reach = None, -np.inf
+    for i in order:
+        if a[i] < reach:
+            union(i, reach_ship)
+        if end[i] > reach:
+            reach_ship, reach = i, end[i]
+    for label in np.unique(labels):
+        members = np.flatnonzero(labels == label)
+        for i in members[1:]:
+            union(i, members[0])
+
+    roots = np.array([find(i) for i in range(inputs['N'])])
+    # 요소 번호를 첫 입항 순서대로 다시 매김
+    _, first = np.unique(roots[order], return_index=True)
+    renumber = {root: k for k, root in enumerate(roots[order][np.sort(first)])}
+    return np.array([renumber[root] for root in roots], dtype=int)
+
+
+def interaction_components(inputs, max_rounds=50):
+    """
+    서로 영향을 줄 수 없는 선박 그룹 (상호작용 그래프의 연결 요소)으로 선박을 분할합니다.
+
+    분할의 각 요소에 대해 휴리스틱 총 대기 시간 상한 W_c를 구하면, 요소를 따로 풀었을 때 선박
+    i의 대기 시간은 W_c 이하입니다. 따라서 시간 창 [a_i, a_i + W_c + s_i + buffer)이 다른 요소의
+    창과 겹치지 않는 분할이라면 요소별 최적해를 합친 스케줄은 실행 가능하고, 요소별 최적값의
+    합은 전체 최적값 이하이므로 원래 문제의 최적해입니다.
+
+    선박 한 척씩에서 시작해, 겹치는 창을 가진 요소를 합치고 상한을 다시 계산하는 과정을 더 이상
+    합쳐지지 않을 때까지 반복합니다. 고정 선박의 시간 창은 대기 시간 0 기준입니다.
+
+    Args:
+        inputs (dict): `extract_model_inputs()`의 반환값.
+        max_rounds (int): 최대 반복 횟수. 넘으면 전체를 하나의 요소로 반환합니다.
+
+    Returns:
+        list: 연결 요소별 선박 인덱스 배열 리스트 (첫 입항 순서).
+    """
+    labels = np.arange(inputs['N'])
+    radius = np.zeros(inputs['N'])
+
+    for _ in range(max_rounds):
+        merged = _merge_overlapping_windows(inputs, radius, labels)
+        # 더 이상 합쳐지지 않으면 현재 분할은 자기 상한으로 만든 시간 창과 모순이 없음
+        if len(np.unique(merged)) == len(np.unique(labels)):
+            return [np.flatnonzero(labels == label) for label in np.unique(labels)]
+        labels = merged
+
+        # 합쳐진 요소별 상한으로 시간 창을 다시 계산
+        for label in np.unique(labels):
+            idx = np.flatnonzero(labels == label)
+            if len(idx) > 1:
+                bound = waiting_upper_bound(subset_inputs(inputs, idx))
+                radius[idx] = np.where(inputs['fixed'][idx], 0.0, bound)
+
+    return [np.arange(inputs['N'])]
+
+
+def _get_executor():
+    """부분 문제 풀이용 프로세스 풀과 취소 이벤트 공유용 Manager (처음 사용할 때 생성)"""
+    global _executor, _manager
+    with _executor_lock:
+        if _executor is None:
+            # 서버는 여러 스레드를 사용하므로 fork 대신 spawn
+            context = multiprocessing.get_context('spawn')
+            _manager = context.Manager()
+            _executor = ProcessPoolExecutor(max_workers=MAX_WORKERS, mp_context=context)
+        return _executor, _manager
+
+
+def shutdown_executor():
+    """프로세스 풀 종료 (애플리케이션 종료 시 호출)"""
+    global _executor, _manager
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(cancel_futures=True)
+            _manager.shutdown()
+            _executor = _manager = None
+
+
+def _solve_component(inputs, shared_cancel_event, backend, deadline, mip_gap, threads, incumbent_queue=None, component=None,
+                     candidate=None):
+    """
+    프로세스 풀 작업: 공유 취소 이벤트를 지역 이벤트로 옮겨 부분 문제를 풉니다.
+    incumbent_queue가 있으면 새 incumbent를 (component, start, position)으로 넣습니다.
+    해 캐시는 부모 프로세스에서 찾고 저장하므로 작업 프로세스에서는 사용하지 않고, 부모가 캐시에서 만든
+    초기해 후보 (candidate)를 받습니다.
+    """
+    cancel_event = threading.Event()
+    done = threading.Event()
+
+    def _watch_cancel():
+        # 솔버 콜백마다 Manager 프록시를 호출하지 않도록 별도 스레드에서 0.1초마다 확인
+        while not done.wait(0.1):
+            if shared_cancel_event.is_set():
+                cancel_event.set()
+                return
+
+    watcher = threading.Thread(target=_watch_cancel, daemon=True)
+    watcher.start()
+    try:
+        time_limit = None if deadline is None else max(deadline - time.time(), 0.0)
+        on_incumbent = None
+        if incumbent_queue is not None:
+            def on_incumbent(start, position):
+                incumbent_queue.put((component, start, position))
+
+        return solve_inputs(inputs, cancel_event, backend, time_limit, mip_gap, cache=None, threads=threads,
+                            on_incumbent=on_incumbent, candidate=candidate)
+    finally:
+        done.set()
+        watcher.join()
+
+
+def _drain_incumbents(incumbent_queue, publish):
+    """작업 프로세스가 보낸 (component, start, position)을 모두 꺼내 publish에 전달합니다."""
+    if incumbent_queue is None:
+        return
+    while not incumbent_queue.empty():
+        publish(*incumbent_queue.get())
+
+
+def _combine_solve_info(infos, runtime, n_components):
+    """부분 문제의 solve_info를 하나로 합칩니다 (목적함수와 하한은 합)."""
+    status = min((info['status'] for info in infos),
+                 key=lambda s: STATUS_PRIORITY.index(s) if s in STATUS_PRIORITY else -1)
+
+    objective = sum(info['objective'] for info in infos)
+    bounds = [info['bound'] for info in infos]
+    bound = sum(bounds) if all(b is not None for b in bounds) else None
+    gap = None
+    if bound is not None:
+        gap = (objective - bound) / objective if objective > 1e-9 else 0.0
+    return {
+        'status': status,
+        'objective': objective,
+        'bound': bound,
+        'gap': gap,
+        'runtime': runtime,
+        'backend': infos[0]['backend'] if infos else None,
+        'components': n_components,
+        'cached': all(info.get('cached', False) for info in infos),
+    }
+
+
+def solve_decomposed(processed_df, cancel_event, fixed_ship_merge_keys=None, backend=None, time_limit=None, mip_gap=None,
+                     parallel=True, on_incumbent=None):
+    """
+    상호작용 그래프의 연결 요소별로 선석 배정 문제를 나누어 풀고 결과를 합칩니다.
+
+    한 척짜리 요소는 바로 입항 시간, 부두 왼쪽 끝 (고정 위치가 있으면 그 위치)에 배정하고, 두 척 이상인
+    요소가 여러 개이면 프로세스 풀에서 병렬로 풉니다. 요소가 하나뿐이면 현재 프로세스에서 그대로 풉니다. 작업 프로세스마다
+    메모리 캐시가 따로 있으므로 병렬로 풀 때도 요소별 해 캐시는 현재 프로세스에서 찾고 저장합니다.
+    반환 형식은 `solve_schedule()`과 같으며 solve_info에 components (요소 수)가 추가됩니다.
+
+    on_incumbent가 있으면 먼저 요소별 first-fit 스케줄을 합친 전체 스케줄로 한 번 호출하고, 이후 어느
+    요소에서든 더 좋은 해를 찾을 때마다 그 요소만 바꾼 전체 스케줄로 호출합니다. 요소별 해의 대기
+    시간은 분해에 사용한 상한 이하이므로 합친 스케줄은 항상 실행 가능합니다.
+
+    Args:
+        processed_df (pd.DataFrame): 전처리 및 예측이 완료된 데이터프레임.
+        cancel_event (threading.Event): 최적화 중단을 위한 이벤트 객체.
+        fixed_ship_merge_keys (list, optional): 스케줄을 고정할 선박의 merge_key 리스트.
+        backend (str, optional): 솔버 백엔드 이름. `solvers.get_backend()` 참고.
+        time_limit (float, optional): 전체 최대 풀이 시간 (초). 모든 요소가 같은 마감 시각을 공유합니다.
+        mip_gap (float, optional): 요소별 상대 gap 허용치.
+        parallel (bool): False이면 요소를 현재 프로세스에서 차례로 풉니다.
+        on_incumbent (callable, optional): 중간 스케줄 (반환값과 같은 형식의 데이터프레임, status는
+                                           'INCUMBENT')을 받는 함수.
+
+    Returns:
+        pd.DataFrame: 선석 배정 결과. 어느 한 요소라도 해가 없으면 None.
+    """
+    begin = time.time()
+    inputs = extract_model_inputs(processed_df, fixed_ship_merge_keys)
+    components = interaction_components(inputs)
+    deadline = None if time_limit is None else begin + time_limit
+    logging.info(f"Decomposed {inputs['N']} ships into {len(components)} independent components "
+                 f"(largest {max((len(c) for c in components), default=0)} ships).")
+
+    start = inputs['a'].copy()
+    # 한 척짜리 요소는 first_fit_schedule()과 같이 고정 위치를 유지
+    position = np.nan_to_num(inputs['fixed_position'], nan=0.0)
+    infos = []
+
+    groups = [idx for idx in components if len(idx) > 1]
+    publish = None
+    if on_incumbent is not None:
+        best = np.full(len(groups), np.inf)
+
+        def publish(k, component_start, component_position):
+            idx = groups[k]
+            # 솔버가 더 나쁜 해를 다시 알리는 경우가 있으므로 요소의 최선해가 좋아질 때만 전달
+            objective = float((component_start - inputs['a'][idx]).sum())
+            if objective >= best[k] - 1e-6:
+                return
+            best[k] = objective
+            start[idx], position[idx] = component_start, component_position
+            if np.isfinite(best).all():
+                df_incumbent = build_solution_df(processed_df, inputs, start, position)
+                df_incumbent.attrs['solve_info'] = {'status': 'INCUMBENT', 'objective': float((start - inputs['a']).sum()),
+                                                    'runtime': time.time() - begin}
+                on_incumbent(df_incumbent)
+
+        for k, idx in enumerate(groups):
+            sub = subset_inputs(inputs, idx)
+            initial = first_fit_schedule(sub['a'], sub['s'], sub['l'], sub['fixed'], sub['L'], sub['buffer'],
+                                         fixed_position=sub['fixed_position'])
+            if initial is not None:
+                publish(k, *initial)
+
+    # 이 요청이 받은 스레드 몫을 동시에 실행되는 요소들이 나누어 사용
+    with THREAD_BUDGET.lease() as threads:
+        if len(groups) > 1 and parallel:
+            name = backend_name(backend)
+            time_left = None if deadline is None else max(deadline - time.time(), 0.0)
+            results, candidates, pending = [None] * len(groups), [None] * len(groups), []
+            for k, idx in enumerate(groups):
+                results[k], candidates[k] = cached_solution(subset_inputs(inputs, idx), name, time_left, mip_gap)
+                if results[k] is None:
+                    pending.append(k)
+
+            if pending:
+                executor, manager = _get_executor()
+                shared_cancel_event = manager.Event()
+                incumbent_queue = manager.Queue() if publish is not None else None
+                component_threads = max(threads // min(len(pending), MAX_WORKERS), 1)
+                futures = [executor.submit(_solve_component, subset_inputs(inputs, groups[k]), shared_cancel_event, name,
+                                           deadline, mip_gap, component_threads, incumbent_queue, k, candidates[k])
+                           for k in pending]
+
+                # 요청이 취소되면 작업 프로세스에 전달하고, 작업 프로세스가 찾은 incumbent를 전달
+                while not all(future.done() for future in futures):
+                    if cancel_event.is_set():
+                        shared_cancel_event.set()
+                    _drain_incumbents(incumbent_queue, publish)
+                    time.sleep(0.05)
+                _drain_incumbents(incumbent_queue, publish)
+                for k, future in zip(pending, futures):
+                    results[k] = future.result()
+                    sub = subset_inputs(inputs, groups[k])
+                    if results[k][0] is not None:
+                        SOLUTION_CACHE.put(inputs_key(sub, name), sub, *results[k][0], results[k][1],
+                                           time_limit=time_left, mip_gap=mip_gap)
+        else:
+            results = []
+            for k, idx in enumerate(groups):
+                time_left = None if deadline is None else max(deadline - time.time(), 0.0)
+                results.append(solve_inputs(subset_inputs(inputs, idx), cancel_event, backend, time_left, mip_gap,
+                                            threads=threads,
+                                            on_incumbent=partial(publish, k) if publish is not None else None))
+
+    for idx, (solution, info) in zip(groups, results):
+        if solution is None:
+            print(f"No schedule found for a component of {len(idx)} ships ({info['status']}).")
+            return None
+        start[idx], position[idx] = solution
+        infos.append(info)
+
+    df_solution = build_solution_df(processed_df, inputs, start, position)
+    if not infos:
+        infos = [{'status': 'OPTIMAL', 'objective': 0.0, 'bound': 0.0, 'backend': backend}]
+    df_solution.attrs['solve_info'] = _combine_solve_info(infos, time.time() - begin, len(components))
+    return df_solution
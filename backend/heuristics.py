@@ -0,0 +1,243 @@
+import numpy as np
+import math
+import time
+
+EPS = 1e-6
+
+
+def first_fit_schedule(a, s, l, fixed, L, buffer_minutes, order=None, fixed_position=None):
+    """
+    선박을 주어진 순서대로 하나씩 배정하는 first-fit 구성 휴리스틱.
+
+    각 선박에 대해 가능한 가장 이른 시작 시간을 찾고, 그 시간에 겹치는 (버퍼 포함) 선박들을
+    피해 부두 왼쪽부터 들어갈 수 있는 첫 위치에 배치합니다. 시작 시간 후보는 입항 시간과
+    이미 배정된 선박의 (종료 + 버퍼) 시각이며, 마지막 후보에서는 겹치는 선박이 없으므로
+    비고정 선박은 항상 배정됩니다. 고정 선박은 입항 시간에만 배정할 수 있습니다.
+
+    Args:
+        a (np.ndarray): 입항 시간 (분).
+        s (np.ndarray): 작업 소요 시간 (분).
+        l (np.ndarray): 선박 길이 (m).
+        fixed (np.ndarray): 고정 선박 마스크 (시작 시간 = 입항 시간).
+        L (float): 부두 길이 (m).
+        buffer_minutes (float): 선석 간격 시간 (분).
+        order (array-like, optional): 비고정 선박 배정 순서. 기본값은 입항 순서 (FCFS).
+                                      고정 선박은 항상 먼저 배정됩니다.
+        fixed_position (np.ndarray, optional): 선석 위치까지 고정할 선박의 위치 (m, 나머지는 NaN).
+
+    Returns:
+        tuple: (start, position) 배열. 고정 선박끼리 배치할 수 없으면 None.
+    """
+    N = len(a)
+    start = np.zeros(N)
+    position = np.zeros(N)
+    placed = np.zeros(N, dtype=bool)
+
+    fixed_order = np.flatnonzero(fixed)[np.argsort(a[fixed], kind='stable')]
+    if order is None:
+        free = np.flatnonzero(~fixed)
+        order = free[np.argsort(a[free], kind='stable')]
+    else:
+        order = [i for i in order if not fixed[i]]
+
+    for i in list(fixed_order) + list(order):
+        placed_idx = np.flatnonzero(placed)
+        if fixed[i]:
+            candidate_times = [a[i]]
+        else:
+            releases = start[placed_idx] + s[placed_idx] + buffer_minutes
+            candidate_times = np.unique(np.concatenate([[a[i]], releases[releases > a[i]]]))
+
+        for t in candidate_times:
+            # t 에 시작할 때 시간상 겹치는 (버퍼 포함) 선박
+            overlap = ~((t + s[i] + buffer_minutes <= start[placed_idx] + EPS) |
+                        (start[placed_idx] + s[placed_idx] + buffer_minutes <= t + EPS))
+            busy = placed_idx[overlap]
+            if fixed_position is not None and not np.isnan(fixed_position[i]):
+                x = _fits_at(fixed_position[i], position[busy], l[busy], l[i], L)
+            else:
+                x = _first_fit_position(position[busy], l[busy], l[i], L)
+            if x is not None:
+                start[i], position[i] = t, x
+                placed[i] = True
+                break
+        else:
+            return None
+
+    return start, position
+
+
+def _first_fit_position(busy_pos, busy_len, length, L):
+    """점유 구간 [busy_pos, busy_pos + busy_len)을 피해 길이 length가 들어가는 가장 왼쪽 위치"""
+    for x in np.sort(np.concatenate([[0.0], busy_pos + busy_len])):
+        if x + length > L + EPS:
+            break
+        if _fits_at(x, busy_pos, busy_len, length, L) is not None:
+            return x
+    return None
+
+
+def _fits_at(x, busy_pos, busy_len, length, L):
+    """위치 x에 길이 length가 점유 구간과 겹치지 않고 들어가면 x, 아니면 None"""
+    if x < -EPS or x + length > L + EPS:
+        return None
+    if np.all((x + length <= busy_pos + EPS) | (busy_pos + busy_len <= x + EPS)):
+        return x
+    return None
+
+
+def insert_ship(start, position, s, l, a_new, s_new, l_new, L, buffer_minutes):
+    """
+    기존 스케줄을 바꾸지 않고 새 선박 한 척을 가장 이른 시간에 배정합니다.
+
+    기존 선박들의 점유 직사각형 (시간 [start, start + s + buffer) x 선석 [position, position + l))은
+    그대로 두고, 새 선박이 들어갈 수 있는 가장 이른 시작 시간을 찾습니다. 그런 시간은 입항 시간
+    또는 기존 선박의 (종료 + 버퍼) 시각 중 하나이므로 후보를 모두 확인하면 새 선박 한 척에 대한
+    최적 (최소 대기) 배정이 됩니다. 같은 시간에 여러 위치가 가능하면 남는 틈이 가장 작은 위치
+    (best-fit)를 고릅니다.
+
+    Args:
+        start, position, s, l (np.ndarray): 기존 선박의 시작 시간 (분), 선석 위치, 작업 시간, 길이.
+        a_new, s_new, l_new (float): 새 선박의 입항 시간 (분), 작업 시간 (분), 길이 (m).
+        L (float): 부두 길이 (m).
+        buffer_minutes (float): 선석 간격 시간 (분).
+
+    Returns:
+        tuple: 새 선박의 (시작 시간, 선석 위치). 부두보다 길면 None.
+    """
+    if l_new > L + EPS:
+        return None
+    releases = start + s + buffer_minutes
+    for t in np.unique(np.concatenate([[a_new], releases[releases > a_new]])):
+        overlap = ~((t + s_new + buffer_minutes <= start + EPS) | (releases <= t + EPS))
+        x = _best_fit_position(position[overlap], l[overlap], l_new, L)
+        if x is not None:
+            return t, x
+    return None
+
+
+def _best_fit_position(busy_pos, busy_len, length, L):
+    """점유 구간 사이의 빈 틈 중 길이 length가 들어가고 남는 길이가 가장 작은 틈의 왼쪽 위치"""
+    order = np.argsort(busy_pos)
+    edges_left = np.concatenate([[0.0], (busy_pos + busy_len)[order]])
+    edges_right = np.concatenate([busy_pos[order], [L]])
+    # 겹치는 구간이 있을 수 있으므로 왼쪽 경계는 누적 최댓값
+    edges_left = np.maximum.accumulate(edges_left)
+    gaps = edges_right - edges_left
+    fits = np.flatnonzero(gaps >= length - EPS)
+    if fits.size == 0:
+        return None
+    return float(edges_left[fits[np.argmin(gaps[fits])]])
+
+
+def waiting_upper_bound(inputs, schedule=None):
+    """
+    실행 가능한 스케줄의 총 대기 시간 (분) = 최적해 총 대기 시간의 상한.
+
+    입항 순서 first-fit 휴리스틱 스케줄과, 모든 비고정 선박을 한 척씩 (시간상 겹치지 않게)
+    배정하는 직렬 스케줄 중 작은 값을 사용합니다.
+
+    Args:
+        inputs (dict): `extract_model_inputs()`의 반환값.
+        schedule (tuple, optional): 이미 계산한 `first_fit_schedule()` 결과 (start, position).
+    """
+    s, a, fixed, b = inputs['s'], inputs['a'], inputs['fixed'], inputs['buffer']
+
+    cursor = (a[fixed] + s[fixed] + b).max() if fixed.any() else -np.inf
+    bound = 0.0
+    for i in np.flatnonzero(~fixed)[np.argsort(a[~fixed], kind='stable')]:
+        start = max(a[i], cursor)
+        bound += start - a[i]
+        cursor = start + s[i] + b
+
+    if schedule is None:
+        schedule = first_fit_schedule(a, s, inputs['l'], fixed, inputs['L'], b, fixed_position=inputs['fixed_position'])
+    if schedule is not None:
+        bound = min(bound, float((schedule[0] - a).sum()))
+    return bound
+
+
+def simulated_annealing(a, s, l, fixed, L, buffer_minutes, time_limit=10.0, max_iterations=None, seed=0,
+                        cancel_event=None, neighborhood=5, patience=5000, initial_order=None, fixed_position=None):
+    """
+    배정 순서(우선순위 리스트)에 대한 simulated annealing.
+
+    해 표현은 비고정 선박의 배정 순서이며, `first_fit_schedule()`로 시작 시간과 선석 위치로
+    디코딩합니다. 초기해는 입항 순서(FCFS) 또는 주어진 순서이고, 이웃해는 순서상 가까운 (neighborhood 이내) 두
+    선박의 교환 또는 한 선박의 재삽입입니다. 총 대기 시간이 목적함수입니다.
+
+    Args:
+        a, s, l, fixed, L, buffer_minutes: `first_fit_schedule()` 참고.
+        time_limit (float): 최대 탐색 시간 (초).
+        max_iterations (int, optional): 최대 반복 횟수.
+        seed (int): 난수 시드.
+        cancel_event (threading.Event, optional): 설정되면 탐색을 중단하고 현재 최선해를 반환.
+        neighborhood (int): 이웃해 생성 시 교환/재삽입 거리의 최댓값.
+        patience (int): 최선해가 이 횟수 동안 개선되지 않으면 조기 종료.
+        initial_order (array-like, optional): 초기 배정 순서. 기본값은 입항 순서 (FCFS).
+        fixed_position (np.ndarray, optional): `first_fit_schedule()` 참고.
+
+    Returns:
+        dict: 최선해의 start, position, objective 및 iterations, runtime. 실행 가능해가 없으면 None.
+    """
+    rng = np.random.default_rng(seed)
+    if initial_order is None:
+        free = np.flatnonzero(~fixed)
+        initial_order = free[np.argsort(a[free], kind='stable')]
+    order = [int(i) for i in initial_order if not fixed[i]]
+
+    def evaluate(candidate):
+        schedule = first_fit_schedule(a, s, l, fixed, L, buffer_minutes, order=candidate, fixed_position=fixed_position)
+        if schedule is None:
+            return None, math.inf
+        return schedule, float((schedule[0] - a).sum())
+
+    begin = time.time()
+    current_schedule, current_cost = evaluate(order)
+    if current_schedule is None:
+        return None
+    best_schedule, best_cost = current_schedule, current_cost
+
+    n = len(order)
+    temperature = max(current_cost * 0.05, 1.0)
+    cooling = 0.995
+    iterations = 0
+    last_improvement = 0
+
+    while n > 1 and best_cost > EPS:
+        if time.time() - begin >= time_limit:
+            break
+        if max_iterations is not None and iterations >= max_iterations:
+            break
+        if cancel_event is not None and cancel_event.is_set():
+            break
+        if iterations - last_improvement >= patience:
+            break
+        iterations += 1
+
+        i = int(rng.integers(n))
+        j = int(np.clip(i + rng.integers(-neighborhood, neighborhood + 1), 0, n - 1))
+        if i == j:
+            continue
+        candidate = list(order)
+        if rng.random() < 0.5:
+            candidate[i], candidate[j] = candidate[j], candidate[i]
+        else:
+            candidate.insert(j, candidate.pop(i))
+
+        schedule, cost = evaluate(candidate)
+        delta = cost - current_cost
+        if delta <= 0 or rng.random() < math.exp(-delta / temperature):
+            order, current_schedule, current_cost = candidate, schedule, cost
+            if cost < best_cost - EPS:
+                best_schedule, best_cost = schedule, cost
+                last_improvement = iterations
+        temperature = max(temperature * cooling, 1e-3)
+
+    return {
+        'start': best_schedule[0],
+        'position': best_schedule[1],
+        'objective': best_cost,
+        'iterations': iterations,
+        'runtime': time.time() - begin,
+    }
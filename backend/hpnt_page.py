@@ -0,0 +1,148 @@
+import html
+import re
+
+# 한 번의 스캔에서 찾는 토큰: 주석, script/style 블록 (통째로 건너뜀), 크롤러가 사용하는 태그의 시작/끝
+_TOKEN_PATTERN = re.compile(
+    r'<!--.*?-->'
+    r'|<(script|style)\b[^>]*>(.*?)</\1\s*>'
+    r'|<(/?)(input|form|div|table|tbody|tr|td|th)\b([^>]*)>',
+    re.IGNORECASE | re.DOTALL,
+)
+_ATTR_PATTERN = re.compile(r'''([^\s=/>]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+)))?''')
+_STRIP_PATTERN = re.compile(r'<!--.*?-->|<[^>]*>', re.DOTALL)
+
+# name: 'CSRF_TOKEN', value:'...' 구조 (JS 코드 내에서)
+_CSRF_PATTERN = re.compile(r"name\s*:\s*['\"]CSRF_TOKEN['\"].*?value\s*:\s*['\"]([^'\"]+)['\"]", re.DOTALL)
+
+SCHEDULE_TABLE_CLASS = 'tblType_08'
+
+
+def _attrs(text):
+    """태그의 속성 문자열을 {이름 (소문자): 값} 딕셔너리로 변환"""
+    attrs = {}
+    for name, double, single, bare in _ATTR_PATTERN.findall(text):
+        attrs.setdefault(name.lower(), html.unescape(double or single or bare))
+    return attrs
+
+
+def _cell_text(fragment):
+    """셀 HTML 조각의 텍스트 (안쪽 태그와 주석을 제거하고 HTML 엔티티를 변환)"""
+    if '<' in fragment:
+        fragment = _STRIP_PATTERN.sub('', fragment)
+    if '&' in fragment:
+        fragment = html.unescape(fragment)
+    return fragment
+
+
+def parse_hpnt_page(html_content):
+    """
+    HPNT 선석 배정 현황 페이지에서 크롤러가 쓰는 값을 한 번의 스캔으로 추출합니다.
+
+    트리를 만들지 않고 필요한 태그만 정규식으로 찾아 상태를 따라갑니다. 주석과 script/style 안의
+    태그는 무시하고, CSRF 토큰은 script 블록을 지나갈 때 찾습니다 (없으면 페이지 전체에서 찾음).
+    스케줄 표는 class에 tblType_08이 있는 첫 div 다음의 첫 table이며, tbody가 있으면 첫 tbody의
+    행만 사용합니다. th가 있는 행 (헤더)은 건너뜁니다.
+
+    Args:
+        html_content (str): 페이지 HTML.
+
+    Returns:
+        dict: start, end (기간 입력 strdStDate/strdEdDate의 값, 없으면 ''), has_form (submitForm
+        존재 여부), csrf_token (없으면 ''), rows (셀 텍스트 목록의 목록, 표가 없으면 None).
+    """
+    page = {'start': None, 'end': None, 'has_form': False, 'csrf_token': '', 'rows': None}
+    table_armed = False  # tblType_08 div를 지났고 아직 표를 찾지 못함
+    table_depth = 0  # 스케줄 표 안의 table 중첩 깊이 (0이면 표 밖)
+    tbody_state = None  # None: tbody 없음, 'open': 첫 tbody 안, 'closed': 첫 tbody 끝
+    all_rows, tbody_rows = [], []
+    row = cell_start = None
+    has_th = False
+
+    def close_cell(position):
+        nonlocal cell_start
+        if cell_start is not None:
+            row.append(_cell_text(html_content[cell_start:position]))
+            cell_start = None
+
+    def close_row(position):
+        nonlocal row
+        if row is None:
+            return
+        close_cell(position)
+        if row and not has_th:
+            all_rows.append(row)
+            if tbody_state == 'open':
+                tbody_rows.append(row)
+        row = None
+
+    for match in _TOKEN_PATTERN.finditer(html_content):
+        raw_tag, script, closing, tag, attr_text = match.groups()
+        if raw_tag is not None:
+            if not page['csrf_token']:
+                token = _CSRF_PATTERN.search(script)
+                if token:
+                    page['csrf_token'] = token.group(1)
+            continue
+        if tag is None:
+            continue  # 주석
+        tag = tag.lower()
+
+        if tag == 'input':
+            if 'strd' in attr_text and (page['start'] is None or page['end'] is None):
+                attrs = _attrs(attr_text)
+                if attrs.get('name') == 'strdStDate' and page['start'] is None:
+                    page['start'] = attrs.get('value', '')
+                elif attrs.get('name') == 'strdEdDate' and page['end'] is None:
+                    page['end'] = attrs.get('value', '')
+        elif tag == 'form':
+            if not closing and not page['has_form'] and 'submitForm' in attr_text:
+                page['has_form'] = _attrs(attr_text).get('name') == 'submitForm'
+        elif tag == 'div':
+            if (not closing and page['rows'] is None and not table_armed and SCHEDULE_TABLE_CLASS in attr_text
+                    and SCHEDULE_TABLE_CLASS in _attrs(attr_text).get('class', '').split()):
+                table_armed = True
+        elif tag == 'table':
+            if closing:
+                if table_depth:
+                    table_depth -= 1
+                    if table_depth == 0:
+                        close_row(match.start())
+                        page['rows'] = tbody_rows if tbody_state is not None else all_rows
+            elif table_depth:
+                table_depth += 1
+            elif table_armed:
+                table_armed = False
+                table_depth = 1
+        elif not table_depth:
+            continue
+        elif tag == 'tbody':
+            if not closing and tbody_state is None:
+                tbody_state = 'open'
+            elif closing and tbody_state == 'open':
+                close_row(match.start())
+                tbody_state = 'closed'
+        elif tag == 'tr':
+            close_row(match.start())
+            if not closing:
+                row, has_th = [], False
+        elif row is not None:
+            # td / th
+            close_cell(match.start())
+            if not closing:
+                if tag == 'th':
+                    has_th = True
+                else:
+                    cell_start = match.end()
+
+    if table_depth:
+        # 닫히지 않은 표
+        close_row(len(html_content))
+        page['rows'] = tbody_rows if tbody_state is not None else all_rows
+
+    if not page['csrf_token']:
+        token = _CSRF_PATTERN.search(html_content)
+        if token:
+            page['csrf_token'] = token.group(1)
+    page['start'] = page['start'] or ''
+    page['end'] = page['end'] or ''
+    return page
@@ -0,0 +1,132 @@
+import asyncio
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from solver_queue import SOLVER_QUEUE
+
+# 끝난 작업을 조회할 수 있도록 보관하는 시간 (초), 끝나지 않은 작업을 취소하는 시간 (초)과 최대 보관 개수
+JOB_TTL_SECONDS = 3600
+JOB_MAX_AGE_SECONDS = 2 * 3600
+MAX_JOBS = 256
+
+# 작업 상태: queued (크롤링, 예측, 풀이 슬롯 대기) -> running (풀이 중) -> succeeded / failed / cancelled
+FINISHED_STATUSES = ('succeeded', 'failed', 'cancelled')
+
+
+class Job:
+    """
+    백그라운드에서 실행되는 최적화 작업 하나.
+
+    상태나 incumbent가 바뀔 때마다 version이 증가하며, `wait_for_change()`로 다음 변경을 기다릴 수
+    있습니다. `publish_incumbent()`는 솔버 스레드에서 호출해도 안전합니다.
+    """
+
+    def __init__(self, kind):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.status = 'queued'
+        self.created = time.time()
+        self.finished = None
+        self.cancel_event = threading.Event()
+        self.result = None
+        self.solve_info = None
+        self.error = None
+        self.incumbent = None
+        self.incumbents = 0
+        self.version = 0
+        self.task = None
+        self._loop = asyncio.get_running_loop()
+        self._changed = asyncio.Event()
+
+    def to_dict(self, include_result=False):
+        info = {
+            'job_id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'created': self.created,
+            'finished': self.finished,
+            'incumbents': self.incumbents,
+            'solve_info': self.solve_info,
+            'error': self.error,
+        }
+        if include_result:
+            info['result'] = self.result
+        return info
+
+    def set_status(self, status):
+        self.status = status
+        if status in FINISHED_STATUSES:
+            self.finished = time.time()
+        self._notify()
+
+    def cancel(self):
+        """끝나지 않은 작업을 취소합니다. 대기열에 있으면 바로 빠지고, 풀이 중이면 현재 최선해로 끝납니다."""
+        if self.status not in FINISHED_STATUSES:
+            self.cancel_event.set()
+            SOLVER_QUEUE.cancel(self.cancel_event)
+
+    def publish_incumbent(self, incumbent):
+        """새 incumbent (임의의 객체)를 저장하고 기다리는 쪽에 알립니다."""
+        self.incumbent = incumbent
+        self.incumbents += 1
+        self._loop.call_soon_threadsafe(self._notify)
+
+    async def wait_for_change(self, version, timeout=None):
+        """version 이후의 변경이 있을 때까지 (또는 timeout초) 기다립니다. 현재 version을 반환합니다."""
+        while self.version == version:
+            changed = self._changed
+            try:
+                await asyncio.wait_for(changed.wait(), timeout)
+            except asyncio.TimeoutError:
+                break
+        return self.version
+
+    def _notify(self):
+        self.version += 1
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+
+class JobStore:
+    """
+    작업 id로 작업을 찾는 저장소. 새 작업을 만들 때 ttl_seconds가 지난 끝난 작업과 max_age_seconds가 지난
+    끝나지 않은 작업 (취소)을 정리하고, 그래도 max_jobs개이면 끝난 작업, 오래된 작업 순으로 정리합니다.
+    """
+
+    def __init__(self, ttl_seconds=JOB_TTL_SECONDS, max_jobs=MAX_JOBS, max_age_seconds=JOB_MAX_AGE_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self.max_jobs = max_jobs
+        self.max_age_seconds = max_age_seconds
+        self._jobs = OrderedDict()
+
+    def create(self, kind):
+        self._evict()
+        job = Job(kind)
+        self._jobs[job.id] = job
+        return job
+
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+    def _evict(self):
+        now = time.time()
+        for job in [job for job in self._jobs.values() if self._expired(job, now)]:
+            self._remove(job)
+        # 정렬은 안정적이므로 같은 그룹 안에서는 만든 순서 유지
+        oldest = sorted(self._jobs.values(), key=lambda job: job.status not in FINISHED_STATUSES)
+        while len(self._jobs) >= self.max_jobs:
+            self._remove(oldest.pop(0))
+
+    def _expired(self, job, now):
+        if job.status in FINISHED_STATUSES:
+            return now - job.finished > self.ttl_seconds
+        return now - job.created > self.max_age_seconds
+
+    def _remove(self, job):
+        job.cancel()
+        del self._jobs[job.id]
+
+
+JOBS = JobStore()
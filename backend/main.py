@@ -1,17 +1,33 @@
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
 from datetime import date, datetime, timedelta
-from typing import List
+from typing import Callable, List, Literal, Optional
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 import numpy as np
 import json
 import asyncio
 import threading
+import time
+import uuid
 
-from crawling import get_work_plan_data
+from crawling import fetch_work_plan_data, get_async_crawler, CrawlUnavailableError
+from crawl_cache import CRAWL_CACHE
 from prediction import predict_work_time
-from optimization import run_milp_model
+from prediction_cache import PREDICTION_CACHE
+from model_registry import MODEL_REGISTRY
+from vessel_registry import VESSEL_REGISTRY
+from decomposition import solve_decomposed, shutdown_executor
+from solver_pool import GUROBI_ENV_POOL
+from solver_queue import SOLVER_QUEUE, QueueRejected, INTERACTIVE, BULK
+from jobs import JOBS, Job, FINISHED_STATUSES
+from rolling_horizon import solve_rolling_horizon, longest_component_days, DEFAULT_SLICE_HOURS, DEFAULT_OVERLAP_HOURS
+from heuristics import insert_ship, waiting_upper_bound
+from schedule import extract_model_inputs, build_solution_df
 
 app = FastAPI(
     title="Berth Allocation and Prediction Optimization (BAIPOT) API",
@@ -32,17 +48,76 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Solve-Status", "X-Objective", "X-Objective-Bound", "X-MIP-Gap", "X-Solve-Time", "X-Solver-Backend", "X-Solve-Components", "X-Solve-Slices", "X-Solve-Cached", "X-Queue-Wait", "Retry-After", "X-Dataset-Id", "X-Crawl-Stale", "X-Crawl-Cached", "X-Crawled-At", "X-Model-Version", "X-Prediction-Rows"],
 )
 
+# Default solver time budget (seconds) for interactive requests
+DEFAULT_TIME_LIMIT = 30.0
+
+SOLVE_INFO_HEADERS = {
+    'status': 'X-Solve-Status',
+    'objective': 'X-Objective',
+    'bound': 'X-Objective-Bound',
+    'gap': 'X-MIP-Gap',
+    'runtime': 'X-Solve-Time',
+    'backend': 'X-Solver-Backend',
+    'components': 'X-Solve-Components',
+    'slices': 'X-Solve-Slices',
+    'cached': 'X-Solve-Cached',
+    'queue_wait': 'X-Queue-Wait',
+}
+
+# Optimized base schedules kept for the incremental ETD calculator, keyed by crawl window
+BASE_SCHEDULE_CACHE_SIZE = 8
+BASE_SCHEDULE_TTL_SECONDS = 600
+# An inserted ship that would wait longer than this (minutes) is scheduled by re-optimizing the window instead
+ETD_INSERTION_MAX_WAIT_MINUTES = 60
+_base_schedules: "OrderedDict[tuple, dict]" = OrderedDict()
+
+# Prepared (crawled and predicted) data returned by /schedule/prepare, keyed by the X-Dataset-Id it was sent with
+DATASET_CACHE_SIZE = 16
+DATASET_TTL_SECONDS = 1800
+_datasets: "OrderedDict[str, dict]" = OrderedDict()
+
+# In-flight crawl and prediction per (start_date, end_date), and how prepared data was obtained:
+# hits (no new crawl) = dataset_hits (dataset_id reuse) + coalesced (joined a crawl already in flight),
+# misses (new crawl)
+_prepare_tasks: "dict[tuple, asyncio.Task]" = {}
+PREPARE_STATS = {'hits': 0, 'dataset_hits': 0, 'coalesced': 0, 'misses': 0}
+
+# Work time prediction is CPU-bound (pandas feature preparation + LightGBM); it gets its own small thread pool
+# so a burst of predictions cannot take every thread of the default pool used for crawls and solves
+PREDICTION_WORKERS = 2
+_prediction_executor = ThreadPoolExecutor(max_workers=PREDICTION_WORKERS, thread_name_prefix='predict')
+
+# Largest number of rows (explicit rows plus the expanded grid) one /predict/batch request may ask for, and
+# how many predicted rows are serialized per streamed chunk
+BATCH_PREDICT_MAX_ROWS = 100_000
+BATCH_PREDICT_CHUNK_ROWS = 5_000
+
+# Instances whose largest group of interacting ships spans more than this many days are solved with the
+# rolling horizon engine even when slice_hours is not given
+ROLLING_HORIZON_MIN_DAYS = 10
+
 # Pydantic models for request bodies
 class CrawlRequest(BaseModel):
     start_date: date = Field(..., description="Crawling start date in YYYY-MM-DD format.", example="2025-10-01")
     end_date: date = Field(..., description="Crawling end date in YYYY-MM-DD format.", example="2025-10-10")
 
-class OptimizeSelectedRequest(CrawlRequest):
+class SolverOptions(BaseModel):
+    solver: Optional[Literal['gurobi', 'cpsat', 'local_search']] = Field(None, description="'gurobi' (MILP, exact), 'cpsat' (OR-Tools CP-SAT, exact, no Gurobi license needed) or 'local_search' (simulated annealing). Defaults to BAIPOT_SOLVER_BACKEND or the first installed one.")
+    time_limit: Optional[float] = Field(DEFAULT_TIME_LIMIT, gt=0, description="Solver time limit in seconds. The best schedule found within the limit is returned.", example=30.0)
+    mip_gap: Optional[float] = Field(None, ge=0, lt=1, description="Relative MIP gap at which the solver stops (e.g. 0.01 for 1%).", example=0.01)
+    slice_hours: Optional[float] = Field(None, gt=0, description=f"Solve with a rolling horizon committing this many hours of arrivals per slice. Used automatically (with {DEFAULT_SLICE_HOURS}h) when interacting ships span over {ROLLING_HORIZON_MIN_DAYS} days.", example=72)
+    overlap_hours: float = Field(DEFAULT_OVERLAP_HOURS, ge=0, description="Look-ahead re-solved in the next rolling horizon slice.", example=24)
+
+class OptimizeRequest(CrawlRequest, SolverOptions):
+    dataset_id: Optional[str] = Field(None, description="X-Dataset-Id returned by /schedule/prepare for the same dates. Skips crawling and prediction while the prepared data is cached.")
+
+class OptimizeSelectedRequest(OptimizeRequest):
     selected_ships: List[str] = Field(..., description="List of merge_keys for the ships to be optimized.")
 
-class EtdRequest(BaseModel):
+class EtdRequest(SolverOptions):
     ship_name: str = Field(..., example="GEMINI")
     eta: datetime = Field(..., description="Estimated Time of Arrival in ISO format.")
     cargo_load: int = Field(..., example=100)
@@ -51,54 +126,201 @@ class EtdRequest(BaseModel):
     shipping_company: str = Field(..., example="GGL")
     gross_tonnage: float = Field(..., example=50000.0)
     shift: int = Field(..., example=0)
+    reoptimize: bool = Field(False, description=f"Always re-optimize the whole window with the new ship. By default the ship is inserted into the cached base schedule, and the window is re-optimized only when the inserted ship would wait over {ETD_INSERTION_MAX_WAIT_MINUTES} minutes or the insertion is worse than a first-fit schedule.")
+
+class PredictionShip(BaseModel):
+    ship_name: str = Field(..., example="GEMINI")
+    shipping_company: str = Field(..., example="GGL")
+    gross_tonnage: Optional[float] = Field(None, description="Looked up in ship_info.csv by company and ship name when omitted.", example=50000.0)
+    ship_length: Optional[float] = Field(None, description="Looked up in ship_info.csv by company and ship name when omitted.", example=150.0)
 
+class PredictionRow(PredictionShip):
+    eta: datetime = Field(..., description="Estimated Time of Arrival in ISO format.")
+    cargo_load: int = Field(..., ge=0, example=100)
+    cargo_unload: int = Field(..., ge=0, example=100)
+    shift: int = Field(0, example=0)
 
-async def _get_prepared_data(request: CrawlRequest) -> pd.DataFrame:
-    """Helper function to crawl and prepare data, returning a DataFrame."""
+class PredictionGrid(BaseModel):
+    ships: List[PredictionShip] = Field(..., min_length=1)
+    etas: List[datetime] = Field(..., min_length=1, description="Estimated Times of Arrival in ISO format.")
+    cargo_loads: List[int] = Field(..., min_length=1, example=[0, 500, 1000])
+    cargo_unloads: List[int] = Field(..., min_length=1, example=[0, 500, 1000])
+    shifts: List[int] = Field([0], min_length=1, example=[0, 1])
+
+    def size(self) -> int:
+        return len(self.ships) * len(self.etas) * len(self.cargo_loads) * len(self.cargo_unloads) * len(self.shifts)
+
+class BatchPredictRequest(BaseModel):
+    rows: List[PredictionRow] = Field(default_factory=list, description="Individual calls to predict.")
+    grid: Optional[PredictionGrid] = Field(None, description="Cartesian product of ships, ETAs, cargo volumes and shifts, predicted after the rows.")
+
+
+async def _predict(crawled_df: pd.DataFrame, cache=PREDICTION_CACHE) -> pd.DataFrame:
+    """Runs the CPU-bound feature preparation and LightGBM prediction on the prediction executor."""
+    return await asyncio.get_running_loop().run_in_executor(_prediction_executor, predict_work_time, crawled_df, cache)
+
+async def _crawl_and_predict(start_date: date, end_date: date) -> pd.DataFrame:
+    """
+    Crawls the HPNT work plan for the window and predicts the work time of every ship.
+
+    Neither step blocks the event loop: the crawl uses the shared async HPNT client (pooled connections,
+    timeouts, retries and a circuit breaker) and the prediction runs on the bounded prediction executor,
+    so other requests keep being served meanwhile. When HPNT is down the last good crawl of the window
+    is used and marked stale in df.attrs['crawl_info']; without one a 503 with Retry-After is raised.
+    """
     try:
-        start_str = request.start_date.strftime('%Y-%m-%d')
-        end_str = request.end_date.strftime('%Y-%m-%d')
-        
-        crawled_data = get_work_plan_data(
-            start_date=start_str,
-            end_date=end_str,
-            output_format='json'
-        )
-        
-        if not crawled_data or not crawled_data.get('schedule_data'):
-            # Return empty dataframe if no data is crawled
-            return pd.DataFrame()
-
-        crawled_df = pd.DataFrame(crawled_data['schedule_data'])
-        crawled_df.drop_duplicates(subset=['선사', '선명', '모선항차', '선사항차'], inplace=True)
-        final_df = predict_work_time(crawled_df)
-        return final_df
-    except Exception as e:
-        # Re-raise exceptions to be handled by the calling endpoint
-        raise e
+        crawled_data = await fetch_work_plan_data(start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'))
+    except CrawlUnavailableError as e:
+        headers = {'Retry-After': str(int(e.retry_after) + 1)} if e.retry_after else None
+        raise HTTPException(status_code=503, detail=str(e), headers=headers)
+
+    if not crawled_data or not crawled_data.get('schedule_data'):
+        # Return empty dataframe if no data is crawled
+        return pd.DataFrame()
+
+    crawled_df = pd.DataFrame(crawled_data['schedule_data'])
+    crawled_df.drop_duplicates(subset=['선사', '선명', '모선항차', '선사항차'], inplace=True)
+    final_df = await _predict(crawled_df)
+    final_df.attrs['crawl_info'] = {'stale': crawled_data.get('stale', False), 'cached': crawled_data.get('cached', False),
+                                    'last_updated': crawled_data.get('last_updated')}
+    return final_df
+
+async def _get_prepared_data(request: CrawlRequest) -> pd.DataFrame:
+    """
+    Helper function to crawl and prepare data, returning a DataFrame.
 
-async def _run_optimization_cancellable(request: Request, data_to_optimize: pd.DataFrame, fixed_ship_merge_keys: List[str] = None):
-    """Runs the optimization in a thread with cancellation support."""
+    Concurrent calls for the same window share one crawl and prediction (single-flight): the first call
+    starts it as a task and later calls await the same task. Each caller gets its own copy.
+    Exceptions are raised to every waiting caller.
+    """
+    key = (request.start_date, request.end_date)
+    task = _prepare_tasks.get(key)
+    if task is None:
+        PREPARE_STATS['misses'] += 1
+        task = asyncio.create_task(_crawl_and_predict(request.start_date, request.end_date))
+        _prepare_tasks[key] = task
+        task.add_done_callback(lambda done: _finish_prepare_task(key, done))
+    else:
+        PREPARE_STATS['hits'] += 1
+        PREPARE_STATS['coalesced'] += 1
+
+    # A caller that is cancelled must not cancel the crawl the others are waiting for
+    final_df = await asyncio.shield(task)
+    return final_df.copy()
+
+def _finish_prepare_task(key: tuple, task: asyncio.Task):
+    """Forgets a finished crawl, retrieving its exception so it is not lost when every waiter was cancelled."""
+    if _prepare_tasks.get(key) is task:
+        del _prepare_tasks[key]
+    if not task.cancelled() and task.exception() is not None:
+        print(f"Crawl and prediction for {key[0]} ~ {key[1]} failed: {task.exception()!r}")
+
+@asynccontextmanager
+async def _cancel_on_disconnect(request: Request):
+    """Yields a cancel event that is set when the client of a blocking endpoint disconnects."""
     cancel_event = threading.Event()
-    disconnect_checker_task = None
 
     async def _check_disconnect():
         while not await request.is_disconnected():
             await asyncio.sleep(0.1)
         print("Client disconnected, setting cancel event.")
         cancel_event.set()
+        SOLVER_QUEUE.cancel(cancel_event)
 
+    disconnect_checker_task = asyncio.create_task(_check_disconnect())
     try:
-        disconnect_checker_task = asyncio.create_task(_check_disconnect())
-        
-        optimized_df = await asyncio.to_thread(
-            run_milp_model, data_to_optimize, cancel_event, fixed_ship_merge_keys
-        )
+        yield cancel_event
+    finally:
+        disconnect_checker_task.cancel()
+
+async def _run_optimization(data_to_optimize: pd.DataFrame, cancel_event: threading.Event, fixed_ship_merge_keys: List[str] = None,
+                            solver_options: SolverOptions = None, priority: int = BULK,
+                            on_incumbent: Optional[Callable[[pd.DataFrame], None]] = None,
+                            on_start: Optional[Callable[[], None]] = None):
+    """
+    Runs the optimization through the solver queue; setting cancel_event stops it.
 
+    Interactive jobs (ETD queries) are started before queued bulk optimizations. Raises a 429 when the
+    queue for the priority class is full and a 503 when the job waited too long, both with a Retry-After
+    header. The time spent waiting for a solver slot is reported as solve_info['queue_wait'].
+    on_incumbent receives each improved intermediate schedule (not sent by the rolling horizon engine),
+    and on_start is called once the job has a solver slot.
+    """
+    solver_options = solver_options or SolverOptions()
+    try:
+        slice_hours = solver_options.slice_hours
+        if slice_hours is None:
+            span_days = await asyncio.to_thread(longest_component_days, data_to_optimize, fixed_ship_merge_keys)
+            if span_days > ROLLING_HORIZON_MIN_DAYS:
+                slice_hours = DEFAULT_SLICE_HOURS
+
+        if slice_hours is not None:
+            optimized_df, queue_wait = await SOLVER_QUEUE.run(
+                solve_rolling_horizon, data_to_optimize, cancel_event, fixed_ship_merge_keys,
+                backend=solver_options.solver, slice_hours=slice_hours, overlap_hours=solver_options.overlap_hours,
+                time_limit=solver_options.time_limit, mip_gap=solver_options.mip_gap,
+                priority=priority, cancel_event=cancel_event, on_start=on_start
+            )
+        else:
+            optimized_df, queue_wait = await SOLVER_QUEUE.run(
+                solve_decomposed, data_to_optimize, cancel_event, fixed_ship_merge_keys,
+                backend=solver_options.solver, time_limit=solver_options.time_limit, mip_gap=solver_options.mip_gap,
+                on_incumbent=on_incumbent, priority=priority, cancel_event=cancel_event, on_start=on_start
+            )
+
+        if optimized_df is not None:
+            optimized_df.attrs['solve_info']['queue_wait'] = queue_wait
         return optimized_df
-    finally:
-        if disconnect_checker_task:
-            disconnect_checker_task.cancel()
+    except QueueRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e), headers={'Retry-After': str(e.retry_after)})
+
+def _add_datetimes(optimized_df: pd.DataFrame, start_time_ref) -> pd.DataFrame:
+    """Adds Start_dt and Completion_dt computed from the hour offsets relative to start_time_ref."""
+    optimized_df['Start_dt'] = optimized_df['Start_h'].apply(lambda h: start_time_ref + timedelta(hours=h))
+    optimized_df['Completion_dt'] = optimized_df['Completion_h'].apply(lambda h: start_time_ref + timedelta(hours=h))
+    return optimized_df
+
+def _to_records(df: pd.DataFrame) -> list:
+    """Converts a schedule to JSON records, replacing NaN/NaT with None."""
+    df = df.replace({pd.NaT: None, np.nan: None})
+    return json.loads(df.to_json(orient='records', date_format='iso'))
+
+def _set_solve_headers(response: Response, optimized_df: pd.DataFrame):
+    """Exposes solver status, objective, bound and gap of the returned schedule as response headers."""
+    solve_info = optimized_df.attrs.get('solve_info', {})
+    for key, header in SOLVE_INFO_HEADERS.items():
+        if solve_info.get(key) is not None:
+            response.headers[header] = str(solve_info[key])
+
+@app.on_event("startup")
+def start_solver_pool():
+    """Creates the Gurobi environments up front so the first requests don't pay for license checks."""
+    GUROBI_ENV_POOL.start()
+
+@app.on_event("startup")
+def load_model():
+    """Loads the work time model once; later changes to the file are picked up without a restart."""
+    try:
+        MODEL_REGISTRY.load()
+    except Exception as e:
+        print(f"Could not load the work time model {MODEL_REGISTRY.path}: {e}")
+
+@app.on_event("shutdown")
+def shutdown_solver_pool():
+    """Stops the worker processes used for decomposed solves and prediction, and releases the Gurobi environments."""
+    shutdown_executor()
+    GUROBI_ENV_POOL.shutdown()
+    _prediction_executor.shutdown(cancel_futures=True)
+
+@app.on_event("shutdown")
+def save_prediction_cache():
+    """Writes new memoized work time predictions to BAIPOT_PREDICTION_CACHE_PATH when it is set."""
+    PREDICTION_CACHE.save()
+
+@app.on_event("shutdown")
+async def close_crawler():
+    """Closes the pooled HPNT connections."""
+    await get_async_crawler().aclose()
 
 @app.get("/")
 def read_root():
@@ -107,28 +329,98 @@ def read_root():
     """
     return {"message": "Welcome to the BAIPOT API"}
 
+@app.get("/stats")
+def get_stats():
+    """
+    Returns the prepared-data counters (hits = dataset_hits + coalesced, misses, in_flight), the crawl cache counters,
+    the loaded work time model, the memoized prediction counters and the solver queue state.
+    """
+    return {
+        'prepared_data': dict(PREPARE_STATS, in_flight=len(_prepare_tasks)),
+        'crawl_cache': dict(CRAWL_CACHE.stats, entries=len(CRAWL_CACHE)),
+        'model': MODEL_REGISTRY.info(),
+        'prediction_cache': dict(PREDICTION_CACHE.stats, entries=len(PREDICTION_CACHE)),
+        'solver_queue': {'running': SOLVER_QUEUE.running, 'queued': SOLVER_QUEUE.queued(),
+                         'workers': SOLVER_QUEUE.workers},
+    }
+
+@app.get("/model")
+def get_model():
+    """
+    Returns the loaded work time model: version (sha256 prefix of the file), load time, file mtime,
+    number of hot reloads and the last reload error. Checks the file for changes first.
+    Returns a 503 with the load error when no model could be loaded.
+    """
+    try:
+        MODEL_REGISTRY.get()
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=503, detail=f"No work time model is loaded: model file {e.filename} not found.")
+    except Exception as e:
+        error = MODEL_REGISTRY.info()['error'] or f"{type(e).__name__}: {e}"
+        raise HTTPException(status_code=503, detail=f"No work time model is loaded: {error}")
+    return MODEL_REGISTRY.info()
+
 @app.get("/ships")
 def get_ships():
     """
-    Returns a list of all ships from the ship_info.csv file.
+    Returns a list of all ships from the ship_info.csv file (served from the in-memory vessel registry,
+    which reloads the file when it changes).
     """
     try:
-        ship_info_df = pd.read_csv('ship_info.csv')
-        ship_info_df = ship_info_df.replace({np.nan: None})
-        result_json = ship_info_df.to_json(orient='records')
-        return json.loads(result_json)
+        return VESSEL_REGISTRY.records()
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail="ship_info.csv not found.")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An error occurred while reading ship_info.csv: {str(e)}")
 
+def _store_dataset(crawl_request: CrawlRequest, prepared_df: pd.DataFrame) -> str:
+    """Caches prepared data for the optimize endpoints and returns its dataset id."""
+    dataset_id = uuid.uuid4().hex
+    _datasets[dataset_id] = {
+        'created': time.time(),
+        'window': (crawl_request.start_date, crawl_request.end_date),
+        'prepared_df': prepared_df.copy(),
+    }
+    while len(_datasets) > DATASET_CACHE_SIZE:
+        _datasets.popitem(last=False)
+    return dataset_id
+
+def _get_dataset(dataset_id: str, crawl_request: CrawlRequest) -> Optional[pd.DataFrame]:
+    """
+    Returns a copy of the prepared data cached under dataset_id, or None when it has expired, was evicted,
+    or was prepared for another date window (the caller then crawls again).
+    """
+    dataset = _datasets.get(dataset_id)
+    if dataset is None or time.time() - dataset['created'] >= DATASET_TTL_SECONDS:
+        print(f"Dataset {dataset_id} is unknown or expired, crawling again.")
+        return None
+    if dataset['window'] != (crawl_request.start_date, crawl_request.end_date):
+        print(f"Dataset {dataset_id} was prepared for another date window, crawling again.")
+        return None
+    _datasets.move_to_end(dataset_id)
+    return dataset['prepared_df'].copy()
+
 @app.post("/schedule/prepare")
-async def prepare_schedule_data(request: CrawlRequest):
+async def prepare_schedule_data(request: CrawlRequest, response: Response):
     """
     Crawls ship data, enriches it, predicts work time, and returns the data table.
+
+    The prepared data stays cached for DATASET_TTL_SECONDS; pass the X-Dataset-Id response header as
+    `dataset_id` to the optimize endpoints to solve it without crawling and predicting again.
+    X-Crawl-Cached is 'True' when the HPNT page was served from the crawl cache (BAIPOT_CRAWL_CACHE_TTL) and
+    X-Crawl-Stale is 'True' when HPNT was unreachable and the last good crawl (of X-Crawled-At) was used.
+    X-Model-Version identifies the work time model that made the predictions (see /model).
     """
     try:
         final_df = await _get_prepared_data(request)
+        response.headers['X-Dataset-Id'] = _store_dataset(request, final_df)
+        crawl_info = final_df.attrs.get('crawl_info')
+        if crawl_info:
+            response.headers['X-Crawl-Stale'] = str(crawl_info['stale'])
+            response.headers['X-Crawl-Cached'] = str(crawl_info['cached'])
+            response.headers['X-Crawled-At'] = str(crawl_info['last_updated'])
+        if final_df.attrs.get('model_version'):
+            response.headers['X-Model-Version'] = final_df.attrs['model_version']
         if final_df.empty:
             return []
         
@@ -138,144 +430,439 @@ async def prepare_schedule_data(request: CrawlRequest):
         
         return json.loads(result_json)
 
+    except HTTPException:
+        raise
     except ValueError as ve:
         raise HTTPException(status_code=500, detail=f"Data processing or prediction failed: {str(ve)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An unexpected error occurred during schedule preparation: {str(e)}")
 
-@app.post("/schedule/calculate-etd")
-async def calculate_etd(etd_request: EtdRequest, request: Request):
+async def _get_base_schedule(crawl_request: CrawlRequest, cancel_event: threading.Event, solver_options: SolverOptions,
+                             on_start: Optional[Callable[[], None]] = None) -> dict:
     """
-    Calculates the ETD for a single ship based on its ETA and other details.
+    Returns the optimized schedule of the crawled ships in the window, re-using the last one computed
+    for the same window and solver options while it is younger than BASE_SCHEDULE_TTL_SECONDS.
     """
-    try:
-        # 1. Create a DataFrame for the new ship
-        new_ship_data = {
-            '선명': etd_request.ship_name,
-            '선사': etd_request.shipping_company,
-            '모선항차': '',
-            '접안예정일시': etd_request.eta.strftime('%Y-%m-%d %H:%M'),
-            '양하': str(etd_request.cargo_unload),
-            '적하': str(etd_request.cargo_load),
-            'LOA': etd_request.ship_length,
-            '총톤수': etd_request.gross_tonnage,
-            'Shift': str(etd_request.shift),
-            '선사항차': '', '항로': '', '반입마감시한': '', '출항예정일시': '',
-            'AMP': '', '상태': 'PLANNED', '선석': ''
-        }
-        new_ship_df = pd.DataFrame([new_ship_data])
-        new_ship_df['접안예정일시'] = pd.to_datetime(new_ship_df['접안예정일시'])
-
-        # 2. Predict work time for the new ship
-        # Note: predict_work_time will fill missing LOA/총톤수 for crawled data,
-        # but for a new ship, these must be provided.
-        new_ship_df = predict_work_time(new_ship_df)
-        new_ship_merge_key = f"{etd_request.shipping_company}_{etd_request.ship_name.replace(' ', '')}"
-        new_ship_df['merge_key'] = new_ship_merge_key
-
-        # 3. Get existing schedule around the new ship's ETA
-        eta = etd_request.eta
-        start_date = (eta - timedelta(days=1)).date()
-        end_date = (eta + timedelta(days=1)).date()
-        
-        crawl_req = CrawlRequest(start_date=start_date, end_date=end_date)
+    # Schedules solved with different solver settings are not interchangeable (e.g. a quick local search
+    # base schedule must not answer a later Gurobi request)
+    key = (crawl_request.start_date, crawl_request.end_date, solver_options.solver, solver_options.time_limit,
+           solver_options.mip_gap, solver_options.slice_hours, solver_options.overlap_hours)
+    cached = _base_schedules.get(key)
+    if cached is not None and time.time() - cached['created'] < BASE_SCHEDULE_TTL_SECONDS:
+        _base_schedules.move_to_end(key)
+        return cached
+
+    existing_df = await _get_prepared_data(crawl_request)
+    base = {'created': time.time(), 'existing_df': existing_df, 'fixed_keys': [], 'inputs': None, 'start': None,
+            'position': None}
+    if not existing_df.empty:
+        fixed_ship_merge_keys = _arrived_ship_keys(existing_df)
+        optimized_df = await _run_optimization(existing_df, cancel_event, fixed_ship_merge_keys, solver_options,
+                                               priority=INTERACTIVE, on_start=on_start)
+        if optimized_df is None:
+            raise HTTPException(status_code=500, detail="Optimization failed to find a base schedule for the window.")
+        base['fixed_keys'] = fixed_ship_merge_keys
+        base['inputs'] = extract_model_inputs(existing_df, fixed_ship_merge_keys)
+        base['start'] = optimized_df['Start_h'].to_numpy() * 60
+        base['position'] = optimized_df['Position_m'].to_numpy()
+
+    _base_schedules[key] = base
+    while len(_base_schedules) > BASE_SCHEDULE_CACHE_SIZE:
+        _base_schedules.popitem(last=False)
+    return base
+
+def _arrived_ship_keys(existing_df: pd.DataFrame) -> List[str]:
+    """merge_keys of ships that are already at the terminal and must keep their schedule."""
+    existing_df['merge_key'] = existing_df['선사'].astype(str) + '_' + existing_df['선명'].str.replace(r'\s+', '', regex=True)
+    # Only fix ships that are already arrived.
+    fixed_statuses = ['ARRIVED']
+    return existing_df.loc[existing_df['상태'].isin(fixed_statuses), 'merge_key'].tolist()
+
+def _insert_into_base_schedule(base: dict, combined_df: pd.DataFrame) -> pd.DataFrame:
+    """Places the new ship (last row of combined_df) at its earliest feasible slot around the unchanged base schedule."""
+    begin = time.time()
+    # Same fixed (ARRIVED) ships as the base schedule, so that the first-fit bound below is one for the real problem
+    inputs = extract_model_inputs(combined_df, base['fixed_keys'])
+    start, position = np.zeros(inputs['N']), np.zeros(inputs['N'])
+
+    if base['inputs'] is not None:
+        # Base schedule times are relative to the earliest crawled arrival; shift them if the new ship arrives earlier
+        offset = (base['inputs']['start_time_ref'] - inputs['start_time_ref']).total_seconds() / 60
+        n_base = base['inputs']['N']
+        start[:n_base] = base['start'] + offset
+        position[:n_base] = base['position']
+        slot = insert_ship(start[:n_base], position[:n_base], inputs['s'][:n_base], inputs['l'][:n_base],
+                           inputs['a'][-1], inputs['s'][-1], inputs['l'][-1], inputs['L'], inputs['buffer'])
+    else:
+        slot = insert_ship(np.zeros(0), np.zeros(0), np.zeros(0), np.zeros(0),
+                           inputs['a'][-1], inputs['s'][-1], inputs['l'][-1], inputs['L'], inputs['buffer'])
+    if slot is None:
+        return None
+    start[-1], position[-1] = slot
+
+    optimized_df = build_solution_df(combined_df, inputs, start, position)
+    optimized_df.attrs['solve_info'] = {
+        'status': 'INCREMENTAL',
+        'objective': float((start - inputs['a']).sum()),
+        'runtime': time.time() - begin,
+    }
+    # The base schedule's berth positions are not chosen with the new ship in mind; _calculate_etd re-optimizes
+    # when the insertion makes the new ship wait long or is worse than a simple first-fit schedule
+    optimized_df.attrs['insertion'] = {'wait': float(start[-1] - inputs['a'][-1]),
+                                       'upper_bound': waiting_upper_bound(inputs)}
+    return optimized_df
+
+def _insertion_is_poor(optimized_df: pd.DataFrame) -> bool:
+    """Whether an inserted schedule should be replaced by re-optimizing the window (see EtdRequest.reoptimize)."""
+    insertion = optimized_df.attrs['insertion']
+    return (insertion['wait'] > ETD_INSERTION_MAX_WAIT_MINUTES
+            or optimized_df.attrs['solve_info']['objective'] > insertion['upper_bound'] + 1e-6)
+
+async def _calculate_etd(etd_request: EtdRequest, cancel_event: threading.Event,
+                         on_incumbent: Optional[Callable[[pd.DataFrame], None]] = None,
+                         on_start: Optional[Callable[[], None]] = None) -> pd.DataFrame:
+    """Predicts the new ship's work time and schedules it within the window around its ETA (see calculate_etd)."""
+    # 1. Create a DataFrame for the new ship
+    new_ship_data = {
+        '선명': etd_request.ship_name,
+        '선사': etd_request.shipping_company,
+        '모선항차': '',
+        '접안예정일시': etd_request.eta.strftime('%Y-%m-%d %H:%M'),
+        '양하': str(etd_request.cargo_unload),
+        '적하': str(etd_request.cargo_load),
+        'LOA': etd_request.ship_length,
+        '총톤수': etd_request.gross_tonnage,
+        'Shift': str(etd_request.shift),
+        '선사항차': '', '항로': '', '반입마감시한': '', '출항예정일시': '',
+        'AMP': '', '상태': 'PLANNED', '선석': ''
+    }
+    new_ship_df = pd.DataFrame([new_ship_data])
+    new_ship_df['접안예정일시'] = pd.to_datetime(new_ship_df['접안예정일시'])
+
+    # 2. Predict work time for the new ship
+    # Note: predict_work_time will fill missing LOA/총톤수 for crawled data,
+    # but for a new ship, these must be provided.
+    new_ship_df = await _predict(new_ship_df)
+    new_ship_merge_key = f"{etd_request.shipping_company}_{etd_request.ship_name.replace(' ', '')}"
+    new_ship_df['merge_key'] = new_ship_merge_key
+
+    # 3. Get existing schedule around the new ship's ETA
+    eta = etd_request.eta
+    start_date = (eta - timedelta(days=1)).date()
+    end_date = (eta + timedelta(days=1)).date()
+    
+    crawl_req = CrawlRequest(start_date=start_date, end_date=end_date)
+
+    optimized_df = None
+    if not etd_request.reoptimize:
+        # 4-5. Insert the new ship into the cached base schedule of the window
+        base = await _get_base_schedule(crawl_req, cancel_event, etd_request, on_start)
+        combined_df = pd.concat([base['existing_df'], new_ship_df], ignore_index=True)
+        optimized_df = _insert_into_base_schedule(base, combined_df)
+        if optimized_df is not None and _insertion_is_poor(optimized_df):
+            print(f"Inserted ship would wait {optimized_df.attrs['insertion']['wait']:.0f} min; re-optimizing the window.")
+            optimized_df = None
+
+    if optimized_df is None:
         existing_df = await _get_prepared_data(crawl_req)
 
         fixed_ship_merge_keys = []
         if not existing_df.empty:
-            existing_df['merge_key'] = existing_df['선사'].astype(str) + '_' + existing_df['선명'].str.replace(r'\s+', '', regex=True)
-            # Only fix ships that are already arrived.
-            fixed_statuses = ['ARRIVED'] 
-            fixed_ships_df = existing_df[existing_df['상태'].isin(fixed_statuses)]
-            fixed_ship_merge_keys = fixed_ships_df['merge_key'].tolist()
+            fixed_ship_merge_keys = _arrived_ship_keys(existing_df)
 
         # 4. Combine dataframes
         combined_df = pd.concat([existing_df, new_ship_df], ignore_index=True)
 
         # 5. Run optimization
-        optimized_df = await _run_optimization_cancellable(request, combined_df, fixed_ship_merge_keys)
+        optimized_df = await _run_optimization(combined_df, cancel_event, fixed_ship_merge_keys, etd_request,
+                                               priority=INTERACTIVE, on_start=on_start,
+                                               on_incumbent=_with_datetimes(on_incumbent, combined_df['접안예정일시'].min()))
 
-        if optimized_df is None:
-            raise HTTPException(status_code=500, detail="Optimization failed to find a schedule for the new ship.")
+    if optimized_df is None:
+        raise HTTPException(status_code=500, detail="Optimization failed to find a schedule for the new ship.")
 
-        # 6. Return the entire optimized schedule
-        start_time_ref = combined_df['접안예정일시'].min()
+    # 6. Return the entire optimized schedule with Start_dt and Completion_dt
+    return _add_datetimes(optimized_df, combined_df['접안예정일시'].min())
 
-        # Add Start_dt and Completion_dt to the entire dataframe
-        optimized_df['Start_dt'] = optimized_df['Start_h'].apply(lambda h: start_time_ref + timedelta(hours=h))
-        optimized_df['Completion_dt'] = optimized_df['Completion_h'].apply(lambda h: start_time_ref + timedelta(hours=h))
 
-        # Replace NaN/NaT with None and convert to JSON
-        optimized_df = optimized_df.replace({pd.NaT: None, np.nan: None})
-        result_json = optimized_df.to_json(orient='records', date_format='iso')
-        
-        return json.loads(result_json)
+async def _optimize_window(crawl_request: OptimizeRequest, cancel_event: threading.Event, selected_ships: List[str] = None,
+                           on_incumbent: Optional[Callable[[pd.DataFrame], None]] = None,
+                           on_start: Optional[Callable[[], None]] = None) -> pd.DataFrame:
+    """
+    Optimizes all ships of the window or only the selected merge_keys, using the prepared data of
+    crawl_request.dataset_id when it is still cached and crawling and predicting the window otherwise.
+    """
+    prepared_df = None
+    if crawl_request.dataset_id is not None:
+        prepared_df = _get_dataset(crawl_request.dataset_id, crawl_request)
+    if prepared_df is not None:
+        PREPARE_STATS['hits'] += 1
+        PREPARE_STATS['dataset_hits'] += 1
+    else:
+        prepared_df = await _get_prepared_data(crawl_request)
+
+    if prepared_df.empty:
+        raise HTTPException(status_code=404, detail="No data available to optimize.")
+
+    data_to_optimize = prepared_df
+    if selected_ships is not None:
+        prepared_df['merge_key'] = prepared_df['선사'].astype(str) + '_' + prepared_df['선명'].str.replace(r'\s+', '', regex=True)
+
+        data_to_optimize = prepared_df[prepared_df['merge_key'].isin(selected_ships)]
+
+        if data_to_optimize.empty:
+            raise HTTPException(status_code=404, detail="None of the selected ships were found in the data for the given period.")
+
+    start_time_ref = prepared_df['접안예정일시'].min()
+    optimized_df = await _run_optimization(data_to_optimize, cancel_event, solver_options=crawl_request,
+                                           on_incumbent=_with_datetimes(on_incumbent, start_time_ref),
+                                           on_start=on_start)
+
+    if optimized_df is None:
+        # This can mean optimization failed, was infeasible, or was cancelled.
+        raise HTTPException(status_code=500, detail="Optimization failed, was infeasible, or was cancelled by the user.")
+
+    return _add_datetimes(optimized_df, start_time_ref)
+
+def _with_datetimes(on_incumbent: Optional[Callable[[pd.DataFrame], None]], start_time_ref):
+    """Wraps an incumbent callback so that it receives schedules with Start_dt and Completion_dt."""
+    if on_incumbent is None:
+        return None
+    return lambda df: on_incumbent(_add_datetimes(df, start_time_ref))
 
+@app.post("/schedule/calculate-etd")
+async def calculate_etd(etd_request: EtdRequest, request: Request, response: Response):
+    """
+    Calculates the ETD for a single ship based on its ETA and other details.
+
+    By default the ship is inserted into the cached optimized schedule of the surrounding window without
+    moving the other ships, which takes milliseconds once the window has been optimized. When the inserted
+    ship would wait more than ETD_INSERTION_MAX_WAIT_MINUTES, or the insertion is worse than a first-fit
+    schedule of the window, the whole window is re-optimized with the new ship instead. Set `reoptimize`
+    to always re-solve.
+    """
+    try:
+        async with _cancel_on_disconnect(request) as cancel_event:
+            optimized_df = await _calculate_etd(etd_request, cancel_event)
+        _set_solve_headers(response, optimized_df)
+        return _to_records(optimized_df)
+
+    except HTTPException:
+        raise
     except Exception as e:
         import traceback
         print(traceback.format_exc())
         raise HTTPException(status_code=500, detail=f"An error occurred during ETD calculation: {str(e)}")
 
-@app.post("/schedule/optimize")
-async def optimize_schedule(crawl_request: CrawlRequest, request: Request):
+def _batch_prediction_input(batch_request: BatchPredictRequest) -> pd.DataFrame:
     """
-    Runs the full pipeline: crawl, predict, and optimize the berth schedule.
+    Builds the crawl-shaped input of /predict/batch: the explicit rows followed by the grid expanded
+    in ships, etas, cargo_loads, cargo_unloads, shifts order (the last list varies fastest).
     """
-    try:
-        prepared_df = await _get_prepared_data(crawl_request)
-        
-        if prepared_df.empty:
-            raise HTTPException(status_code=404, detail="No data available to optimize.")
+    columns = ['ship_name', 'shipping_company', 'gross_tonnage', 'ship_length', 'eta', 'cargo_load', 'cargo_unload', 'shift']
+    frames = [pd.DataFrame([row.model_dump() for row in batch_request.rows], columns=columns)]
+    grid = batch_request.grid
+    if grid is not None:
+        ships = pd.DataFrame([ship.model_dump() for ship in grid.ships])
+        levels = [range(len(ships)), grid.etas, grid.cargo_loads, grid.cargo_unloads, grid.shifts]
+        product = pd.MultiIndex.from_product(levels, names=['ship', 'eta', 'cargo_load', 'cargo_unload', 'shift'])
+        expanded = product.to_frame(index=False)
+        expanded = pd.concat([ships.iloc[expanded.pop('ship')].reset_index(drop=True), expanded], axis=1)
+        frames.append(expanded[columns])
+    requested = pd.concat([frame for frame in frames if not frame.empty], ignore_index=True)
+
+    return pd.DataFrame({
+        '선명': requested['ship_name'],
+        '선사': requested['shipping_company'],
+        '접안예정일시': pd.to_datetime(requested['eta']),
+        '양하': requested['cargo_unload'],
+        '적하': requested['cargo_load'],
+        'Shift': requested['shift'],
+        '총톤수': pd.to_numeric(requested['gross_tonnage']),
+        'LOA': pd.to_numeric(requested['ship_length']),
+    })
+
+def _batch_prediction_chunks(predicted_df: pd.DataFrame):
+    """Yields the predictions as NDJSON, BATCH_PREDICT_CHUNK_ROWS rows at a time."""
+    output = pd.DataFrame({
+        'row': np.arange(len(predicted_df)),
+        'ship_name': predicted_df['선명'],
+        'shipping_company': predicted_df['선사'],
+        'eta': predicted_df['접안예정일시'],
+        'cargo_load': predicted_df['적하'].astype(int),
+        'cargo_unload': predicted_df['양하'].astype(int),
+        'shift': predicted_df['shift'].astype(int),
+        'gross_tonnage': predicted_df['총톤수'],
+        'ship_length': predicted_df['LOA'],
+        'uses_average_values': predicted_df['uses_average_values'],
+        'predicted_work_time': predicted_df['predicted_work_time'],
+    })
+    for begin in range(0, len(output), BATCH_PREDICT_CHUNK_ROWS):
+        chunk = output.iloc[begin:begin + BATCH_PREDICT_CHUNK_ROWS]
+        # pandas versions differ in whether lines=True ends with a newline
+        yield chunk.to_json(orient='records', lines=True, date_format='iso', double_precision=15,
+                            force_ascii=False).rstrip('\n') + '\n'
+
+@app.post("/predict/batch")
+async def predict_batch(batch_request: BatchPredictRequest):
+    """
+    Predicts the work time of many calls at once, e.g. to price what-if cargo volumes, shifts and ETAs.
 
-        optimized_df = await _run_optimization_cancellable(request, prepared_df)
+    The explicit `rows` and the cartesian `grid` (every ship with every ETA, cargo load, cargo unload and
+    shift) go through the same feature preparation as crawled ships and a single vectorized model call.
+    Gross tonnage and length default to ship_info.csv. The result is streamed as NDJSON, one object per
+    row in request order with the specs that were used and `predicted_work_time` in minutes.
+    """
+    n_rows = len(batch_request.rows) + (batch_request.grid.size() if batch_request.grid is not None else 0)
+    if n_rows == 0:
+        raise HTTPException(status_code=422, detail="Provide rows or a grid to predict.")
+    if n_rows > BATCH_PREDICT_MAX_ROWS:
+        raise HTTPException(status_code=422, detail=f"{n_rows} rows requested; at most {BATCH_PREDICT_MAX_ROWS} are allowed per request.")
 
-        if optimized_df is None:
-            # This can mean optimization failed, was infeasible, or was cancelled.
-            raise HTTPException(status_code=500, detail="Optimization failed, was infeasible, or was cancelled by the user.")
+    try:
+        # One-off what-if rows would only push the daily crawls' predictions out of the memo cache
+        predicted_df = await _predict(_batch_prediction_input(batch_request), cache=None)
+    except Exception as e:
+        import traceback
+        print(traceback.format_exc())
+        raise HTTPException(status_code=500, detail=f"An error occurred during batch prediction: {str(e)}")
+    if 'model_version' not in predicted_df.attrs:
+        raise HTTPException(status_code=503, detail="The work time model is not available.")
 
-        start_time_ref = prepared_df['접안예정일시'].min()
-        optimized_df['Start_dt'] = optimized_df['Start_h'].apply(lambda h: start_time_ref + timedelta(hours=h))
-        optimized_df['Completion_dt'] = optimized_df['Completion_h'].apply(lambda h: start_time_ref + timedelta(hours=h))
+    headers = {'X-Model-Version': predicted_df.attrs['model_version'], 'X-Prediction-Rows': str(n_rows)}
+    return StreamingResponse(_batch_prediction_chunks(predicted_df), media_type="application/x-ndjson", headers=headers)
 
-        optimized_df = optimized_df.replace({pd.NaT: None, np.nan: None})
-        result_json = optimized_df.to_json(orient='records', date_format='iso')
-        
-        return json.loads(result_json)
+@app.post("/schedule/optimize")
+async def optimize_schedule(crawl_request: OptimizeRequest, request: Request, response: Response):
+    """
+    Runs the full pipeline: crawl, predict, and optimize the berth schedule.
+    """
+    try:
+        async with _cancel_on_disconnect(request) as cancel_event:
+            optimized_df = await _optimize_window(crawl_request, cancel_event)
+        _set_solve_headers(response, optimized_df)
+        return _to_records(optimized_df)
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An error occurred during optimization: {str(e)}")
 
 @app.post("/schedule/optimize-selected")
-async def optimize_selected_schedule(optimize_request: OptimizeSelectedRequest, request: Request):
+async def optimize_selected_schedule(optimize_request: OptimizeSelectedRequest, request: Request, response: Response):
     """
     Runs the optimization for a selection of ships.
     """
     try:
-        prepared_df = await _get_prepared_data(optimize_request)
-        
-        if prepared_df.empty:
-            raise HTTPException(status_code=404, detail="No data available to optimize.")
+        async with _cancel_on_disconnect(request) as cancel_event:
+            optimized_df = await _optimize_window(optimize_request, cancel_event, optimize_request.selected_ships)
+        _set_solve_headers(response, optimized_df)
+        return _to_records(optimized_df)
 
-        prepared_df['merge_key'] = prepared_df['선사'].astype(str) + '_' + prepared_df['선명'].str.replace(r'\s+', '', regex=True)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"An error occurred during selective optimization: {str(e)}")
 
-        selected_df = prepared_df[prepared_df['merge_key'].isin(optimize_request.selected_ships)]
+async def _run_job(job: Job, pipeline: Callable):
+    """
+    Runs pipeline(cancel_event, on_incumbent, on_start) for a background job and stores its schedule or error.
+    The job stays 'queued' while crawling and waiting for a solver slot and is 'running' once it has one.
+    """
+    try:
+        optimized_df = await pipeline(job.cancel_event, job.publish_incumbent, lambda: job.set_status('running'))
+        job.solve_info = optimized_df.attrs.get('solve_info')
+        job.result = _to_records(optimized_df)
+        job.set_status('cancelled' if job.cancel_event.is_set() else 'succeeded')
+    except HTTPException as e:
+        job.error = {'status_code': e.status_code, 'detail': e.detail, 'retry_after': (e.headers or {}).get('Retry-After')}
+        job.set_status('cancelled' if job.cancel_event.is_set() else 'failed')
+    except Exception as e:
+        import traceback
+        print(traceback.format_exc())
+        job.error = {'status_code': 500, 'detail': f"An error occurred during the {job.kind} job: {str(e)}"}
+        job.set_status('failed')
+
+def _start_job(kind: str, pipeline: Callable) -> dict:
+    job = JOBS.create(kind)
+    job.task = asyncio.create_task(_run_job(job, pipeline))
+    return job.to_dict()
+
+def _get_job(job_id: str) -> Job:
+    job = JOBS.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found.")
+    return job
+
+@app.post("/jobs/optimize", status_code=202)
+async def submit_optimize_job(crawl_request: OptimizeRequest):
+    """
+    Starts the crawl, predict and optimize pipeline of /schedule/optimize in the background and returns its job id.
+    """
+    return _start_job('optimize', lambda cancel_event, on_incumbent, on_start: _optimize_window(
+        crawl_request, cancel_event, on_incumbent=on_incumbent, on_start=on_start))
 
-        if selected_df.empty:
-            raise HTTPException(status_code=404, detail="None of the selected ships were found in the data for the given period.")
+@app.post("/jobs/optimize-selected", status_code=202)
+async def submit_optimize_selected_job(optimize_request: OptimizeSelectedRequest):
+    """
+    Starts the /schedule/optimize-selected pipeline in the background and returns its job id.
+    """
+    return _start_job('optimize-selected', lambda cancel_event, on_incumbent, on_start: _optimize_window(
+        optimize_request, cancel_event, optimize_request.selected_ships, on_incumbent=on_incumbent, on_start=on_start))
 
-        optimized_df = await _run_optimization_cancellable(request, selected_df)
+@app.post("/jobs/calculate-etd", status_code=202)
+async def submit_etd_job(etd_request: EtdRequest):
+    """
+    Starts the /schedule/calculate-etd pipeline in the background and returns its job id.
+    """
+    return _start_job('calculate-etd', lambda cancel_event, on_incumbent, on_start: _calculate_etd(
+        etd_request, cancel_event, on_incumbent=on_incumbent, on_start=on_start))
 
-        if optimized_df is None:
-            raise HTTPException(status_code=500, detail="Optimization failed, was infeasible, or was cancelled by the user.")
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    """
+    Returns the status of a job, and its schedule (`result`) or `error` once it has finished.
+    """
+    return _get_job(job_id).to_dict(include_result=True)
 
-        start_time_ref = prepared_df['접안예정일시'].min()
-        optimized_df['Start_dt'] = optimized_df['Start_h'].apply(lambda h: start_time_ref + timedelta(hours=h))
-        optimized_df['Completion_dt'] = optimized_df['Completion_h'].apply(lambda h: start_time_ref + timedelta(hours=h))
+@app.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    """
+    Cancels a queued or running job. A solve that is already running returns its best schedule so far.
+    """
+    job = _get_job(job_id)
+    job.cancel()
+    return job.to_dict()
 
-        optimized_df = optimized_df.replace({pd.NaT: None, np.nan: None})
-        result_json = optimized_df.to_json(orient='records', date_format='iso')
-        
-        return json.loads(result_json)
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
 
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"An error occurred during selective optimization: {str(e)}")
\ No newline at end of file
+@app.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str):
+    """
+    Server-Sent Events stream of a job.
+
+    Sends `status` when the job state changes, `incumbent` with the latest improved schedule while the
+    solver runs (intermediate schedules are skipped when the client reads slower than they are found),
+    and finally `result` with the same body as GET /jobs/{job_id}, after which the stream ends.
+    """
+    job = _get_job(job_id)
+
+    async def _events():
+        status, incumbents = None, 0
+        while True:
+            version = job.version
+            if job.status in FINISHED_STATUSES:
+                yield _sse('result', job.to_dict(include_result=True))
+                return
+            if job.status != status:
+                status = job.status
+                yield _sse('status', job.to_dict())
+            if job.incumbents != incumbents and job.incumbent is not None:
+                incumbents = job.incumbents
+                yield _sse('incumbent', {'incumbents': incumbents, 'solve_info': job.incumbent.attrs['solve_info'],
+                                         'schedule': _to_records(job.incumbent)})
+            if await job.wait_for_change(version, timeout=15) == version:
+                yield ": keep-alive\n\n"
+
+    return StreamingResponse(_events(), media_type="text/event-stream", headers={'Cache-Control': 'no-cache'})
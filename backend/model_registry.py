@@ -0,0 +1,152 @@
+import hashlib
+import logging
+import os
+import pickle
+import threading
+import time
+
+from tree_ensemble import TreeEnsemble, compiled_path
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 작업 시간 예측 모델 파일과 파일 변경을 확인하는 최소 간격 (초)
+MODEL_PATH = os.environ.get('BAIPOT_MODEL_PATH', os.path.join(BACKEND_DIR, 'lgbm_weight.pkl'))
+MODEL_CHECK_INTERVAL = float(os.environ.get('BAIPOT_MODEL_CHECK_INTERVAL', 5))
+# 예측 엔진: 'auto'는 모델 파일과 같은 이름의 .npz (`tree_ensemble.py`로 내보낸 파일)가 최신이면 NumPy
+# 엔진을 사용하고 (lightgbm을 import하지 않음), 'lightgbm'은 항상 pickle된 모델을 사용
+MODEL_ENGINE = os.environ.get('BAIPOT_MODEL_ENGINE', 'auto')
+
+
+class ModelRegistry:
+    """
+    메모리에 상주하는 예측 모델과 파일 변경 시 자동 교체 (hot reload).
+
+    `get()`은 현재 모델 항목 ({'model', 'version', 'engine', 'loaded_at', 'path', 'mtime'})을 반환하고,
+    check_interval초마다 파일의 mtime과 크기를 확인합니다. 바뀌었으면 파일을 읽어 sha256이 다를 때만
+    unpickle하여 항목을 통째로 바꿉니다. 이미 항목을 받아 간 요청은 이전 모델로 끝까지 예측합니다.
+    새 파일을 읽지 못하면 (쓰는 중이거나 손상된 파일) 이전 모델을 계속 사용하고, 파일이 다시 바뀌면
+    재시도합니다. 새 가중치는 임시 파일에 쓴 뒤 이름을 바꾸어 (`os.replace`) 배포하면 됩니다.
+
+    version은 파일 sha256의 앞 12자리입니다.
+
+    engine이 'auto'이고 같은 이름의 .npz가 이 version에서 내보낸 파일이면 unpickle 대신
+    `TreeEnsemble`을 불러옵니다 (engine='numpy'). .npz가 없거나 오래되었으면 pickle된 모델을
+    사용합니다 (engine='lightgbm'). 두 파일 중 하나만 바뀌어도 다시 확인합니다.
+    """
+
+    def __init__(self, path=MODEL_PATH, check_interval=MODEL_CHECK_INTERVAL, engine=MODEL_ENGINE):
+        if engine not in ('auto', 'lightgbm'):
+            raise ValueError(f"Unknown model engine {engine!r}")
+        self.path = path
+        self.compiled_path = compiled_path(path)
+        self.check_interval = check_interval
+        self.engine = engine
+        self.reloads = 0
+        self._current = None
+        self._stat = None  # 마지막으로 읽은 (또는 읽지 못한) 파일 (모델, .npz)의 (mtime_ns, size)
+        self._error = None
+        self._checked = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        """
+        현재 모델 항목. 처음 호출하거나 check_interval이 지났으면 파일 변경을 확인합니다.
+
+        Raises:
+            FileNotFoundError: 모델 파일이 없고 불러온 모델도 없는 경우.
+            Exception: 처음 불러온 모델 파일을 읽지 못한 경우 (unpickle 오류 등).
+        """
+        now = time.monotonic()
+        if self._current is None or now - self._checked >= self.check_interval:
+            with self._lock:
+                if self._current is None or now - self._checked >= self.check_interval:
+                    self._checked = now
+                    self._refresh()
+        return self._current
+
+    def load(self):
+        """파일 변경 확인 간격과 관계없이 지금 확인합니다 (애플리케이션 시작 시 호출)."""
+        with self._lock:
+            self._checked = time.monotonic()
+            self._refresh()
+        return self._current
+
+    def info(self):
+        """불러온 모델의 version, 불러온 시각, 파일 경로와 mtime, 교체 횟수, 마지막 불러오기 오류"""
+        current = self._current
+        info = {'path': self.path, 'version': None, 'engine': None, 'loaded_at': None, 'mtime': None,
+                'reloads': self.reloads, 'error': self._error}
+        if current is not None:
+            info.update({name: value for name, value in current.items() if name != 'model'})
+        return info
+
+    def _refresh(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            if self._current is None:
+                raise
+            logging.warning(f"Model file {self.path} disappeared; keeping model {self._current['version']}.")
+            return
+        key = (stat.st_mtime_ns, stat.st_size, self._compiled_stat())
+        if key == self._stat:
+            if self._current is None:
+                raise RuntimeError(f"Could not load model {self.path}: {self._error}")
+            return
+
+        self._stat = key
+        try:
+            with open(self.path, 'rb') as f:
+                data = f.read()
+            version = hashlib.sha256(data).hexdigest()[:12]
+            model = self._load_compiled(version) if key[2] is not None else None
+            engine = 'numpy' if model is not None else 'lightgbm'
+            if (self._current is not None and version == self._current['version']
+                    and engine == self._current['engine']):
+                return
+            if model is None:
+                model = pickle.loads(data)
+            if not hasattr(model, 'predict'):
+                raise TypeError(f"{type(model).__name__} has no predict()")
+        except Exception as e:
+            self._error = f"{type(e).__name__}: {e}"
+            if self._current is None:
+                raise
+            logging.warning(f"Could not reload model {self.path} ({self._error}); "
+                            f"keeping model {self._current['version']}.")
+            return
+
+        if self._current is not None:
+            self.reloads += 1
+            logging.info(f"Reloaded model {self.path}: {self._current['version']} ({self._current['engine']}) "
+                         f"-> {version} ({engine}).")
+        self._error = None
+        self._current = {'model': model, 'version': version, 'engine': engine, 'loaded_at': time.time(),
+                         'path': self.path, 'mtime': stat.st_mtime}
+
+    def _compiled_stat(self):
+        """.npz 파일의 (mtime_ns, size). 사용하지 않거나 파일이 없으면 None."""
+        if self.engine != 'auto':
+            return None
+        try:
+            stat = os.stat(self.compiled_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _load_compiled(self, version):
+        """version에서 내보낸 .npz의 TreeEnsemble. 읽을 수 없거나 다른 version에서 내보냈으면 None."""
+        try:
+            ensemble = TreeEnsemble.load(self.compiled_path)
+        except Exception as e:
+            logging.warning(f"Could not load compiled model {self.compiled_path} ({type(e).__name__}: {e}); "
+                            f"using {self.path}.")
+            return None
+        if ensemble.source_version != version:
+            logging.warning(f"Compiled model {self.compiled_path} was exported from {ensemble.source_version}, "
+                            f"not {version}; using {self.path}. Run `python tree_ensemble.py {self.path}`.")
+            return None
+        return ensemble
+
+
+MODEL_REGISTRY = ModelRegistry()
@@ -1,132 +1,300 @@
 import gurobipy as gp
 from gurobipy import GRB
-import pandas as pd
-import re
+import numpy as np
+import logging
+import time
 
-def run_milp_model(processed_df, cancel_event, fixed_ship_merge_keys=None):
+from heuristics import waiting_upper_bound
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+STATUS_NAMES = {
+    GRB.OPTIMAL: 'OPTIMAL',
+    GRB.INFEASIBLE: 'INFEASIBLE',
+    GRB.INF_OR_UNBD: 'INF_OR_UNBD',
+    GRB.TIME_LIMIT: 'TIME_LIMIT',
+    GRB.INTERRUPTED: 'INTERRUPTED',
+    GRB.SUBOPTIMAL: 'SUBOPTIMAL',
+    GRB.NODE_LIMIT: 'NODE_LIMIT',
+    GRB.SOLUTION_LIMIT: 'SOLUTION_LIMIT',
+}
+
+
+def preprocess_pairs(inputs, upper_bound=None):
     """
-    Gurobi MILP 모델을 실행하여 최적의 선석 배정 계획 데이터를 반환합니다.
-    
+    선박 쌍별 big-M 상수와 변수 고정/제거 정보를 계산합니다.
+
+    총 대기 시간 상한 W (실행 가능한 스케줄의 목적함수 값)가 있으면 모든 최적해에서
+    a_i <= t_i <= a_i + W 이므로 (고정 선박은 t_i = a_i), 이 시간 창으로 쌍마다 다음을 계산합니다.
+        - 시간 창이 겹칠 수 없는 쌍 (한 선박이 항상 먼저 끝남): 변수/제약을 아예 생성하지 않음
+        - 불가능한 시간 순서 (i 먼저 / j 먼저) 및 나란히 접안 불가능 (l_i + l_j > L): 이진 변수 고정
+        - 시간 제약 big-M: M_ij = ub_i + s_i + buffer - lb_j (전역 M_time 대신)
+        - 공간 제약 big-M: p_i + l_i - p_j 의 최댓값인 L (기존 2L 대신)
+
     Args:
-        processed_df (pd.DataFrame): 전처리 및 예측이 완료된 데이터프레임.
-        cancel_event (threading.Event): 최적화 중단을 위한 이벤트 객체.
-        fixed_ship_merge_keys (list, optional): 스케줄을 고정할 선박의 merge_key 리스트.
+        inputs (dict): `extract_model_inputs()`의 반환값.
+        upper_bound (float, optional): 총 대기 시간 상한 (분). 없으면 `waiting_upper_bound()`로 계산.
 
     Returns:
-        pd.DataFrame: 최적화된 선석 배정 결과. 최적해를 찾지 못하거나 중단되면 None을 반환합니다.
+        dict: 시작 시간 상한(t_ub), 유지되는 쌍(U, V), 쌍별 시간 big-M(M_uv, M_vu),
+              가능 여부 마스크(side_by_side, u_first, v_first), 제거된 쌍 수(n_pruned).
+    """
+    s, a, l, fixed = inputs['s'], inputs['a'], inputs['l'], inputs['fixed']
+    N, L, b = inputs['N'], inputs['L'], inputs['buffer']
+
+    if upper_bound is None:
+        upper_bound = waiting_upper_bound(inputs)
+
+    # 부동소수점 오차로 최적해가 잘려나가지 않도록 약간의 여유를 둠
+    t_lb = a
+    t_ub = np.where(fixed, a, a + upper_bound + 1e-3)
+
+    U, V = np.triu_indices(N, k=1)
+    u_always_first = t_ub[U] + s[U] + b <= t_lb[V]
+    v_always_first = t_ub[V] + s[V] + b <= t_lb[U]
+    keep = ~(u_always_first | v_always_first)
+    U, V = U[keep], V[keep]
+
+    return {
+        't_ub': t_ub,
+        'U': U,
+        'V': V,
+        'M_uv': np.maximum(t_ub[U] + s[U] + b - t_lb[V], 0),
+        'M_vu': np.maximum(t_ub[V] + s[V] + b - t_lb[U], 0),
+        'side_by_side': l[U] + l[V] <= L,
+        'u_first': t_lb[U] + s[U] + b <= t_ub[V],
+        'v_first': t_lb[V] + s[V] + b <= t_ub[U],
+        'n_pruned': int((~keep).sum()),
+        'upper_bound': upper_bound,
+    }
+
+
+def build_milp_model(inputs, constraint_names=False, formulation="compact", preprocess=True, upper_bound=None, env=None):
     """
-    # --- 1. 입력 데이터 추출 및 변환 ---
-    s_i = processed_df['predicted_work_time'].tolist()  # 작업 소요 시간 (분)
-    start_time_ref = processed_df['접안예정일시'].min()
-    a_i_minutes = ((processed_df['접안예정일시'] - start_time_ref).dt.total_seconds() / 60).tolist()
-    a_i = [m / 60 for m in a_i_minutes]
-    l_i = processed_df['LOA'].tolist()
-    N = len(processed_df)
-    L = 1150  # 부두길이 (m)
-    buffer_minutes = 60
+    행렬 API(MVar)로 선석 배정 MILP 모델을 일괄 생성합니다.
+
+    선박 쌍(i, j)마다 addConstr를 호출하는 대신 NumPy 인덱스 배열로 공간/시간 big-M
+    제약을 한 번에 추가하므로, 모델 생성 비용이 N² 번의 파이썬 호출에 비례하지 않습니다.
+
+    formulation:
+        - "full": N×N 이진 변수 x(left_of), y(before)를 사용하는 순서쌍 정식화 (대각 원소 포함).
+        - "compact": 비순서쌍 (i < j)마다 이진 변수 2개만 사용하는 정식화.
+          z_ij = 0 이면 공간 분리, 1 이면 시간 분리, o_ij = 0 이면 i가 먼저(왼쪽/앞), 1 이면 j가 먼저.
+          4가지 (z, o) 조합이 full 정식화의 x_ij, x_ji, y_ij, y_ji 중 하나에 대응하므로
+          separation_required 제약이 필요 없고, 이진 변수 수가 N² 에서 N(N-1) 로 줄어듭니다.
+
+    Args:
+        inputs (dict): `extract_model_inputs()`의 반환값.
+        constraint_names (bool): True이면 변수/제약에 이름을 붙입니다 (디버깅, IIS 분석용).
+                                 운영 환경에서는 이름 생성 비용을 줄이기 위해 False를 권장합니다.
+        formulation (str): "compact" (기본값) 또는 "full".
+        preprocess (bool): True이면 `preprocess_pairs()`로 쌍별 big-M, 변수 고정, 쌍 제거를 적용합니다.
+                           False이면 전역 big-M (M_time = sum(s) + max(a), M_space = 2L)을 사용합니다.
+        upper_bound (float, optional): 전처리에 사용할 총 대기 시간 상한 (분).
+        env (gp.Env, optional): 모델을 생성할 Gurobi 환경. 없으면 기본 환경을 사용합니다.
+
+    Returns:
+        tuple: (model, variables) - variables는 't', 'p', 'w' MVar, 정식화별 이진 변수
+               ("full": 'x', 'y' / "compact": 'z', 'o', 'pairs'), 전처리 통계('stats')를 담은 딕셔너리.
+    """
+    if formulation not in ("compact", "full"):
+        raise ValueError(f"Unknown formulation: {formulation}")
+
+    s, a, l = inputs['s'], inputs['a'], inputs['l']
+    N, L, buffer_minutes = inputs['N'], inputs['L'], inputs['buffer']
+
+    def _name(name):
+        return name if constraint_names else ""
+
+    # --- 1. 쌍별 전처리 ---
+    if preprocess:
+        pairs = preprocess_pairs(inputs, upper_bound)
+        U, V = pairs['U'], pairs['V']
+        t_ub = pairs['t_ub']
+        M_uv, M_vu = pairs['M_uv'], pairs['M_vu']
+        side_by_side, u_first, v_first = pairs['side_by_side'], pairs['u_first'], pairs['v_first']
+        M_space = L
+    else:
+        U, V = np.triu_indices(N, k=1)
+        t_ub = np.full(N, GRB.INFINITY)
+        M_time = s.sum() + a.max() if N else 0
+        M_uv = M_vu = np.full(len(U), M_time)
+        side_by_side = u_first = v_first = np.ones(len(U), dtype=bool)
+        M_space = 2 * L
 
     # --- 2. Gurobi 모델 생성 ---
-    model = gp.Model("BAIPOT")
+    model = gp.Model("BAIPOT", env=env)
 
     # --- 3. 결정 변수 ---
-    t = model.addVars(N, vtype=GRB.CONTINUOUS, lb=0, name="start_time")
-    p = model.addVars(N, vtype=GRB.CONTINUOUS, lb=0, ub=L, name="position")
-    w = model.addVars(N, vtype=GRB.CONTINUOUS, lb=0, name="waiting_time")
-    x = model.addVars(N, N, vtype=GRB.BINARY, name="left_of")
-    y = model.addVars(N, N, vtype=GRB.BINARY, name="before")
+    t = model.addMVar(N, vtype=GRB.CONTINUOUS, lb=0, ub=t_ub, name=_name("start_time"))
+    p = model.addMVar(N, vtype=GRB.CONTINUOUS, lb=0, ub=L, name=_name("position"))
+    w = model.addMVar(N, vtype=GRB.CONTINUOUS, lb=0, name=_name("waiting_time"))
 
     # --- 4. 목적 함수 ---
-    model.setObjective(gp.quicksum(w[i] for i in range(N)), GRB.MINIMIZE)
+    model.setObjective(w.sum(), GRB.MINIMIZE)
 
     # --- 5. 제약 조건 ---
-    model.addConstrs((w[i] == t[i] - a_i_minutes[i] for i in range(N)), name="waiting_time")
-    model.addConstrs((t[i] >= a_i_minutes[i] for i in range(N)), name="arrival_constraints")
-    model.addConstrs((p[i] + l_i[i] <= L for i in range(N)), name="berth_length_constraints")
-
-    M_time = sum(s_i) + max(a_i_minutes) if a_i_minutes else sum(s_i)
-    M_space = 2 * L
-
-    for i in range(N):
-        for j in range(N):
-            if i != j:
-                model.addConstr(p[i] + l_i[i] <= p[j] + M_space * (1 - x[i,j]), name=f"spatial_left_{i}_{j}")
-                model.addConstr(p[j] + l_i[j] <= p[i] + M_space * (1 - x[j,i]), name=f"spatial_right_{i}_{j}")
-                model.addConstr(t[i] + s_i[i] + buffer_minutes <= t[j] + M_time * (1 - y[i,j]), name=f"temporal_before_{i}_{j}")
-                model.addConstr(t[j] + s_i[j] + buffer_minutes <= t[i] + M_time * (1 - y[j,i]), name=f"temporal_after_{i}_{j}")
-
-    model.addConstrs((x[i,j] + x[j,i] + y[i,j] + y[j,i] >= 1 for i in range(N) for j in range(i + 1, N)), name="separation_required")
-
-    if fixed_ship_merge_keys:
-        # Create merge keys to identify ships to be fixed
-        df_merge_keys = (processed_df['선사'].astype(str) + '_' + processed_df['선명'].str.replace(r'\s+', '', regex=True)).tolist()
-        fixed_indices = [i for i, key in enumerate(df_merge_keys) if key in fixed_ship_merge_keys]
-        
-        if fixed_indices:
-            # Forcing start time to be arrival time for fixed ships
-            model.addConstrs((t[i] == a_i_minutes[i] for i in fixed_indices), name="fix_start_time")
-
-    # --- 6. 모델 최적화 (콜백 포함) ---
-    import logging
-    import time
-    
-    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
-    
+    model.addConstr(w == t - a, name=_name("waiting_time"))
+    model.addConstr(t >= a, name=_name("arrival_constraints"))
+    model.addConstr(p + l <= L, name=_name("berth_length_constraints"))
+
+    if formulation == "full":
+        # 사용하지 않는 대각 원소, 제거된 쌍, 불가능한 관계의 이진 변수는 0으로 고정
+        x_ub = np.zeros((N, N))
+        y_ub = np.zeros((N, N))
+        x_ub[U, V] = x_ub[V, U] = side_by_side
+        y_ub[U, V] = u_first
+        y_ub[V, U] = v_first
+        x = model.addMVar((N, N), vtype=GRB.BINARY, ub=x_ub, name=_name("left_of"))
+        y = model.addMVar((N, N), vtype=GRB.BINARY, ub=y_ub, name=_name("before"))
+        variables = {'x': x, 'y': y}
+        n_binaries = 2 * N * N
+        n_free = int(x_ub.sum() + y_ub.sum())
+
+        # 순서쌍 (i, j), i != j. (j, i) 방향 제약은 순서쌍 (j, i)가 담당하므로 쌍마다 한 번씩만 추가
+        I, J = np.concatenate([U, V]), np.concatenate([V, U])
+        M_ij = np.concatenate([M_uv, M_vu])
+        model.addConstr(p[I] + l[I] <= p[J] + M_space * (1 - x[I, J]), name=_name("spatial_left"))
+        model.addConstr(t[I] + s[I] + buffer_minutes <= t[J] + M_ij * (1 - y[I, J]), name=_name("temporal_before"))
+        model.addConstr(x[U, V] + x[V, U] + y[U, V] + y[V, U] >= 1, name=_name("separation_required"))
+    else:
+        # 나란히 접안 불가 -> 시간 분리(z=1), 두 시간 순서 모두 불가 -> 공간 분리(z=0)
+        z_lb = (~side_by_side & (u_first | v_first)).astype(float)
+        z_ub = np.where(side_by_side & ~u_first & ~v_first, 0.0, 1.0)
+        # 시간 분리로 고정된 쌍에서 한쪽 순서만 가능하면 순서 변수도 고정
+        o_lb = ((z_lb == 1) & ~u_first).astype(float)
+        o_ub = np.where((z_lb == 1) & ~v_first, 0.0, 1.0)
+        z = model.addMVar(len(U), vtype=GRB.BINARY, lb=z_lb, ub=z_ub, name=_name("separated_in_time"))
+        o = model.addMVar(len(U), vtype=GRB.BINARY, lb=o_lb, ub=o_ub, name=_name("j_first"))
+        variables = {'z': z, 'o': o, 'pairs': (U, V)}
+        n_binaries = N * (N - 1)
+        n_free = int((z_lb < z_ub).sum() + (o_lb < o_ub).sum())
+
+        # (z, o) = (0, 0): i 왼쪽, (0, 1): j 왼쪽, (1, 0): i 먼저, (1, 1): j 먼저
+        model.addConstr(p[U] + l[U] <= p[V] + M_space * (z + o), name=_name("spatial_left"))
+        model.addConstr(p[V] + l[V] <= p[U] + M_space * (z + 1 - o), name=_name("spatial_right"))
+        model.addConstr(t[U] + s[U] + buffer_minutes <= t[V] + M_uv * (1 - z + o), name=_name("temporal_before"))
+        model.addConstr(t[V] + s[V] + buffer_minutes <= t[U] + M_vu * (2 - z - o), name=_name("temporal_after"))
+
+    fixed_indices = np.flatnonzero(inputs['fixed'])
+    if fixed_indices.size:
+        # Forcing start time to be arrival time for fixed ships
+        model.addConstr(t[fixed_indices] == a[fixed_indices], name=_name("fix_start_time"))
+
+    pinned_indices = np.flatnonzero(~np.isnan(inputs['fixed_position']))
+    if pinned_indices.size:
+        # 선석 위치까지 고정된 선박 (rolling horizon에서 이미 확정된 선박 등)
+        model.addConstr(p[pinned_indices] == inputs['fixed_position'][pinned_indices], name=_name("fix_position"))
+
+    variables.update({
+        't': t, 'p': p, 'w': w,
+        'stats': {
+            'pairs_total': N * (N - 1) // 2,
+            'pairs_pruned': N * (N - 1) // 2 - len(U),
+            'binaries_total': n_binaries,
+            'binaries_eliminated': n_binaries - n_free,
+        },
+    })
+    return model, variables
+
+
+def set_mip_start(variables, inputs, start, position):
+    """
+    휴리스틱 스케줄 (start, position)을 모델의 MIP start로 설정합니다.
+
+    연속 변수뿐 아니라 쌍별 이진 변수 값도 스케줄에서 계산해 넣으므로, Gurobi가 별도의
+    보정 없이 첫 incumbent로 바로 사용할 수 있습니다. 시간 분리가 성립하는 쌍은 시간 분리를,
+    그렇지 않으면 공간 분리를 선택합니다.
+    """
+    s, l, b = inputs['s'], inputs['l'], inputs['buffer']
+    start = np.asarray(start, dtype=float)
+    position = np.asarray(position, dtype=float)
+    tol = 1e-6
+
+    variables['t'].Start = start
+    variables['p'].Start = position
+    variables['w'].Start = start - inputs['a']
+
+    if 'z' in variables:
+        U, V = variables['pairs']
+        u_before = start[U] + s[U] + b <= start[V] + tol
+        v_before = start[V] + s[V] + b <= start[U] + tol
+        v_left = ~(position[U] + l[U] <= position[V] + tol)
+        z = u_before | v_before
+        variables['z'].Start = z.astype(float)
+        variables['o'].Start = np.where(z, v_before & ~u_before, v_left).astype(float)
+    else:
+        x, y = variables['x'], variables['y']
+        left = position[:, None] + l[:, None] <= position[None, :] + tol
+        before = start[:, None] + s[:, None] + b <= start[None, :] + tol
+        x.Start = (left * x.UB).astype(float)
+        y.Start = (before * y.UB).astype(float)
+
+
+def optimize_model(model, cancel_event, time_limit=None, mip_gap=None, threads=None, on_solution=None):
+    """
+    Gurobi 모델을 취소 콜백과 함께 최적화하고 풀이 정보를 반환합니다.
+
+    Args:
+        model (gp.Model): 최적화할 모델.
+        cancel_event (threading.Event): 설정되면 model.terminate()로 최적화를 중단합니다.
+        time_limit (float, optional): 최대 풀이 시간 (초).
+        mip_gap (float, optional): 상대 MIP gap 허용치.
+        threads (int, optional): 사용할 스레드 수. 없으면 Gurobi 기본값 (모든 코어).
+        on_solution (callable, optional): 새 incumbent를 찾을 때마다 MIPSOL 콜백에서 model을 인자로
+                                          호출합니다 (`model.cbGetSolution()`으로 해를 읽을 수 있음).
+
+    Returns:
+        dict: status, objective, bound, gap, runtime. 실행 가능해가 없으면 objective/bound/gap은 None.
+    """
+    if time_limit is not None:
+        model.Params.TimeLimit = time_limit
+    if mip_gap is not None:
+        model.Params.MIPGap = mip_gap
+    if threads is not None:
+        model.Params.Threads = threads
+
     def optimization_callback(model, where):
         if where == GRB.Callback.POLLING:
             if cancel_event.is_set():
                 model.terminate()
+        elif where == GRB.Callback.MIPSOL and on_solution is not None:
+            on_solution(model)
 
     logging.info("Starting optimization.")
     start_time = time.time()
-    
+
     model.optimize(optimization_callback)
-    
+
     end_time = time.time()
     logging.info(f"Optimization finished in {end_time - start_time:.2f} seconds.")
 
-    # --- 7. 결과 처리 ---
-    if model.status == GRB.OPTIMAL:
-        solution = []
-        for i in range(N):
-            start_minutes = t[i].x
-            start_hours = start_minutes / 60
-            waiting_minutes = w[i].x
-            waiting_hours = waiting_minutes / 60
-            completion_minutes = start_minutes + s_i[i]
-            completion_hours = completion_minutes / 60
-            position_m = p[i].x
-            
-            cleaned_ship_name = re.sub(r'\s+', '', processed_df.iloc[i]['선명'])
-            merge_key = f"{processed_df.iloc[i]['선사']}_{cleaned_ship_name}"
-
-            solution.append({
-                'Ship': processed_df.iloc[i]['선명'],
-                'merge_key': merge_key,
-                'Ship_ID': i + 1,
-                'Arrival_h': a_i[i],
-                'Start_h': start_hours,
-                'Completion_h': completion_hours,
-                'Waiting_h': waiting_hours,
-                'Service_min': s_i[i],
-                'Service_h': s_i[i] / 60,
-                'Length_m': l_i[i],
-                'Position_m': position_m,
-                'End_Position_m': position_m + l_i[i]
-            })
-
-        df_solution = pd.DataFrame(solution)
-        df_solution = df_solution.sort_values('Ship_ID').reset_index(drop=True)
-        
-        return df_solution
+    status = STATUS_NAMES.get(model.status, str(model.status))
+    has_solution = model.SolCount > 0
 
+    # 전처리로 이진 변수가 모두 없어진 모델은 LP이므로 ObjBound / MIPGap 속성이 없음
+    bound = gap = None
+    if has_solution and model.IsMIP:
+        bound, gap = model.ObjBound, model.MIPGap
+    elif has_solution and model.status == GRB.OPTIMAL:
+        bound, gap = model.ObjVal, 0.0
+
+    if has_solution and model.status != GRB.OPTIMAL:
+        logging.info(f"Returning best incumbent ({status}): objective {model.ObjVal:.1f}, "
+                     f"bound {bound if bound is not None else float('nan'):.1f}, "
+                     f"gap {gap if gap is not None else float('nan'):.2%}.")
     elif model.status == GRB.INFEASIBLE:
         model.computeIIS()
         for c in model.getConstrs():
             if c.IISConstr:
                 print(f"  Infeasible constraint: {c.constrName}")
-        return None
     elif model.status == GRB.INTERRUPTED:
         print("Optimization was interrupted.")
-        return None
-    else:
-        return None
+
+    return {
+        'status': status,
+        'objective': model.ObjVal if has_solution else None,
+        'bound': bound,
+        'gap': gap,
+        'runtime': model.Runtime,
+    }
@@ -1,9 +1,12 @@
 import pandas as pd
-import pickle
 import numpy as np
 import logging
 import os
 
+from model_registry import MODEL_REGISTRY
+from prediction_cache import PREDICTION_CACHE
+from vessel_registry import VESSEL_REGISTRY
+
 # Define the base directory for data files relative to the project root
 BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
 
@@ -25,25 +28,14 @@ def preprocess_for_prediction(df):
     """
     LGBM 모델 예측을 위해 데이터를 전처리합니다.
     """
-    ship_info_path = os.path.join(BACKEND_DIR, 'ship_info.csv')
-    ship_info_df = pd.read_csv(ship_info_path)
-    ship_info_df['merge_key'] = ship_info_df['선사'].astype(str) + '_' + ship_info_df['선명'].str.replace(r'\s+', '', regex=True)
-    ship_info_df.drop_duplicates(subset=['merge_key'], inplace=True)
-    df['merge_key'] = df['선사'].astype(str) + '_' + df['선명'].str.replace(r'\s+', '', regex=True)
-    
-    # merge_key를 기반으로 병합. 접미사를 지정하여 중복 열 처리
-    df = pd.merge(df, ship_info_df[['merge_key', '총톤수', 'LOA']], on='merge_key', how='left', suffixes=['_original', '_from_csv'])
-
-    # '총톤수'와 'LOA'가 중복된 경우, original 값을 우선 사용하고, 없으면 csv 값으로 채움
-    if '총톤수_original' in df.columns:
-        df['총톤수'] = df['총톤수_original'].combine_first(df['총톤수_from_csv'])
-        df.drop(columns=['총톤수_original', '총톤수_from_csv'], inplace=True)
-
-    if 'LOA_original' in df.columns:
-        df['LOA'] = df['LOA_original'].combine_first(df['LOA_from_csv'])
-        df.drop(columns=['LOA_original', 'LOA_from_csv'], inplace=True)
-
-    df.drop(columns=['merge_key'], inplace=True)
+    # 상주 선박 제원 색인에서 merge_key (선사_공백 없는 선명)로 총톤수와 LOA 조회
+    df = df.reset_index(drop=True)
+    gross_tonnage, loa = VESSEL_REGISTRY.enrich(df['선사'].astype(str), df['선명'])
+
+    # '총톤수'와 'LOA'가 이미 있으면 그 값을 우선 사용하고, 없으면 ship_info.csv 값으로 채움
+    for column, values in (('총톤수', gross_tonnage), ('LOA', loa)):
+        from_csv = pd.Series(values, index=df.index)
+        df[column] = df[column].combine_first(from_csv) if column in df.columns else from_csv
 
     # Add a flag for rows that will use averaged values
     df['uses_average_values'] = False
@@ -53,12 +45,13 @@ def preprocess_for_prediction(df):
     if not missing_info_rows.empty:
         df.loc[missing_info_rows.index, 'uses_average_values'] = True
         logger.info("일부 선박의 '총톤수' 또는 'LOA' 정보가 없어 평균값으로 대체:")
-        for index, row in missing_info_rows.iterrows():
-            logger.info(f"- 선사: {row['선사']}, 선명: {row['선명']}")
+        # 같은 선박이 여러 행에 있으면 (일괄 예측의 시나리오 등) 한 번만 기록
+        for company, name in missing_info_rows[['선사', '선명']].drop_duplicates().itertuples(index=False):
+            logger.info(f"- 선사: {company}, 선명: {name}")
         
-        # 평균값으로 결측치 대체
-        df['총톤수'].fillna(df['총톤수'].mean(), inplace=True)
-        df['LOA'].fillna(df['LOA'].mean(), inplace=True)
+        # 평균값으로 결측치 대체 (pandas copy-on-write에서는 열에 대한 inplace fillna가 적용되지 않음)
+        df['총톤수'] = df['총톤수'].fillna(df['총톤수'].mean())
+        df['LOA'] = df['LOA'].fillna(df['LOA'].mean())
 
     df = df.rename(columns={'Shift': 'shift'})
     df['접안예정일시'] = pd.to_datetime(df['접안예정일시'], errors='coerce')
@@ -88,17 +81,21 @@ def preprocess_for_prediction(df):
             
     return df
 
-def predict_work_time(crawled_df):
+def predict_work_time(crawled_df, cache=PREDICTION_CACHE):
     """
     크롤링된 데이터프레임을 받아 전처리 후, 작업소요시간을 예측하여 반환
+
+    cache (`prediction_cache.PredictionCache`)가 있으면 같은 모델 version으로 같은 피처를 예측한 적이 있는
+    선박은 모델을 호출하지 않고 이전 예측값을 사용합니다. None이면 모든 행을 모델로 예측합니다.
     """
     processed_df = preprocess_for_prediction(crawled_df)
 
-    model_path = os.path.join(BACKEND_DIR, 'lgbm_weight.pkl')
+    model_path = MODEL_REGISTRY.path
 
     try:
-        with open(model_path, 'rb') as f:
-            lgbm_model = pickle.load(f)
+        # 요청마다 파일을 읽지 않고 메모리에 상주하는 모델 사용 (파일이 바뀌면 자동 교체)
+        loaded = MODEL_REGISTRY.get()
+        lgbm_model = loaded['model']
 
         # Features for the new model (without '선사')
         features = ['입항시간', '입항요일', '입항분기', '입항계절', '총톤수', '양적하물량', 'shift']
@@ -109,8 +106,13 @@ def predict_work_time(crawled_df):
 
         X_predict = processed_df[features]
             
-        predicted_time = lgbm_model.predict(X_predict)
+        if cache is not None:
+            predicted_time = cache.predict(lgbm_model, loaded['version'], X_predict)
+        else:
+            predicted_time = lgbm_model.predict(X_predict)
         processed_df['predicted_work_time'] = predicted_time
+        # 모델로 예측한 경우에만 기록 (아래의 임의 값으로 대체한 경우에는 없음)
+        processed_df.attrs['model_version'] = loaded['version']
 
     except FileNotFoundError:
         print(f"Model file not found at {model_path}")
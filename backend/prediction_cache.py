@@ -0,0 +1,141 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+# 예측값 캐시 최대 항목 수, (선택) 재시작 후에도 사용할 캐시 파일 경로와 파일에 저장하는 최소 간격 (초)
+PREDICTION_CACHE_SIZE = int(os.environ.get('BAIPOT_PREDICTION_CACHE_SIZE', 50000))
+PREDICTION_CACHE_PATH = os.environ.get('BAIPOT_PREDICTION_CACHE_PATH')
+PREDICTION_CACHE_SAVE_INTERVAL = float(os.environ.get('BAIPOT_PREDICTION_CACHE_SAVE_INTERVAL', 60))
+
+
+def feature_keys(X):
+    """
+    예측 입력 (DataFrame)의 행별 캐시 키.
+
+    모델이 보는 값 그대로 (범주형 열은 범주 값, 결측은 None) 만든 튜플입니다. LightGBM은 열 dtype에
+    따라 입력 정밀도 (float32 / float64)를 정하므로 열 이름과 dtype도 키의 앞부분 (schema)에 포함합니다.
+
+    Returns:
+        tuple: (schema 문자열, 행별 값 튜플 목록).
+    """
+    schema = ','.join(f"{column}:{dtype}" for column, dtype in X.dtypes.items())
+    columns = []
+    for column in X.columns:
+        values = X[column].tolist()
+        columns.append([None if value is None or value != value else value for value in values])
+    return schema, list(zip(*columns))
+
+
+class PredictionCache:
+    """
+    (모델 version, 입력 피처) -> 예측값 캐시 (메모리 LRU) + 선택적 파일 저장.
+
+    같은 항차는 매일의 크롤링 결과에 최대 10일 동안 반복해서 나오고, 대부분은 피처 (입항시간, 총톤수,
+    양적하물량, shift 등)가 바뀌지 않습니다. `predict()`는 캐시에 없는 행만 모델로 예측합니다. 키에
+    모델 version이 있으므로 모델이 바뀌면 이전 항목은 사용되지 않고 LRU에서 밀려납니다.
+
+    path가 있으면 시작할 때 파일을 읽고, 새 항목이 생기면 save_interval초에 한 번 (및 `save()` 호출 시)
+    임시 파일에 쓴 뒤 이름을 바꿉니다.
+    """
+
+    def __init__(self, max_entries=PREDICTION_CACHE_SIZE, path=PREDICTION_CACHE_PATH,
+                 save_interval=PREDICTION_CACHE_SAVE_INTERVAL):
+        self.max_entries = max_entries
+        self.path = path
+        self.save_interval = save_interval
+        self.stats = {'hits': 0, 'misses': 0}
+        self._entries = OrderedDict()  # (model version, schema, 피처 값 튜플) -> 예측값
+        self._dirty = False
+        self._saved = time.monotonic()
+        self._lock = threading.Lock()
+        if path:
+            self._load()
+
+    def predict(self, model, version, X):
+        """
+        X (DataFrame)의 예측값. 캐시에 없는 행만 model.predict()로 한 번에 예측하고 결과를 저장합니다.
+
+        Args:
+            model: predict()가 있는 모델.
+            version (str): 모델 version (`model_registry`의 sha256 앞 12자리).
+            X (pd.DataFrame): 모델 입력 피처.
+
+        Returns:
+            np.ndarray: 행별 예측값 (float64).
+        """
+        schema, rows = feature_keys(X)
+        keys = [(version, schema, row) for row in rows]
+        predicted = np.empty(len(keys))
+        missing = []
+        with self._lock:
+            for i, key in enumerate(keys):
+                value = self._entries.get(key)
+                if value is None:
+                    missing.append(i)
+                else:
+                    self._entries.move_to_end(key)
+                    predicted[i] = value
+            self.stats['hits'] += len(keys) - len(missing)
+            self.stats['misses'] += len(missing)
+
+        if missing:
+            predicted[missing] = model.predict(X.iloc[missing])
+            with self._lock:
+                for i in missing:
+                    self._entries[keys[i]] = float(predicted[i])
+                    self._entries.move_to_end(keys[i])
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                self._dirty = True
+            if self.path and time.monotonic() - self._saved >= self.save_interval:
+                self.save()
+        return predicted
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._dirty = True
+
+    def save(self):
+        """바뀐 항목이 있으면 파일에 저장합니다 (LRU 순서 유지)."""
+        if not self.path:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            entries = [[version, schema, list(row), value] for (version, schema, row), value in self._entries.items()]
+            self._dirty = False
+            self._saved = time.monotonic()
+        try:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.json.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'entries': entries}, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logging.warning(f"Could not write prediction cache file {self.path}: {e}")
+
+    def _load(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                entries = json.load(f)['entries']
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError, KeyError) as e:
+            logging.warning(f"Ignoring unreadable prediction cache file {self.path}: {e}")
+            return
+        with self._lock:
+            for version, schema, row, value in entries[-self.max_entries:]:
+                self._entries[(version, schema, tuple(row))] = value
+
+
+PREDICTION_CACHE = PredictionCache()
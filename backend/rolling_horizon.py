@@ -0,0 +1,118 @@
+import logging
+import time
+
+import numpy as np
+
+from decomposition import interaction_components, subset_inputs
+from schedule import extract_model_inputs, build_solution_df
+from solvers import solve_inputs
+
+DEFAULT_SLICE_HOURS = 72  # 한 구간에서 확정할 입항 시간 범위 (시간)
+DEFAULT_OVERLAP_HOURS = 24  # 다음 구간과 겹쳐서 함께 풀지만 확정하지 않는 범위 (시간)
+
+
+def longest_component_days(processed_df, fixed_ship_merge_keys=None):
+    """
+    서로 영향을 주는 선박 그룹 (`decomposition.interaction_components()`) 중 입항 기간이 가장 긴
+    그룹의 기간 (일). 연결 요소 분해로는 작아지지 않는 혼잡한 장기간 인스턴스를 판별하는 데 사용합니다.
+    """
+    inputs = extract_model_inputs(processed_df, fixed_ship_merge_keys)
+    spans = [np.ptp(inputs['a'][idx]) for idx in interaction_components(inputs)]
+    return max(spans, default=0.0) / (24 * 60)
+
+
+def solve_rolling_horizon(processed_df, cancel_event, fixed_ship_merge_keys=None, backend=None,
+                          slice_hours=DEFAULT_SLICE_HOURS, overlap_hours=DEFAULT_OVERLAP_HOURS,
+                          time_limit=None, mip_gap=None):
+    """
+    긴 기간을 겹치는 시간 구간으로 나누어 차례로 푸는 rolling horizon 선석 배정.
+
+    k번째 구간은 입항 시간이 [T_k, T_k + slice + overlap)인 미확정 선박을 풀고, 그중 입항 시간이
+    T_k + slice 이전인 선박만 확정합니다. 겹치는 부분의 선박은 다음 구간에서 다시 풉니다.
+    이미 확정된 선박 중 (종료 + 버퍼) 시각이 다음 구간 시작 이후인 선박은 확정된 시작 시간과
+    선석 위치에 고정된 장애물로 다음 구간 모델에 포함됩니다.
+
+    각 구간 모델의 크기는 기간과 무관하므로 전체 기간을 하나의 모델로 풀 때보다 훨씬 빠르지만,
+    구간 경계에서의 결정이 근시안적이라 최적해를 보장하지는 않습니다.
+
+    Args:
+        processed_df (pd.DataFrame): 전처리 및 예측이 완료된 데이터프레임.
+        cancel_event (threading.Event): 최적화 중단을 위한 이벤트 객체.
+        fixed_ship_merge_keys (list, optional): 스케줄을 고정할 선박의 merge_key 리스트.
+        backend (str, optional): 솔버 백엔드 이름. `solvers.get_backend()` 참고.
+        slice_hours (float): 구간마다 확정할 입항 시간 범위 (시간).
+        overlap_hours (float): 다음 구간과 겹치는 범위 (시간).
+        time_limit (float, optional): 전체 최대 풀이 시간 (초). 남은 시간을 남은 구간 수로 나누어 배분합니다.
+        mip_gap (float, optional): 구간별 상대 gap 허용치.
+
+    Returns:
+        pd.DataFrame: 선석 배정 결과 (`attrs['solve_info']`에 slices 포함). 어느 구간이라도 해가 없거나
+                      중단되면 None.
+    """
+    if slice_hours <= 0 or overlap_hours < 0:
+        raise ValueError("slice_hours must be positive and overlap_hours non-negative.")
+
+    begin = time.time()
+    inputs = extract_model_inputs(processed_df, fixed_ship_merge_keys)
+    a, s, b = inputs['a'], inputs['s'], inputs['buffer']
+    slice_minutes, overlap_minutes = slice_hours * 60, overlap_hours * 60
+
+    start = a.copy()
+    position = np.zeros(inputs['N'])
+    committed = np.zeros(inputs['N'], dtype=bool)
+    statuses = []
+    slice_start = a.min() if inputs['N'] else 0.0
+    n_slices = int((a.max() - slice_start) // slice_minutes) + 1 if inputs['N'] else 0
+
+    for k in range(n_slices):
+        commit_end = slice_start + slice_minutes
+        free = np.flatnonzero(~committed & (a < commit_end + overlap_minutes))
+        if free.size == 0:
+            slice_start = commit_end
+            continue
+
+        # 다음 구간 선박과 시간상 겹칠 수 있는 확정 선박은 위치까지 고정된 장애물로 포함
+        carried = np.flatnonzero(committed & (start + s + b > slice_start))
+        idx = np.concatenate([carried, free])
+        sub = subset_inputs(inputs, idx)
+        sub['a'] = np.concatenate([start[carried], a[free]])
+        sub['fixed'] = np.concatenate([np.ones(carried.size, dtype=bool), inputs['fixed'][free]])
+        sub['fixed_position'] = np.concatenate([position[carried], inputs['fixed_position'][free]])
+
+        slice_time_limit = None
+        if time_limit is not None:
+            slice_time_limit = max(time_limit - (time.time() - begin), 0.0) / (n_slices - k)
+        solution, info = solve_inputs(sub, cancel_event, backend, slice_time_limit, mip_gap)
+        if solution is None:
+            print(f"No schedule found for rolling horizon slice {k + 1}/{n_slices} ({info['status']}).")
+            return None
+        statuses.append(info['status'])
+        logging.info(f"Rolling horizon slice {k + 1}/{n_slices}: {free.size} ships, {carried.size} carried over, "
+                     f"{info['status']} in {info['runtime']:.2f} seconds.")
+
+        # 겹치는 부분을 제외한 선박만 확정
+        start[free], position[free] = solution[0][carried.size:], solution[1][carried.size:]
+        commit = free[a[free] < commit_end]
+        committed[commit] = True
+        slice_start = commit_end
+
+        if cancel_event.is_set():
+            print("Rolling horizon was interrupted before all slices were solved.")
+            return None
+
+    if 'TIME_LIMIT' in statuses:
+        status = 'TIME_LIMIT'
+    else:
+        status = 'HEURISTIC'
+
+    df_solution = build_solution_df(processed_df, inputs, start, position)
+    df_solution.attrs['solve_info'] = {
+        'status': status,
+        'objective': float((start - a).sum()),
+        'bound': None,
+        'gap': None,
+        'runtime': time.time() - begin,
+        'backend': info['backend'] if statuses else backend,
+        'slices': len(statuses),
+    }
+    return df_solution
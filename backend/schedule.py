@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+
+QUAY_LENGTH = 1150  # 부두길이 (m)
+BUFFER_MINUTES = 60  # 선석 간격 시간 (분)
+
+
+def extract_model_inputs(processed_df, fixed_ship_merge_keys=None):
+    """
+    processed_df에서 선석 배정 모델 입력 배열을 추출합니다.
+
+    Args:
+        processed_df (pd.DataFrame): 전처리 및 예측이 완료된 데이터프레임.
+        fixed_ship_merge_keys (list, optional): 스케줄을 고정할 선박의 merge_key 리스트.
+
+    Returns:
+        dict: 작업 소요 시간(s, 분), 입항 시간(a, 기준 시각 대비 분), 선박 길이(l),
+              merge_key 리스트, 고정 선박 마스크(fixed), 고정 선석 위치(fixed_position,
+              고정하지 않은 선박은 NaN) 등을 담은 딕셔너리.
+    """
+    start_time_ref = processed_df['접안예정일시'].min()
+    a = ((processed_df['접안예정일시'] - start_time_ref).dt.total_seconds() / 60).to_numpy(dtype=float)
+    merge_keys = (processed_df['선사'].astype(str) + '_' + processed_df['선명'].str.replace(r'\s+', '', regex=True)).tolist()
+    fixed_keys = set(fixed_ship_merge_keys or [])
+
+    return {
+        's': processed_df['predicted_work_time'].to_numpy(dtype=float),
+        'a': a,
+        'l': processed_df['LOA'].to_numpy(dtype=float),
+        'merge_keys': merge_keys,
+        'fixed': np.array([key in fixed_keys for key in merge_keys], dtype=bool),
+        'fixed_position': np.full(len(processed_df), np.nan),
+        'start_time_ref': start_time_ref,
+        'N': len(processed_df),
+        'L': QUAY_LENGTH,
+        'buffer': BUFFER_MINUTES,
+    }
+
+
+def build_solution_df(processed_df, inputs, start_minutes, positions):
+    """
+    선박별 시작 시간(분)과 선석 위치(m) 배열로 결과 데이터프레임을 생성합니다.
+
+    Returns:
+        pd.DataFrame: Ship, merge_key, Ship_ID, Arrival_h, Start_h, Completion_h, Waiting_h,
+                      Service_min, Service_h, Length_m, Position_m, End_Position_m 컬럼.
+    """
+    s, a, l = inputs['s'], inputs['a'], inputs['l']
+    start_minutes = np.asarray(start_minutes, dtype=float)
+    positions = np.asarray(positions, dtype=float)
+
+    df_solution = pd.DataFrame({
+        'Ship': processed_df['선명'].tolist(),
+        'merge_key': inputs['merge_keys'],
+        'Ship_ID': np.arange(1, inputs['N'] + 1),
+        'Arrival_h': a / 60,
+        'Start_h': start_minutes / 60,
+        'Completion_h': (start_minutes + s) / 60,
+        'Waiting_h': (start_minutes - a) / 60,
+        'Service_min': s,
+        'Service_h': s / 60,
+        'Length_m': l,
+        'Position_m': positions,
+        'End_Position_m': positions + l,
+    })
+    return df_solution.sort_values('Ship_ID').reset_index(drop=True)
+
+
+def validate_schedule(inputs, start_minutes, positions, tol=1e-4):
+    """
+    스케줄이 선석 배정 제약을 모두 만족하는지 검사합니다.
+
+    Returns:
+        list: 위반 사항 설명 문자열 리스트. 비어 있으면 실행 가능한 스케줄입니다.
+    """
+    s, a, l, fixed = inputs['s'], inputs['a'], inputs['l'], inputs['fixed']
+    L, b = inputs['L'], inputs['buffer']
+    start = np.asarray(start_minutes, dtype=float)
+    position = np.asarray(positions, dtype=float)
+    violations = []
+
+    for i in np.flatnonzero(start < a - tol):
+        violations.append(f"ship {i} starts before arrival")
+    for i in np.flatnonzero(fixed & (np.abs(start - a) > tol)):
+        violations.append(f"fixed ship {i} does not start at arrival")
+    pinned = ~np.isnan(inputs['fixed_position'])
+    for i in np.flatnonzero(pinned & (np.abs(position - np.nan_to_num(inputs['fixed_position'])) > tol)):
+        violations.append(f"ship {i} is not at its fixed position")
+    for i in np.flatnonzero((position < -tol) | (position + l > L + tol)):
+        violations.append(f"ship {i} exceeds the quay")
+
+    U, V = np.triu_indices(len(start), k=1)
+    separated = ((start[U] + s[U] + b <= start[V] + tol) | (start[V] + s[V] + b <= start[U] + tol) |
+                 (position[U] + l[U] <= position[V] + tol) | (position[V] + l[V] <= position[U] + tol))
+    for i, j in zip(U[~separated], V[~separated]):
+        violations.append(f"ships {i} and {j} overlap")
+    return violations
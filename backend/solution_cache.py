@@ -0,0 +1,173 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# 메모리 캐시 최대 항목 수와 (선택) 여러 uvicorn worker가 공유하는 디스크 캐시 경로
+SOLUTION_CACHE_SIZE = int(os.environ.get('BAIPOT_SOLUTION_CACHE_SIZE', 128))
+SOLUTION_CACHE_DIR = os.environ.get('BAIPOT_SOLUTION_CACHE_DIR')
+
+# 가장 비슷한 캐시 해를 초기해로 쓸 최소 선박 일치 비율
+MIN_WARM_START_OVERLAP = 0.5
+
+
+def _canonical_order(inputs):
+    """입력 순서와 무관한 키를 만들기 위한 선박 정렬 순서 (입항, 작업 시간, 길이, 고정 여부 순)"""
+    return np.lexsort((np.nan_to_num(inputs['fixed_position'], nan=-1.0), inputs['fixed'],
+                       inputs['l'], inputs['s'], inputs['a']))
+
+
+def inputs_key(inputs, backend):
+    """
+    솔버 입력의 내용 기반 해시 키.
+
+    작업 시간, 입항 시간 (기준 시각 대비 분), 선박 길이, 고정 선박 및 고정 위치, 부두 길이, 버퍼,
+    백엔드 이름으로 만듭니다. 선박 순서에는 영향을 받지 않습니다.
+    """
+    order = _canonical_order(inputs)
+    digest = hashlib.sha256()
+    digest.update(json.dumps([backend, inputs['N'], float(inputs['L']), float(inputs['buffer'])]).encode())
+    for name in ('s', 'a', 'l', 'fixed'):
+        digest.update(np.ascontiguousarray(inputs[name][order]).tobytes())
+    digest.update(np.ascontiguousarray(np.nan_to_num(inputs['fixed_position'][order], nan=-1.0)).tobytes())
+    return digest.hexdigest()
+
+
+class SolutionCache:
+    """
+    `solvers.solve_inputs()` 결과의 LRU 캐시 (메모리) + 선택적 디스크 캐시.
+
+    항목은 정렬된 선박 순서의 (start, position)과 solve_info, 풀이 조건 (time_limit, mip_gap)을
+    저장합니다. 디스크 캐시는 `<key>.npz` 파일이며 임시 파일을 쓴 뒤 이름을 바꾸어 여러 프로세스가
+    동시에 써도 깨진 파일을 읽지 않습니다.
+    """
+
+    def __init__(self, max_entries=SOLUTION_CACHE_SIZE, directory=SOLUTION_CACHE_DIR):
+        self.max_entries = max_entries
+        self.directory = directory
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def get(self, key):
+        """키에 해당하는 항목. 메모리에 없으면 디스크에서 찾아 메모리에 올립니다."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+
+        entry = self._load(key)
+        if entry is not None:
+            self._remember(key, entry)
+        return entry
+
+    def put(self, key, inputs, start, position, solve_info, time_limit=None, mip_gap=None):
+        """풀이 결과를 저장합니다. 중단된 풀이는 저장하지 않습니다."""
+        if solve_info['status'] == 'INTERRUPTED':
+            return
+        order = _canonical_order(inputs)
+        entry = {
+            'start': np.asarray(start, dtype=float)[order] - inputs['a'][order],
+            'position': np.asarray(position, dtype=float)[order],
+            'merge_keys': [inputs['merge_keys'][i] for i in order],
+            'solve_info': dict(solve_info),
+            'time_limit': time_limit,
+            'mip_gap': mip_gap,
+        }
+        self._remember(key, entry)
+        self._save(key, entry)
+
+    def closest(self, inputs, backend):
+        """
+        메모리 캐시 중 같은 백엔드로 푼, 선박 (merge_key)이 가장 많이 겹치는 항목의 선박별 대기 시간.
+
+        Returns:
+            np.ndarray: inputs 순서의 캐시 대기 시간 (분, 일치하지 않는 선박은 NaN). 없으면 None.
+        """
+        keys = inputs['merge_keys']
+        best, best_overlap = None, MIN_WARM_START_OVERLAP * len(keys)
+        with self._lock:
+            entries = list(self._entries.values())
+        for entry in entries:
+            if entry['solve_info'].get('backend') != backend:
+                continue
+            overlap = len(set(keys) & set(entry['merge_keys']))
+            if overlap > best_overlap:
+                best, best_overlap = entry, overlap
+        if best is None:
+            return None
+        waiting = dict(zip(best['merge_keys'], best['start']))
+        return np.array([waiting.get(key, np.nan) for key in keys])
+
+    def restore(self, entry, inputs):
+        """정렬된 순서로 저장된 항목을 inputs 순서의 (start, position) 배열로 되돌립니다."""
+        order = _canonical_order(inputs)
+        start, position = np.empty(inputs['N']), np.empty(inputs['N'])
+        start[order] = entry['start'] + inputs['a'][order]
+        position[order] = entry['position']
+        return start, position
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _remember(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.npz")
+
+    def _load(self, key):
+        if not self.directory or not os.path.exists(self._path(key)):
+            return None
+        try:
+            with np.load(self._path(key), allow_pickle=False) as data:
+                meta = json.loads(str(data['meta']))
+                return dict(meta, start=data['start'], position=data['position'])
+        except (OSError, ValueError, KeyError) as e:
+            logging.warning(f"Ignoring unreadable solution cache file {self._path(key)}: {e}")
+            return None
+
+    def _save(self, key, entry):
+        if not self.directory:
+            return
+        meta = {name: value for name, value in entry.items() if name not in ('start', 'position')}
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.npz.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(f, start=entry['start'], position=entry['position'], meta=np.array(json.dumps(meta)))
+            os.replace(tmp_path, self._path(key))
+        except OSError as e:
+            logging.warning(f"Could not write solution cache file {self._path(key)}: {e}")
+
+
+def is_reusable(entry, time_limit=None, mip_gap=None):
+    """
+    캐시 항목을 다시 풀지 않고 그대로 반환해도 되는지 여부.
+
+    최적해이거나 (더 느슨한 gap 허용치로 얻은 "최적해"는 제외), 요청한 gap 이하로 증명된 해이거나,
+    요청한 시간 이상으로 풀어 얻은 해이면 같은 입력을 다시 풀어도 더 나은 해를 기대할 수 없으므로
+    재사용합니다.
+    """
+    info = entry['solve_info']
+    if info['status'] == 'OPTIMAL' and (entry['mip_gap'] is None or (mip_gap is not None and entry['mip_gap'] <= mip_gap)):
+        return True
+    if mip_gap is not None and info.get('gap') is not None and info['gap'] <= mip_gap:
+        return True
+    if time_limit is not None and entry['time_limit'] is not None and entry['time_limit'] >= time_limit:
+        return True
+    return False
+
+
+SOLUTION_CACHE = SolutionCache()
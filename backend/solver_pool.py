@@ -0,0 +1,101 @@
+import logging
+import os
+import threading
+from contextlib import contextmanager
+
+# 동시에 실행되는 모든 풀이가 나누어 쓸 전체 스레드 수와 미리 생성할 Gurobi 환경 수
+SOLVER_THREADS = int(os.environ.get('BAIPOT_SOLVER_THREADS', os.cpu_count() or 1))
+GUROBI_POOL_SIZE = int(os.environ.get('BAIPOT_GUROBI_POOL_SIZE', 2))
+
+
+class ThreadBudget:
+    """
+    프로세스 안에서 동시에 실행 중인 풀이 작업 수를 세고, 새 작업에 전체 스레드 중 한 몫을 배정합니다.
+
+    n번째로 시작하는 작업은 total // n 스레드 (최소 1)를 받습니다. 이미 실행 중인 작업의 스레드 수는
+    바뀌지 않으므로 동시 작업이 많을 때 잠시 total을 넘을 수 있지만, 모든 작업이 모든 코어를 쓰는
+    것보다 훨씬 덜 경합합니다.
+    """
+
+    def __init__(self, total=SOLVER_THREADS):
+        self.total = max(int(total), 1)
+        self.active = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def lease(self):
+        """작업 동안 스레드 몫을 빌립니다. `with budget.lease() as threads:` 형태로 사용합니다."""
+        with self._lock:
+            self.active += 1
+            threads = max(self.total // self.active, 1)
+        try:
+            yield threads
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+class GurobiEnvPool:
+    """
+    미리 시작해 둔 `gurobipy.Env`의 풀.
+
+    Env를 만들 때마다 라이선스 확인과 초기화 비용이 들므로 애플리케이션 시작 시 `start()`로
+    size개를 만들어 두고 풀이마다 빌려 씁니다. gurobipy가 없으면 `start()`는 아무것도 하지 않습니다.
+    """
+
+    def __init__(self, size=GUROBI_POOL_SIZE):
+        self.size = size
+        self._idle = []
+        self._pooled = set()
+        self._lock = threading.Lock()
+
+    def start(self):
+        """size개의 Env를 생성합니다 (이미 시작했으면 부족한 만큼만)."""
+        try:
+            import gurobipy as gp
+        except ImportError:
+            return
+        with self._lock:
+            while len(self._pooled) < self.size:
+                env = gp.Env()
+                self._pooled.add(env)
+                self._idle.append(env)
+        logging.info(f"Started {self.size} Gurobi environments ({SOLVER_THREADS} solver threads).")
+
+    def acquire(self):
+        """
+        유휴 Env 하나를 빌립니다. 없으면 새로 만들어 풀이 size개가 될 때까지 풀에 추가하고, 그 이상은
+        반납할 때 해제하는 임시 Env로 사용합니다. (`start()`를 호출하지 않은 프로세스 풀 작업 프로세스
+        에서는 처음 사용할 때 풀이 채워집니다.)
+        """
+        import gurobipy as gp
+
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+            if len(self._pooled) < self.size:
+                env = gp.Env()
+                self._pooled.add(env)
+                return env
+        logging.info("All pooled Gurobi environments are busy; creating a temporary one.")
+        return gp.Env()
+
+    def release(self, env):
+        """빌린 Env를 반납합니다. 임시 Env는 해제합니다."""
+        with self._lock:
+            if env in self._pooled:
+                self._idle.append(env)
+                return
+        env.dispose()
+
+    def shutdown(self):
+        """유휴 Env를 모두 해제합니다 (애플리케이션 종료 시 호출)."""
+        with self._lock:
+            for env in self._idle:
+                env.dispose()
+            self._pooled.difference_update(self._idle)
+            self._idle.clear()
+
+
+THREAD_BUDGET = ThreadBudget()
+GUROBI_ENV_POOL = GurobiEnvPool()
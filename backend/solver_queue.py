@@ -0,0 +1,153 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import math
+import os
+import time
+
+# 동시에 실행할 최대 풀이 수, 우선순위 클래스별 최대 대기 작업 수, 최대 대기 시간 (초)
+SOLVER_WORKERS = int(os.environ.get('BAIPOT_SOLVER_WORKERS', 2))
+SOLVER_QUEUE_DEPTH = int(os.environ.get('BAIPOT_SOLVER_QUEUE_DEPTH', 16))
+SOLVER_MAX_QUEUE_WAIT = float(os.environ.get('BAIPOT_SOLVER_MAX_QUEUE_WAIT', 120))
+
+# 우선순위 클래스 (작을수록 먼저 실행)
+INTERACTIVE = 0  # ETD 계산처럼 사용자가 바로 결과를 기다리는 요청
+BULK = 1  # 기간 전체 최적화
+
+PRIORITY_NAMES = {INTERACTIVE: 'interactive', BULK: 'bulk'}
+
+
+class QueueRejected(Exception):
+    """
+    대기열이 가득 찼거나 (429) 최대 대기 시간 안에 실행되지 못한 (503) 작업.
+
+    retry_after는 다시 시도하기까지 권장 대기 시간 (초)입니다.
+    """
+
+    def __init__(self, status_code, message, retry_after):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class SolverQueue:
+    """
+    우선순위 대기열이 있는 풀이 작업 스케줄러 (asyncio 이벤트 루프에서 사용).
+
+    최대 workers개의 작업을 `asyncio.to_thread()`로 동시에 실행하고, 나머지는 우선순위 클래스,
+    도착 순서대로 기다립니다. 실행 중인 작업이 끝나면 슬롯을 가장 앞의 대기 작업에 바로 넘깁니다.
+
+    클래스별 대기 작업이 depth개이면 새 작업을 429로 거절하고, max_wait초 안에 실행되지 못한
+    작업은 대기열에서 빼고 503으로 거절합니다. 두 경우 모두 최근 작업 시간의 지수 이동 평균으로
+    계산한 재시도 권장 시간을 함께 반환합니다.
+    """
+
+    def __init__(self, workers=SOLVER_WORKERS, depth=SOLVER_QUEUE_DEPTH, max_wait=SOLVER_MAX_QUEUE_WAIT,
+                 job_seconds=30.0):
+        self.workers = max(int(workers), 1)
+        self.depth = depth
+        self.max_wait = max_wait
+        self.job_seconds = job_seconds
+        self.running = 0
+        self._waiting = []  # [priority, 순번, future, cancel_event] 힙
+        self._counter = itertools.count()
+
+    def queued(self, priority=None):
+        """대기 중인 작업 수 (priority를 주면 그 클래스만)"""
+        return sum(1 for entry in self._waiting if priority is None or entry[0] == priority)
+
+    def retry_after(self, ahead):
+        """앞에 ahead개의 작업이 있을 때 슬롯을 얻기까지 예상 시간 (초, 최소 1)"""
+        return max(math.ceil((ahead // self.workers + 1) * self.job_seconds), 1)
+
+    async def run(self, fn, *args, priority=BULK, cancel_event=None, on_start=None, **kwargs):
+        """
+        슬롯을 얻을 때까지 기다린 뒤 fn(*args, **kwargs)를 별도 스레드에서 실행합니다.
+
+        Args:
+            fn (callable): 실행할 (블로킹) 함수.
+            priority (int): INTERACTIVE 또는 BULK.
+            cancel_event (threading.Event, optional): 대기 중에 이 이벤트로 `cancel()`을 호출하면 실행하지 않고
+                대기열에서 뺍니다.
+            on_start (callable, optional): 슬롯을 얻어 fn을 실행하기 직전에 인자 없이 호출합니다.
+
+        Returns:
+            tuple: (fn의 반환값, 대기 시간 (초)). 대기 중에 취소되면 반환값은 None입니다.
+
+        Raises:
+            QueueRejected: 대기열이 가득 찼거나 최대 대기 시간을 넘은 경우.
+        """
+        enqueued = time.monotonic()
+        acquired = await self._acquire(priority, cancel_event)
+        queue_wait = time.monotonic() - enqueued
+        if not acquired:
+            return None, queue_wait
+
+        started = time.monotonic()
+        try:
+            if on_start is not None:
+                on_start()
+            return await asyncio.to_thread(fn, *args, **kwargs), queue_wait
+        finally:
+            self._release(time.monotonic() - started)
+
+    def cancel(self, cancel_event):
+        """cancel_event로 대기 중인 작업을 대기열에서 빼고 실행하지 않고 끝냅니다 (이벤트 루프에서 호출)."""
+        for entry in [entry for entry in self._waiting if entry[3] is cancel_event]:
+            self._remove(entry)
+            entry[2].set_result(False)
+
+    async def _acquire(self, priority, cancel_event):
+        if cancel_event is not None and cancel_event.is_set():
+            return False
+        if self.running < self.workers and not self._waiting:
+            self.running += 1
+            return True
+
+        ahead = self.running + sum(1 for entry in self._waiting if entry[0] <= priority)
+        if self.queued(priority) >= self.depth:
+            raise QueueRejected(429, f"The {PRIORITY_NAMES[priority]} solver queue is full "
+                                     f"({self.depth} jobs waiting).", self.retry_after(ahead))
+
+        # future는 슬롯을 넘겨받으면 True, cancel()로 취소되면 False가 됩니다
+        future = asyncio.get_running_loop().create_future()
+        entry = [priority, next(self._counter), future, cancel_event]
+        heapq.heappush(self._waiting, entry)
+        try:
+            await asyncio.wait_for(asyncio.shield(future), self.max_wait)
+        except asyncio.TimeoutError:
+            if not future.done():
+                self._remove(entry)
+                ahead = self.running + sum(1 for waiting in self._waiting if waiting[0] <= priority)
+                raise QueueRejected(503, f"The solver job waited more than {self.max_wait:.0f} seconds in the queue.",
+                                    self.retry_after(ahead))
+        except BaseException:
+            # 기다리던 작업이 취소됨: 이미 넘겨받은 슬롯은 다음 작업에 넘기고, 아니면 대기열에서 뺌
+            if not future.done():
+                self._remove(entry)
+            elif future.result():
+                self._hand_off()
+            raise
+
+        if not future.result():
+            logging.info("Solver job was cancelled while queued.")
+        return future.result()
+
+    def _remove(self, entry):
+        self._waiting.remove(entry)
+        heapq.heapify(self._waiting)
+
+    def _release(self, job_seconds):
+        self.job_seconds = 0.8 * self.job_seconds + 0.2 * job_seconds
+        self._hand_off()
+
+    def _hand_off(self):
+        if self._waiting:
+            # 실행 슬롯을 그대로 다음 작업에 넘김
+            heapq.heappop(self._waiting)[2].set_result(True)
+        else:
+            self.running -= 1
+
+
+SOLVER_QUEUE = SolverQueue()
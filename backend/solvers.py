@@ -0,0 +1,463 @@
+import functools
+import logging
+import math
+import os
+import threading
+import time
+from contextlib import nullcontext
+
+import numpy as np
+
+from heuristics import first_fit_schedule, simulated_annealing, waiting_upper_bound
+from schedule import extract_model_inputs, build_solution_df
+from solution_cache import SOLUTION_CACHE, inputs_key, is_reusable
+from solver_pool import GUROBI_ENV_POOL, THREAD_BUDGET
+
+# 요청에서 솔버를 지정하지 않았을 때 사용할 백엔드 (환경 변수로 설정)
+DEFAULT_BACKEND = os.environ.get('BAIPOT_SOLVER_BACKEND')
+
+
+class SolverBackend:
+    """
+    선석 배정 솔버 백엔드 공통 인터페이스.
+
+    한 번의 풀이마다 인스턴스를 하나 생성하며, build -> warm_start -> solve -> extract_solution
+    순서로 호출한 뒤 close()로 자원을 반납합니다.
+    """
+    name = None
+
+    def build(self, inputs, upper_bound=None):
+        """`extract_model_inputs()` 결과로 모델을 생성합니다. upper_bound는 총 대기 시간 상한 (분)."""
+        raise NotImplementedError
+
+    def warm_start(self, inputs, start, position):
+        """실행 가능한 스케줄 (start, position)을 초기해로 전달합니다."""
+        raise NotImplementedError
+
+    def solve(self, cancel_event, time_limit=None, mip_gap=None, threads=None, on_incumbent=None):
+        """
+        모델을 풉니다. cancel_event가 설정되면 가능한 빨리 중단합니다. threads는 사용할 스레드 수입니다.
+        on_incumbent가 있으면 더 좋은 해를 찾을 때마다 (start, position)으로 호출합니다 (지원하는 백엔드만).
+
+        Returns:
+            dict: status, objective, bound, gap, runtime.
+        """
+        raise NotImplementedError
+
+    def extract_solution(self):
+        """최선해의 (start, position) 배열. 해가 없으면 None."""
+        raise NotImplementedError
+
+    def close(self):
+        """모델과 솔버 환경 등 풀이에 사용한 자원을 해제합니다."""
+
+
+class GurobiBackend(SolverBackend):
+    """Gurobi MILP (compact 정식화, 쌍별 전처리). 모델은 `GUROBI_ENV_POOL`에서 빌린 Env에 생성합니다."""
+    name = 'gurobi'
+    model = env = None
+
+    def build(self, inputs, upper_bound=None):
+        from optimization import build_milp_model
+
+        self.inputs = inputs
+        self.env = GUROBI_ENV_POOL.acquire()
+        self.model, self.variables = build_milp_model(inputs, upper_bound=upper_bound, env=self.env)
+
+    def warm_start(self, inputs, start, position):
+        from optimization import set_mip_start
+
+        set_mip_start(self.variables, inputs, start, position)
+
+    def solve(self, cancel_event, time_limit=None, mip_gap=None, threads=None, on_incumbent=None):
+        from optimization import optimize_model
+
+        on_solution = None
+        if on_incumbent is not None:
+            def on_solution(model):
+                on_incumbent(model.cbGetSolution(self.variables['t']), model.cbGetSolution(self.variables['p']))
+
+        return optimize_model(self.model, cancel_event, time_limit=time_limit, mip_gap=mip_gap, threads=threads,
+                              on_solution=on_solution)
+
+    def extract_solution(self):
+        if self.model.SolCount == 0:
+            return None
+        return self.variables['t'].X, self.variables['p'].X
+
+    def close(self):
+        if self.model is not None:
+            self.model.dispose()
+            self.model = None
+        if self.env is not None:
+            GUROBI_ENV_POOL.release(self.env)
+            self.env = None
+
+
+class CpSatBackend(SolverBackend):
+    """
+    OR-Tools CP-SAT. 선박마다 시간 구간 [t, t + s + buffer)과 선석 구간 [p, p + l)을 만들고
+    AddNoOverlap2D로 두 선박의 직사각형이 겹치지 않게 합니다.
+
+    CP-SAT은 정수 모델이므로 시간은 분, 위치는 m 단위로 올림하여 사용합니다 (입항 시간, 작업
+    시간, 선박 길이는 올림, 부두 길이는 내림). 원래 값 그대로 출력하는 고정 선박의 시작 시간과 고정
+    위치는 시작을 내림, 끝을 올림하여 모델의 직사각형이 원래 직사각형을 덮게 합니다. 따라서 구한
+    스케줄은 원래 (실수) 문제에서도 항상 실행 가능하며, 목적함수 값은 원래 입항 시간 기준으로 다시
+    계산합니다. bound는 올림한 정수 모델의 하한입니다.
+    """
+    name = 'cpsat'
+
+    def build(self, inputs, upper_bound=None):
+        from ortools.sat.python import cp_model
+
+        self.inputs = inputs
+        fixed = np.asarray(inputs['fixed'], dtype=bool)
+        pinned = ~np.isnan(inputs['fixed_position'])
+        # 고정 선박은 원래 입항 시간에, 고정 위치는 원래 위치에 출력되므로 [내림(시작), 올림(끝))으로 덮음
+        a = np.where(fixed, np.floor(inputs['a'] + 1e-9), np.ceil(inputs['a'] - 1e-9)).astype(int)
+        s = np.where(fixed, np.ceil(inputs['a'] + inputs['s'] - 1e-9) - a, np.ceil(inputs['s'] - 1e-9)).astype(int)
+        fixed_position = np.floor(inputs['fixed_position'] + 1e-9)
+        l = np.where(pinned, np.ceil(inputs['fixed_position'] + inputs['l'] - 1e-9) - fixed_position,
+                     np.ceil(inputs['l'] - 1e-9)).astype(int)
+        L = int(math.floor(inputs['L']))
+        b = int(math.ceil(inputs['buffer']))
+        # 실수 입력으로 구한 상한은 올림한 모델에서 성립하지 않을 수 있으므로 정수 입력으로 다시 계산
+        rounded = dict(inputs, a=a.astype(float), s=s.astype(float), l=l.astype(float), L=L, buffer=b,
+                       fixed_position=fixed_position)
+        horizon = int(math.ceil(waiting_upper_bound(rounded))) + 1
+
+        model = cp_model.CpModel()
+        self.t, self.p = [], []
+        x_intervals, y_intervals = [], []
+        for i in range(inputs['N']):
+            t_ub = a[i] if inputs['fixed'][i] else a[i] + horizon
+            t = model.NewIntVar(int(a[i]), int(t_ub), f"start_time_{i}")
+            if np.isnan(inputs['fixed_position'][i]):
+                p = model.NewIntVar(0, max(L - int(l[i]), 0), f"position_{i}")
+            else:
+                p = model.NewIntVar(int(fixed_position[i]), int(fixed_position[i]), f"position_{i}")
+            y_intervals.append(model.NewFixedSizeIntervalVar(t, int(s[i]) + b, f"time_{i}"))
+            x_intervals.append(model.NewFixedSizeIntervalVar(p, int(l[i]), f"quay_{i}"))
+            self.t.append(t)
+            self.p.append(p)
+
+        model.AddNoOverlap2D(x_intervals, y_intervals)
+        # 같은 시간에 접안한 선박 길이의 합은 부두 길이 이하 (하한 강화를 위한 중복 제약)
+        model.AddCumulative(y_intervals, [int(length) for length in l], L)
+        model.Minimize(sum(self.t) - int(a.sum()))
+        self.model = model
+        self.solver = cp_model.CpSolver()
+        # 고정 선박의 대기 시간은 항상 0이므로 하한 보정에서 제외
+        self.a_offset = np.where(fixed, 0.0, a - inputs['a'])
+        self.rounded = rounded
+
+    def warm_start(self, inputs, start, position):
+        # 실수 스케줄을 그대로 올림하면 정수 모델에서 겹칠 수 있으므로, 같은 배정 순서로
+        # 정수 입력에 대해 first-fit을 다시 수행한 스케줄을 hint로 사용
+        r = self.rounded
+        hint = first_fit_schedule(r['a'], r['s'], r['l'], r['fixed'], r['L'], r['buffer'],
+                                  order=np.argsort(start, kind='stable'), fixed_position=r['fixed_position'])
+        if hint is None:
+            return
+        for var, value in zip(self.t, hint[0]):
+            self.model.AddHint(var, int(round(value)))
+        for var, value in zip(self.p, hint[1]):
+            self.model.AddHint(var, int(round(value)))
+
+    def solve(self, cancel_event, time_limit=None, mip_gap=None, threads=None, on_incumbent=None):
+        from ortools.sat.python import cp_model
+
+        if time_limit is not None:
+            self.solver.parameters.max_time_in_seconds = time_limit
+        if mip_gap is not None:
+            self.solver.parameters.relative_gap_limit = mip_gap
+        self.solver.parameters.num_workers = threads or os.cpu_count() or 1
+
+        # CP-SAT에는 POLLING 콜백이 없으므로 별도 스레드에서 취소 이벤트를 감시
+        done = threading.Event()
+
+        def _watch_cancel():
+            while not done.wait(0.1):
+                if cancel_event.is_set():
+                    self.solver.StopSearch()
+                    return
+
+        watcher = threading.Thread(target=_watch_cancel, daemon=True)
+        watcher.start()
+
+        callback = None
+        if on_incumbent is not None:
+            backend = self
+
+            class _IncumbentCallback(cp_model.CpSolverSolutionCallback):
+                def on_solution_callback(self):
+                    on_incumbent(*backend._restore(self.Value))
+
+            callback = _IncumbentCallback()
+
+        logging.info("Starting CP-SAT search.")
+        start_time = time.time()
+        try:
+            self.status = self.solver.Solve(self.model, callback)
+        finally:
+            done.set()
+            watcher.join()
+        logging.info(f"CP-SAT search finished in {time.time() - start_time:.2f} seconds.")
+
+        has_solution = self.status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+        if self.status == cp_model.OPTIMAL:
+            status = 'OPTIMAL'
+        elif cancel_event.is_set():
+            status = 'INTERRUPTED'
+        elif has_solution:
+            status = 'TIME_LIMIT'
+        else:
+            status = self.solver.StatusName(self.status)
+
+        objective = bound = gap = None
+        if has_solution:
+            start, _ = self.extract_solution()
+            objective = float((start - self.inputs['a']).sum())
+            bound = self.solver.BestObjectiveBound() + float(self.a_offset.sum())
+            gap = (objective - bound) / objective if objective > 1e-9 else 0.0
+
+        return {
+            'status': status,
+            'objective': objective,
+            'bound': bound,
+            'gap': gap,
+            'runtime': self.solver.WallTime(),
+        }
+
+    def extract_solution(self):
+        from ortools.sat.python import cp_model
+
+        if self.status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            return None
+        return self._restore(self.solver.Value)
+
+    def _restore(self, value):
+        """정수 변수 값 (value(var))을 원래 입력의 (start, position)으로 변환합니다."""
+        start = np.array([value(t) for t in self.t], dtype=float)
+        position = np.array([value(p) for p in self.p], dtype=float)
+        # 고정 선박은 원래 입항 시간, 원래 선석 위치에 배정
+        start = np.where(self.inputs['fixed'], self.inputs['a'], start)
+        position = np.where(np.isnan(self.inputs['fixed_position']), position, self.inputs['fixed_position'])
+        return start, position
+
+
+class LocalSearchBackend(SolverBackend):
+    """Gurobi 없이 동작하는 simulated annealing (`heuristics.simulated_annealing()`)"""
+    name = 'local_search'
+
+    def build(self, inputs, upper_bound=None):
+        self.inputs = inputs
+        self.initial_order = None
+        self.result = None
+
+    def warm_start(self, inputs, start, position):
+        self.initial_order = np.argsort(start, kind='stable')
+
+    def solve(self, cancel_event, time_limit=None, mip_gap=None, threads=None, on_incumbent=None):
+        inputs = self.inputs
+        self.result = simulated_annealing(inputs['a'], inputs['s'], inputs['l'], inputs['fixed'], inputs['L'], inputs['buffer'],
+                                          time_limit=time_limit if time_limit is not None else 10.0,
+                                          cancel_event=cancel_event, initial_order=self.initial_order,
+                                          fixed_position=inputs['fixed_position'])
+        if self.result is None:
+            return {'status': 'INFEASIBLE', 'objective': None, 'bound': None, 'gap': None, 'runtime': 0.0}
+        return {
+            'status': 'INTERRUPTED' if cancel_event.is_set() else 'HEURISTIC',
+            'objective': self.result['objective'],
+            'bound': None,
+            'gap': None,
+            'runtime': self.result['runtime'],
+        }
+
+    def extract_solution(self):
+        if self.result is None:
+            return None
+        return self.result['start'], self.result['position']
+
+
+BACKENDS = {backend.name: backend for backend in (GurobiBackend, CpSatBackend, LocalSearchBackend)}
+
+_BACKEND_MODULES = {'gurobi': 'gurobipy', 'cpsat': 'ortools.sat.python.cp_model', 'local_search': 'numpy'}
+
+
+def available_backends():
+    """
+    현재 환경에서 사용 가능한 백엔드 이름 리스트. gurobi는 gurobipy를 import할 수 있어도 Env를 시작할 수
+    없으면 (라이선스 없음) 제외합니다.
+    """
+    import importlib
+
+    names = []
+    for name, module in _BACKEND_MODULES.items():
+        try:
+            importlib.import_module(module)
+        except ImportError:
+            continue
+        if name == 'gurobi' and gurobi_license() is None:
+            continue
+        names.append(name)
+    return names
+
+
+@functools.lru_cache(maxsize=None)
+def gurobi_license():
+    """
+    Gurobi 라이선스 종류 (프로세스당 한 번 확인).
+
+    Returns:
+        str: 'full', 크기 제한 라이선스 (pip gurobipy에 포함된 라이선스 등)이면 'restricted', Env를 시작할 수
+            없으면 None.
+    """
+    import gurobipy as gp
+
+    try:
+        with gp.Env(params={'OutputFlag': 0}) as env, gp.Model(env=env) as model:
+            # 크기 제한 라이선스는 변수 2000개를 넘는 모델을 풀지 않음
+            model.addVars(2001)
+            model.optimize()
+    except gp.GurobiError as e:
+        if e.errno == gp.GRB.Error.SIZE_LIMIT_EXCEEDED:
+            return 'restricted'
+        logging.warning(f"Gurobi is installed but cannot be used: {e}")
+        return None
+    return 'full'
+
+
+def get_backend(name=None):
+    """
+    이름으로 백엔드 인스턴스를 생성합니다.
+
+    name이 없으면 BAIPOT_SOLVER_BACKEND 환경 변수, 그것도 없으면 사용 가능한 백엔드 중
+    gurobi -> cpsat -> local_search 순서로 선택합니다. 크기 제한 Gurobi 라이선스로는 실제 기간의
+    문제를 풀 수 없으므로 이때 gurobi는 직접 지정한 경우에만 사용합니다.
+    """
+    return BACKENDS[backend_name(name)]()
+
+
+def backend_name(name=None):
+    """`get_backend(name)`이 생성할 백엔드의 이름"""
+    name = name or DEFAULT_BACKEND
+    if name is None:
+        names = available_backends()
+        if 'gurobi' in names and gurobi_license() == 'restricted' and len(names) > 1:
+            names.remove('gurobi')
+        name = names[0]
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown solver backend: {name}")
+    return name
+
+
+def _total_waiting(inputs, schedule):
+    return np.inf if schedule is None else float((schedule[0] - inputs['a']).sum())
+
+
+def cached_solution(inputs, backend_name, time_limit=None, mip_gap=None, cache=SOLUTION_CACHE):
+    """
+    cache에서 같은 입력을 같은 백엔드로 풀었던 결과를 찾습니다.
+
+    재사용할 수 있는 해 (`solution_cache.is_reusable()`)이면 그대로 반환하고, 아니면 그 해나 선박이 가장
+    많이 겹치는 캐시 해의 (입항 + 대기) 순서로 만든 스케줄을 초기해 후보로 반환합니다.
+
+    Returns:
+        tuple: (재사용할 ((start, position), solve_info) 또는 None, 초기해 후보 (start, position) 또는 None).
+    """
+    entry = cache.get(inputs_key(inputs, backend_name))
+    if entry is not None:
+        cached_schedule = cache.restore(entry, inputs)
+        if is_reusable(entry, time_limit, mip_gap):
+            logging.info(f"Reusing cached {backend_name} schedule ({inputs['N']} ships, {entry['solve_info']['status']}).")
+            return (cached_schedule, dict(entry['solve_info'], runtime=0.0, cached=True)), cached_schedule
+        return None, cached_schedule
+
+    # 선박 구성이 비슷한 이전 해의 (입항 + 대기) 순서로 배정
+    waiting = cache.closest(inputs, backend_name)
+    if waiting is None:
+        return None, None
+    priority = inputs['a'] + np.nan_to_num(waiting, nan=0.0)
+    candidate = first_fit_schedule(inputs['a'], inputs['s'], inputs['l'], inputs['fixed'], inputs['L'], inputs['buffer'],
+                                   order=np.argsort(priority, kind='stable'), fixed_position=inputs['fixed_position'])
+    return None, candidate
+
+
+def solve_inputs(inputs, cancel_event, backend=None, time_limit=None, mip_gap=None, warm_start=True, cache=SOLUTION_CACHE,
+                 threads=None, on_incumbent=None, candidate=None):
+    """
+    `extract_model_inputs()` 형식의 입력을 선택한 백엔드로 풉니다.
+
+    모든 백엔드에 입항 순서 first-fit 휴리스틱 스케줄을 초기해로 넘기고, 그 총 대기 시간을
+    상한으로 사용해 모델 크기를 줄입니다.
+
+    cache가 있으면 같은 입력을 같은 백엔드로 풀었던 결과를 먼저 찾습니다 (`cached_solution()`). 재사용할
+    수 있는 해이면 바로 반환하고, 아니면 캐시에서 만든 초기해 후보가 FCFS보다 좋을 때 초기해로 사용합니다.
+    작업 프로세스처럼 캐시를 호출한 쪽에서 찾는 경우에는 cache=None과 함께 그 후보를 candidate로 넘깁니다.
+
+    threads를 지정하지 않으면 풀이 동안 `THREAD_BUDGET`에서 현재 동시 작업 수에 따른 스레드 몫을 빌립니다.
+    on_incumbent는 `SolverBackend.solve()`에 그대로 전달합니다.
+
+    Returns:
+        tuple: ((start, position) 또는 None, solve_info). solve_info['cached']는 캐시 재사용 여부.
+    """
+    solver = get_backend(backend)
+    if cache is not None:
+        hit, candidate = cached_solution(inputs, solver.name, time_limit, mip_gap, cache)
+        if hit is not None:
+            return hit
+
+    initial = first_fit_schedule(inputs['a'], inputs['s'], inputs['l'], inputs['fixed'], inputs['L'], inputs['buffer'],
+                                 fixed_position=inputs['fixed_position'])
+    if warm_start and _total_waiting(inputs, candidate) < _total_waiting(inputs, initial):
+        initial = candidate
+
+    lease = THREAD_BUDGET.lease() if threads is None else nullcontext(threads)
+    with lease as threads:
+        try:
+            build_start = time.time()
+            solver.build(inputs, upper_bound=waiting_upper_bound(inputs, initial))
+            if warm_start and initial is not None:
+                solver.warm_start(inputs, *initial)
+            logging.info(f"{solver.name} model built in {time.time() - build_start:.3f} seconds "
+                         f"({inputs['N']} ships, {threads} threads).")
+
+            solve_info = dict(solver.solve(cancel_event, time_limit=time_limit, mip_gap=mip_gap, threads=threads,
+                                           on_incumbent=on_incumbent),
+                              backend=solver.name, cached=False)
+            solution = solver.extract_solution()
+        finally:
+            solver.close()
+    if cache is not None and solution is not None:
+        cache.put(inputs_key(inputs, solver.name), inputs, *solution, solve_info, time_limit=time_limit, mip_gap=mip_gap)
+    return solution, solve_info
+
+
+def solve_schedule(processed_df, cancel_event, fixed_ship_merge_keys=None, backend=None, time_limit=None, mip_gap=None,
+                   warm_start=True):
+    """
+    선택한 솔버 백엔드로 선석 배정 계획을 계산합니다.
+
+    시간 제한이나 gap으로 중단되거나 취소된 경우에도 지금까지 찾은 최선의 해가 있으면 그 해를 반환합니다.
+
+    Args:
+        processed_df (pd.DataFrame): 전처리 및 예측이 완료된 데이터프레임.
+        cancel_event (threading.Event): 최적화 중단을 위한 이벤트 객체.
+        fixed_ship_merge_keys (list, optional): 스케줄을 고정할 선박의 merge_key 리스트.
+        backend (str, optional): 'gurobi', 'cpsat', 'local_search'. `get_backend()` 참고.
+        time_limit (float, optional): 최대 풀이 시간 (초).
+        mip_gap (float, optional): 상대 gap 허용치 (local_search는 무시).
+        warm_start (bool): 휴리스틱 초기해 전달 여부.
+
+    Returns:
+        pd.DataFrame: 선석 배정 결과 (`attrs['solve_info']`에 backend 포함). 해가 없으면 None.
+    """
+    inputs = extract_model_inputs(processed_df, fixed_ship_merge_keys)
+    solution, solve_info = solve_inputs(inputs, cancel_event, backend, time_limit, mip_gap, warm_start)
+    if solution is None:
+        return None
+
+    df_solution = build_solution_df(processed_df, inputs, *solution)
+    df_solution.attrs['solve_info'] = solve_info
+    return df_solution
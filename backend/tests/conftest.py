@@ -0,0 +1,5 @@
+import os
+import sys
+
+# backend 모듈은 backend 디렉터리를 기준으로 import함 (uvicorn main:app과 같음)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,61 @@
+"""모든 사용 가능한 솔버 백엔드가 같은 입력에 대해 유효하고 비슷한 품질의 스케줄을 반환하는지 검사합니다."""
+import threading
+
+import numpy as np
+import pytest
+
+from benchmark import make_synthetic_df
+from heuristics import waiting_upper_bound
+from schedule import extract_model_inputs, validate_schedule
+from solvers import available_backends, solve_schedule
+
+BACKENDS = available_backends()
+EXACT_BACKENDS = ('gurobi', 'cpsat')
+TIME_LIMIT = 20
+
+
+@pytest.fixture(scope='module', params=[False, True], ids=['free', 'first-fixed'])
+def instance(request):
+    """대기가 생기도록 이틀에 8척을 배정하는 합성 인스턴스 (첫 선박 고정 여부)"""
+    df = make_synthetic_df(8, days=2, seed=1)
+    fixed_keys = [extract_model_inputs(df)['merge_keys'][0]] if request.param else None
+    return df, fixed_keys, extract_model_inputs(df, fixed_keys)
+
+
+@pytest.fixture(scope='module')
+def results(instance):
+    df, fixed_keys, _ = instance
+    return {backend: solve_schedule(df, threading.Event(), fixed_keys, backend=backend, time_limit=TIME_LIMIT)
+            for backend in BACKENDS}
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_schedule_is_valid(instance, results, backend):
+    _, _, inputs = instance
+    result = results[backend]
+    assert result is not None
+
+    start = result['Start_h'].to_numpy() * 60
+    assert validate_schedule(inputs, start, result['Position_m'].to_numpy()) == []
+    info = result.attrs['solve_info']
+    assert info['backend'] == backend
+    assert info['objective'] == pytest.approx(float((start - inputs['a']).sum()), rel=1e-3, abs=1e-3)
+
+
+def test_objectives_are_comparable(instance, results):
+    _, _, inputs = instance
+    objectives = {backend: result.attrs['solve_info']['objective'] for backend, result in results.items()}
+    for backend, objective in objectives.items():
+        assert objective <= waiting_upper_bound(inputs) + 1e-6, backend
+
+    optimal = {backend: objectives[backend] for backend in EXACT_BACKENDS
+               if backend in results and results[backend].attrs['solve_info']['status'] == 'OPTIMAL'}
+    if not optimal:
+        pytest.skip("no exact backend proved optimality")
+    best = min(optimal.values())
+    # CP-SAT은 분 / m 단위로 올림한 모델의 최적해이므로 선박당 수 분까지 차이 허용
+    tolerance = 2.0 * inputs['N'] + 1e-6
+    for backend, objective in optimal.items():
+        assert objective == pytest.approx(best, abs=tolerance), backend
+    for backend, objective in objectives.items():
+        assert objective >= best - tolerance, backend
@@ -0,0 +1,45 @@
+"""build_milp_model()의 정식화 (full / compact)와 쌍 전처리 여부에 관계없이 최적값이 같은지 검사합니다."""
+import pytest
+
+from benchmark import FORMULATION_CONFIGS, load_archived_instances, make_synthetic_df
+from schedule import extract_model_inputs
+from solvers import available_backends, gurobi_license
+
+gp = pytest.importorskip('gurobipy')
+pytestmark = pytest.mark.skipif('gurobi' not in available_backends(), reason="no usable Gurobi license")
+
+
+def _optimal_objectives(inputs):
+    from optimization import build_milp_model
+
+    objectives = {}
+    for formulation, preprocess in FORMULATION_CONFIGS:
+        model, _ = build_milp_model(inputs, formulation=formulation, preprocess=preprocess)
+        try:
+            model.Params.OutputFlag = 0
+            model.optimize()
+            assert model.status == gp.GRB.OPTIMAL, (formulation, preprocess)
+            objectives[(formulation, preprocess)] = model.ObjVal
+        finally:
+            model.dispose()
+    return objectives
+
+
+def _assert_same_optimum(objectives):
+    reference = objectives[('full', False)]
+    for config, objective in objectives.items():
+        assert objective == pytest.approx(reference, rel=1e-6, abs=1e-4), config
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+@pytest.mark.parametrize('fixed', [False, True], ids=['free', 'first-fixed'])
+def test_synthetic_formulations_agree(seed, fixed):
+    df = make_synthetic_df(10, days=2, seed=seed)
+    fixed_keys = [extract_model_inputs(df)['merge_keys'][0]] if fixed else None
+    _assert_same_optimum(_optimal_objectives(extract_model_inputs(df, fixed_keys)))
+
+
+@pytest.mark.skipif(gurobi_license() != 'full', reason="full formulations of daily instances exceed a size-limited license")
+@pytest.mark.parametrize('name', sorted(load_archived_instances()))
+def test_archived_formulations_agree(name):
+    _assert_same_optimum(_optimal_objectives(extract_model_inputs(load_archived_instances()[name])))
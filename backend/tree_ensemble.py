@@ -0,0 +1,324 @@
+"""
+LightGBM 트리 앙상블의 NumPy 추론 엔진
+
+`export_model()`로 학습된 LightGBM 모델 (lgbm_weight.pkl)을 배열 기반 .npz 파일로 내보내면,
+`TreeEnsemble.load()`와 `predict()`는 lightgbm을 import하지 않고 같은 예측값을 계산합니다.
+
+사용법:
+    python tree_ensemble.py lgbm_weight.pkl        # lgbm_weight.npz 생성
+"""
+import argparse
+import hashlib
+import json
+import os
+import pickle
+
+import numpy as np
+
+# LightGBM의 결측 처리 방식 (decision_type의 2~3번 비트)과 0으로 보는 값의 범위 (kZeroThreshold, float)
+_CATEGORICAL_MASK = 1
+_DEFAULT_LEFT_MASK = 2
+MISSING_NONE, MISSING_ZERO, MISSING_NAN = 0, 1, 2
+ZERO_THRESHOLD = float(np.float32(1e-35))
+
+# 원시 점수를 그대로 출력하는 목적 함수와 exp를 취하는 목적 함수
+_IDENTITY_OBJECTIVES = ('regression', 'regression_l1', 'huber', 'fair', 'quantile', 'mape')
+_EXP_OBJECTIVES = ('poisson', 'gamma', 'tweedie')
+
+
+def _parse_model_string(model_str):
+    """LightGBM 텍스트 모델을 (헤더 {키: 값}, 트리별 {키: 값} 목록)으로 나눕니다."""
+    header, trees, current = {}, [], None
+    for line in model_str.splitlines():
+        if line.startswith('Tree='):
+            current = {}
+            trees.append(current)
+        elif line.startswith('end of trees'):
+            break
+        elif '=' in line:
+            key, value = line.split('=', 1)
+            (header if current is None else current)[key] = value
+    return header, trees
+
+
+def _values(tree, key, dtype):
+    return np.array(tree[key].split(), dtype=dtype) if tree.get(key) else np.empty(0, dtype=dtype)
+
+
+class TreeEnsemble:
+    """
+    배열로 표현한 LightGBM 회귀 트리 앙상블.
+
+    모든 트리의 내부 노드를 하나의 배열로 이어 붙입니다 (feature, threshold, is_categorical,
+    default_left, missing_type, left, right, cat_index). 자식이 음수 c이면 ~c번 리프 (leaf_value의 인덱스)입니다. 범주형 분할은 cat_mask의
+    cat_index번 행에 왼쪽으로 가는 범주가 True로 표시됩니다.
+
+    `predict()`는 모든 행과 트리를 한 번에 한 단계씩 내려가며 (가장 깊은 트리의 깊이만큼 반복) 리프를 찾고,
+    LightGBM과 같은 순서로 (트리 순서대로) 리프 값을 더해 같은 결과를 냅니다.
+    """
+
+    # 한 번에 계산하는 (행 x 트리) 원소 수
+    CHUNK_ELEMENTS = 1 << 16
+
+    def __init__(self, arrays, meta):
+        self.arrays = arrays
+        self.meta = meta
+        self.feature_names = meta['feature_names']
+        self.pandas_categorical = meta['pandas_categorical']
+        self.source_version = meta.get('source_version')
+        for name, value in arrays.items():
+            setattr(self, name, value)
+        self._compile()
+
+    @classmethod
+    def from_lightgbm(cls, model, source_version=None):
+        """
+        LightGBM 모델 (`lightgbm.LGBMModel` 또는 `lightgbm.Booster`)을 변환합니다.
+
+        Raises:
+            ValueError: 다중 클래스, 선형 트리, 지원하지 않는 목적 함수의 모델인 경우.
+        """
+        booster = getattr(model, 'booster_', model)
+        header, trees = _parse_model_string(booster.model_to_string())
+        if int(header.get('num_tree_per_iteration', 1)) != 1:
+            raise ValueError("Only single-output models can be exported.")
+        objective = header.get('objective', 'regression').split()[0]
+        if objective not in _IDENTITY_OBJECTIVES + _EXP_OBJECTIVES:
+            raise ValueError(f"Objective {objective!r} is not supported.")
+        # predict()와 같이 best_iteration이 있으면 그 트리까지만 사용
+        if booster.best_iteration > 0:
+            trees = trees[:booster.best_iteration]
+
+        features, thresholds, decisions, lefts, rights, cat_indices = [], [], [], [], [], []
+        roots, leaf_values, cat_rows = [], [], []
+        node_offset = leaf_offset = 0
+        for tree in trees:
+            if tree.get('is_linear', '0') != '0':
+                raise ValueError("Linear trees are not supported.")
+            values = _values(tree, 'leaf_value', np.float64)
+            num_leaves = int(tree['num_leaves'])
+            if num_leaves == 1:
+                roots.append(~leaf_offset)
+            else:
+                roots.append(node_offset)
+                left, right = _values(tree, 'left_child', np.int64), _values(tree, 'right_child', np.int64)
+                decision = _values(tree, 'decision_type', np.int64)
+                threshold = _values(tree, 'threshold', np.float64)
+                features.append(_values(tree, 'split_feature', np.int64))
+                thresholds.append(threshold)
+                decisions.append(decision)
+                lefts.append(np.where(left >= 0, left + node_offset, ~(~left + leaf_offset)))
+                rights.append(np.where(right >= 0, right + node_offset, ~(~right + leaf_offset)))
+
+                cat_index = np.full(len(decision), -1)
+                if int(tree.get('num_cat', 0)) > 0:
+                    boundaries = _values(tree, 'cat_boundaries', np.int64)
+                    words = _values(tree, 'cat_threshold', np.uint32)
+                    for node in np.flatnonzero(decision & _CATEGORICAL_MASK):
+                        k = int(threshold[node])
+                        bits = np.unpackbits(words[boundaries[k]:boundaries[k + 1]].astype('<u4').view(np.uint8),
+                                             bitorder='little')
+                        cat_index[node] = len(cat_rows)
+                        cat_rows.append(bits.astype(bool))
+                cat_indices.append(cat_index)
+                node_offset += num_leaves - 1
+            leaf_values.append(values)
+            leaf_offset += num_leaves
+
+        width = max((len(row) for row in cat_rows), default=1)
+        cat_mask = np.zeros((max(len(cat_rows), 1), width), dtype=bool)
+        for k, row in enumerate(cat_rows):
+            cat_mask[k, :len(row)] = row
+
+        def concat(parts, dtype):
+            return np.concatenate(parts).astype(dtype) if parts else np.empty(0, dtype=dtype)
+
+        decision = concat(decisions, np.int64)
+        arrays = {
+            'roots': np.array(roots, dtype=np.int32),
+            'feature': concat(features, np.int32),
+            'threshold': concat(thresholds, np.float64),
+            'is_categorical': (decision & _CATEGORICAL_MASK).astype(bool),
+            'default_left': (decision & _DEFAULT_LEFT_MASK).astype(bool),
+            'missing_type': ((decision >> 2) & 3).astype(np.uint8),
+            'left': concat(lefts, np.int32),
+            'right': concat(rights, np.int32),
+            'cat_index': concat(cat_indices, np.int32),
+            'cat_mask': cat_mask,
+            'leaf_value': concat(leaf_values, np.float64),
+        }
+        meta = {
+            'feature_names': header['feature_names'].split(),
+            'objective': objective,
+            'average_output': 'average_output' in header,
+            'pandas_categorical': booster.pandas_categorical or [],
+            'source_version': source_version,
+        }
+        return cls(arrays, meta)
+
+    def save(self, path):
+        """배열과 메타데이터를 .npz 파일로 저장합니다 (pickle 없이 읽을 수 있음)."""
+        np.savez_compressed(path, meta=np.array(json.dumps(self.meta, ensure_ascii=False)), **self.arrays)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data['meta']))
+            arrays = {name: data[name] for name in data.files if name != 'meta'}
+        return cls(arrays, meta)
+
+    def predict(self, X):
+        """
+        예측값. X가 DataFrame이면 LightGBM과 같이 category 열을 학습 시의 범주 순서 (pandas_categorical)의
+        코드로 바꾸고 (없는 범주는 NaN), 열 dtype으로 정한 정밀도 (float32 / float64)로 변환합니다.
+
+        Returns:
+            np.ndarray: 행별 예측값 (float64).
+        """
+        X = self._to_matrix(X)
+        # LightGBM은 |x| <= kZeroThreshold인 값을 0으로 읽음
+        X = np.where(np.abs(X) <= ZERO_THRESHOLD, 0.0, X)
+        # 결측 처리 방식이 None인 분할만 있는 수치형 변수의 NaN은 0과 같음
+        X[:, self._nan_as_zero] = np.nan_to_num(X[:, self._nan_as_zero], nan=0.0, posinf=np.inf, neginf=-np.inf)
+        if len(X) == 0:
+            return np.empty(0)
+
+        # 행 묶음 (chunk_size행 x 트리 수)별로 계산해 중간 배열이 CPU 캐시에 들어가도록 함
+        chunk_size = max(1, self.CHUNK_ELEMENTS // len(self.roots))
+        raw = np.concatenate([self._raw_scores(X[i:i + chunk_size]) for i in range(0, len(X), chunk_size)])
+        if self.meta['average_output']:
+            raw = raw / len(self.roots)
+        if self.meta['objective'] in _EXP_OBJECTIVES:
+            return np.exp(raw)
+        return raw
+
+    def _raw_scores(self, X):
+        """X (2차원 float64 배열)의 행별 원시 점수 (리프 값의 합)"""
+        n_rows, n_trees = len(X), len(self.roots)
+        values = X.ravel()
+        # 인덱스는 intp (int32 인덱스는 gather마다 변환됨)
+        row_offset = np.repeat(np.arange(n_rows, dtype=np.intp) * X.shape[1], n_trees)
+        node = np.tile(self._roots, n_rows)
+        for _ in range(self._depth):
+            value = np.take(values, row_offset + np.take(self._feature, node))
+            threshold = np.take(self._threshold, node)
+            go_left = value <= threshold
+            if self._has_missing_rules:
+                special = np.flatnonzero((value == 0) | np.isnan(value))
+                if len(special):
+                    index = node[special]
+                    go_left[special] = np.where(np.isnan(value[special]), self._nan_left[index], self._zero_left[index])
+            if self._has_categorical:
+                # 범주형 분할 노드의 threshold는 NaN
+                categorical = np.flatnonzero(np.isnan(threshold))
+                if len(categorical):
+                    go_left[categorical] = self._categorical_left(node[categorical], value[categorical])
+            node = np.take(self._children, 2 * node + 1 - go_left)
+
+        # LightGBM과 같은 순서로 (트리 0부터 차례로) 더함
+        leaves = np.take(self.leaf_value, node - len(self.feature)).reshape(n_rows, n_trees)
+        return np.cumsum(leaves, axis=1)[:, -1]
+
+    def _categorical_left(self, index, value):
+        """범주형 분할 (LightGBM의 CategoricalDecision): NaN 또는 음수 (정수로 자른 값)는 오른쪽, 아니면 범주가 집합에 있으면 왼쪽"""
+        category = np.trunc(value)
+        valid = (category >= 0) & (category < self.cat_mask.shape[1])
+        go_left = np.zeros(len(index), dtype=bool)
+        go_left[valid] = self.cat_mask[self._cat_row[index[valid]], category[valid].astype(np.int64)]
+        return go_left
+
+    def _compile(self):
+        """
+        predict()에서 사용하는 노드 표. 리프도 노드 (내부 노드 뒤, 자식이 자기 자신)로 만들어 모든 행과
+        트리를 가장 깊은 트리의 깊이만큼 같은 연산으로 내려갑니다. 값이 NaN 또는 0일 때의 방향
+        (결측 처리 방식과 기본 방향으로 정해짐)은 노드별로 미리 계산하고, 결측 처리 방식이 None인 분할만
+        있는 수치형 변수는 NaN을 미리 0으로 바꿔 일반 비교로 처리합니다.
+        """
+        n_internal, n_leaves = len(self.feature), len(self.leaf_value)
+        leaf_node = lambda child: np.where(child >= 0, child, n_internal + ~child)
+        zero_left = np.where(self.missing_type == MISSING_ZERO, self.default_left, 0.0 <= self.threshold)
+        nan_left = np.where(self.missing_type == MISSING_NONE, 0.0 <= self.threshold, self.default_left)
+        leaf_pad = np.zeros(n_leaves, dtype=bool)
+
+        self._feature = np.concatenate([self.feature, np.zeros(n_leaves, dtype=np.int32)]).astype(np.intp)
+        self._threshold = np.concatenate([np.where(self.is_categorical, np.nan, self.threshold), np.zeros(n_leaves)])
+        self._zero_left = np.concatenate([zero_left & ~self.is_categorical, leaf_pad])
+        self._nan_left = np.concatenate([nan_left & ~self.is_categorical, leaf_pad])
+        self._cat_row = np.concatenate([np.where(self.is_categorical, self.cat_index, -1),
+                                        np.full(n_leaves, -1)]).astype(np.intp)
+        self._has_categorical = bool(self.is_categorical.any())
+        numerical = ~self.is_categorical
+        self._has_missing_rules = bool((numerical & (self.missing_type != MISSING_NONE)).any())
+        keep_nan = set(self.feature[self.is_categorical | (self.missing_type != MISSING_NONE)].tolist())
+        self._nan_as_zero = [f for f in range(len(self.feature_names)) if f not in keep_nan]
+        leaves = np.arange(n_internal, n_internal + n_leaves)
+        self._children = np.stack([np.concatenate([leaf_node(self.left), leaves]),
+                                   np.concatenate([leaf_node(self.right), leaves])], axis=1).ravel().astype(np.intp)
+        self._roots = leaf_node(self.roots).astype(np.intp)
+
+        depth, frontier = 0, self._roots[self._roots < n_internal]
+        while len(frontier):
+            depth += 1
+            frontier = np.concatenate([self._children[2 * frontier], self._children[2 * frontier + 1]])
+            frontier = frontier[frontier < n_internal]
+        self._depth = depth
+
+    def _to_matrix(self, X):
+        try:
+            import pandas as pd
+        except ImportError:
+            pd = None
+        if pd is None or not isinstance(X, pd.DataFrame):
+            return np.asarray(X, dtype=np.float64)
+
+        data = X.copy(deep=False)
+        cat_cols = [col for col, dtype in zip(data.columns, data.dtypes) if isinstance(dtype, pd.CategoricalDtype)]
+        if len(cat_cols) != len(self.pandas_categorical):
+            raise ValueError("The categorical columns do not match the model.")
+        for col, categories in zip(cat_cols, self.pandas_categorical):
+            if list(data[col].cat.categories) != list(categories):
+                data[col] = data[col].cat.set_categories(categories)
+        if cat_cols:
+            data[cat_cols] = data[cat_cols].apply(lambda x: x.cat.codes).replace({-1: np.nan})
+        target_dtype = np.result_type(*[dtype.type for dtype in data.dtypes], np.float32)
+        return data.to_numpy(dtype=target_dtype).astype(np.float64)
+
+
+def model_version(data):
+    """모델 파일 내용 (bytes)의 version (sha256 앞 12자리, `model_registry`와 같음)"""
+    return hashlib.sha256(data).hexdigest()[:12]
+
+
+def compiled_path(model_path):
+    """pickle 모델 파일에 대응하는 .npz 파일 경로"""
+    return os.path.splitext(model_path)[0] + '.npz'
+
+
+def export_model(model_path, output_path=None):
+    """
+    pickle된 LightGBM 모델을 .npz로 내보냅니다. 원본 파일의 version을 함께 저장하여 원본이 바뀌면
+    `model_registry`가 오래된 .npz를 사용하지 않도록 합니다.
+
+    Returns:
+        TreeEnsemble: 내보낸 앙상블.
+    """
+    with open(model_path, 'rb') as f:
+        data = f.read()
+    ensemble = TreeEnsemble.from_lightgbm(pickle.loads(data), source_version=model_version(data))
+    ensemble.save(output_path or compiled_path(model_path))
+    return ensemble
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export a pickled LightGBM model to a NumPy tree ensemble")
+    parser.add_argument('model_path')
+    parser.add_argument('output_path', nargs='?', default=None)
+    args = parser.parse_args()
+
+    ensemble = export_model(args.model_path, args.output_path)
+    print(f"{len(ensemble.roots)} trees, {len(ensemble.feature)} splits, {len(ensemble.leaf_value)} leaves "
+          f"-> {args.output_path or compiled_path(args.model_path)} (source {ensemble.source_version})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+import logging
+import os
+import re
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 선박 제원 (호출부호, 선사, 선명, 총톤수, LOA) 파일과 파일 변경을 확인하는 최소 간격 (초)
+SHIP_INFO_PATH = os.environ.get('BAIPOT_SHIP_INFO_PATH', os.path.join(BACKEND_DIR, 'ship_info.csv'))
+SHIP_INFO_CHECK_INTERVAL = float(os.environ.get('BAIPOT_SHIP_INFO_CHECK_INTERVAL', 5))
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def merge_key(company, name):
+    """선사와 선명으로 만든 선박 키 (선명의 공백 제거). 선명이 없으면 None."""
+    if not isinstance(name, str):
+        return None
+    return f"{company}_{_WHITESPACE.sub('', name)}"
+
+
+class VesselRegistry:
+    """
+    메모리에 상주하는 선박 제원 색인.
+
+    ship_info.csv를 한 번 읽어 merge_key (선사_공백 없는 선명)와 호출부호로 총톤수 / LOA를 찾는
+    딕셔너리를 만들어 둡니다. 같은 키가 여러 번 있으면 파일에서 먼저 나온 행을 사용합니다.
+    check_interval초마다 파일의 mtime과 크기를 확인해 바뀌었으면 색인을 새로 만들어 통째로 바꿉니다.
+    새 파일을 읽지 못하면 이전 색인을 계속 사용합니다.
+    """
+
+    def __init__(self, path=SHIP_INFO_PATH, check_interval=SHIP_INFO_CHECK_INTERVAL):
+        self.path = path
+        self.check_interval = check_interval
+        self._index = None
+        self._stat = None
+        self._checked = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        """
+        현재 색인 ({'by_key', 'by_call_sign', 'records', 'loaded_at'}). check_interval이 지났으면 파일
+        변경을 확인합니다.
+
+        Raises:
+            FileNotFoundError: 파일이 없고 불러온 색인도 없는 경우.
+        """
+        now = time.monotonic()
+        if self._index is None or now - self._checked >= self.check_interval:
+            with self._lock:
+                if self._index is None or now - self._checked >= self.check_interval:
+                    self._checked = now
+                    self._refresh()
+        return self._index
+
+    def lookup(self, company, name):
+        """선사, 선명에 해당하는 (총톤수, LOA). 없으면 None."""
+        return self.get()['by_key'].get(merge_key(company, name))
+
+    def lookup_call_sign(self, call_sign):
+        """호출부호에 해당하는 선박 레코드 (ship_info.csv의 한 행). 없으면 None."""
+        return self.get()['by_call_sign'].get(str(call_sign).strip().upper())
+
+    def enrich(self, companies, names):
+        """
+        여러 선박의 총톤수와 LOA.
+
+        Args:
+            companies, names: 같은 길이의 선사, 선명 목록 (Series 등).
+
+        Returns:
+            tuple: (총톤수, LOA) float 배열. 제원이 없는 선박은 NaN.
+        """
+        by_key = self.get()['by_key']
+        found = [by_key.get(merge_key(company, name), (np.nan, np.nan)) for company, name in zip(companies, names)]
+        if not found:
+            return np.empty(0), np.empty(0)
+        values = np.array(found, dtype=float)
+        return values[:, 0], values[:, 1]
+
+    def records(self):
+        """ship_info.csv의 모든 행 (JSON으로 보낼 수 있도록 NaN은 None)"""
+        return self.get()['records']
+
+    def _refresh(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            if self._index is None:
+                raise
+            logging.warning(f"Ship info file {self.path} disappeared; keeping the loaded vessel registry.")
+            return
+        key = (stat.st_mtime_ns, stat.st_size)
+        if key == self._stat:
+            return
+        try:
+            index = self._build(pd.read_csv(self.path, encoding='utf-8-sig'))
+        except Exception as e:
+            if self._index is None:
+                raise
+            logging.warning(f"Could not reload ship info {self.path} ({e}); keeping the loaded vessel registry.")
+            self._stat = key
+            return
+        if self._index is not None:
+            logging.info(f"Reloaded ship info {self.path}: {len(index['by_key'])} vessels.")
+        self._stat = key
+        self._index = index
+
+    @staticmethod
+    def _build(ship_info_df):
+        records = ship_info_df.astype(object).where(ship_info_df.notna(), None).to_dict('records')
+        by_key, by_call_sign = {}, {}
+        for record in records:
+            key = merge_key(record['선사'], record['선명'])
+            if key is not None and key not in by_key:
+                by_key[key] = (record['총톤수'], record['LOA'])
+            call_sign = record.get('호출부호')
+            if call_sign is not None:
+                by_call_sign.setdefault(str(call_sign).strip().upper(), record)
+        return {'by_key': by_key, 'by_call_sign': by_call_sign, 'records': records, 'loaded_at': time.time()}
+
+
+VESSEL_REGISTRY = VesselRegistry()
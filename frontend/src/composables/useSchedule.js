@@ -11,6 +11,8 @@ export function useSchedule() {
   const error = ref(null);
   const viewMode = ref('list'); // 'list' or 'chart'
   const abortController = ref(null);
+  const currentJob = ref(null); // { id, events } of the running optimization job
+  const dataset = ref(null); // { id, startDate, endDate } of the data returned by /schedule/prepare
   const etdAbortController = ref(null);
 
   // Ship data for ETD calculator
@@ -25,7 +27,9 @@ export function useSchedule() {
     ship_length: 0,
     shipping_company: '',
     gross_tonnage: 0,
-    shift: 0
+    shift: 0,
+    // false: insert into the cached schedule of the window (the server re-optimizes when the ship would wait long)
+    reoptimize: false
   };
   const etdRequestData = ref({ ...initialEtdRequestData });
   const etdResult = ref(null);
@@ -44,6 +48,64 @@ export function useSchedule() {
     if (abortController.value) {
       abortController.value.abort();
     }
+    if (currentJob.value) {
+      api.delete(`/jobs/${currentJob.value.id}`).catch(() => {});
+    }
+  };
+
+  const enrichOptimizedShips = (optimizedShips) => {
+    const originalDataMap = new Map(results.value.map(ship => [ship.merge_key, ship]));
+
+    return optimizedShips.map(optimizedShip => {
+      const originalShip = originalDataMap.get(optimizedShip.merge_key);
+      if (originalShip) {
+        return {
+          ...optimizedShip,
+          original_Completion_h: originalShip.Completion_h,
+          predicted_work_time: originalShip.predicted_work_time,
+        };
+      }
+      return optimizedShip;
+    });
+  };
+
+  // Starts an optimization job and renders every improved schedule streamed by the server until the final one arrives.
+  const runOptimizationJob = async (endpoint, payload, signal) => {
+    const { data: job } = await api.post(`/jobs${endpoint.replace('/schedule', '')}`, payload, { signal });
+    if (signal.aborted) {
+      // Canceled after the server created the job but before cancelRequest could see its id
+      api.delete(`/jobs/${job.job_id}`).catch(() => {});
+      throw new axios.CanceledError('Job was canceled.');
+    }
+    const events = new EventSource(`${api.defaults.baseURL.trim()}/jobs/${job.job_id}/events`);
+    currentJob.value = { id: job.job_id, events };
+
+    try {
+      return await new Promise((resolve, reject) => {
+        events.addEventListener('incumbent', (event) => {
+          optimizationResults.value = enrichOptimizedShips(JSON.parse(event.data).schedule);
+          viewMode.value = 'chart';
+        });
+        events.addEventListener('result', (event) => {
+          const finished = JSON.parse(event.data);
+          if (finished.result) {
+            resolve(finished.result);
+          } else if (finished.status === 'cancelled') {
+            reject(new axios.CanceledError('Job was canceled.'));
+          } else {
+            reject(new Error(finished.error?.detail || `Job ${finished.status}.`));
+          }
+        });
+        events.onerror = () => {
+          if (events.readyState === EventSource.CLOSED) {
+            reject(new Error('Lost connection to the optimization job.'));
+          }
+        };
+      });
+    } finally {
+      events.close();
+      currentJob.value = null;
+    }
   };
 
   const cancelEtdRequest = () => {
@@ -67,9 +129,14 @@ export function useSchedule() {
         end_date: endDate.value,
         ...data,
       };
-      const response = await api.post(endpoint, payload, { signal: abortController.value.signal });
-
+      // Let the server reuse the prepared data instead of crawling the same dates again
+      if (endpoint !== '/schedule/prepare' && dataset.value
+          && dataset.value.startDate === payload.start_date && dataset.value.endDate === payload.end_date) {
+        payload.dataset_id = dataset.value.id;
+      }
       if (endpoint === '/schedule/prepare') {
+        const response = await api.post(endpoint, payload, { signal: abortController.value.signal });
+        dataset.value = { id: response.headers['x-dataset-id'], startDate: payload.start_date, endDate: payload.end_date };
         results.value = response.data.map(item => ({
           ...item,
           selected: false,
@@ -78,21 +145,7 @@ export function useSchedule() {
         optimizationResults.value = null; // Clear old optimization results
         viewMode.value = 'list';
       } else {
-        const originalDataMap = new Map(results.value.map(ship => [ship.merge_key, ship]));
-
-        const enrichedResults = response.data.map(optimizedShip => {
-          const originalShip = originalDataMap.get(optimizedShip.merge_key);
-          if (originalShip) {
-            return {
-              ...optimizedShip,
-              original_Completion_h: originalShip.Completion_h,
-              predicted_work_time: originalShip.predicted_work_time,
-            };
-          }
-          return optimizedShip;
-        });
-
-        optimizationResults.value = enrichedResults;
+        optimizationResults.value = enrichOptimizedShips(await runOptimizationJob(endpoint, payload, abortController.value.signal));
         viewMode.value = 'chart';
       }
 
@@ -1,8 +1,15 @@
 import requests
 from bs4 import BeautifulSoup
 from datetime import datetime, timedelta
+import atexit
 import json
+import os
 import re
+import hashlib
+import tempfile
+import time
+from collections import OrderedDict
+import numpy as np
 import pandas as pd
 import pickle
 import gurobipy as gp
@@ -395,6 +402,114 @@ def preprocess_for_prediction(df):
             
     return df
 
+# 이 파일 옆의 lgbm_weight.pkl (실행 위치와 무관)과 로드한 모델 {'mtime': ..., 'model': ..., 'version': ...}
+LGBM_MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'lgbm_weight.pkl')
+_lgbm_model = {}
+
+
+def load_lgbm_model(path=LGBM_MODEL_PATH):
+    """
+    LGBM 모델을 로드합니다. 같은 파일을 다시 unpickle하지 않도록 프로세스 안에서 재사용하며,
+    파일의 수정 시각이 바뀌면 다시 로드합니다. 모델 version (파일 sha256의 앞 12자리)은
+    `_lgbm_model['version']`에 저장됩니다.
+    """
+    mtime = os.path.getmtime(path)
+    if _lgbm_model.get('path') != path or _lgbm_model.get('mtime') != mtime:
+        with open(path, 'rb') as f:
+            data = f.read()
+        _lgbm_model.update(path=path, mtime=mtime, model=pickle.loads(data),
+                           version=hashlib.sha256(data).hexdigest()[:12])
+    return _lgbm_model['model']
+
+
+# 실행 사이에 유지하는 예측값 캐시 파일, 최대 항목 수와 파일에 저장하는 최소 간격 (초):
+# (모델 version, 피처 dtype, 피처 값) -> 예측값
+PREDICTION_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'prediction_cache.json')
+PREDICTION_CACHE_SIZE = 50000
+PREDICTION_CACHE_SAVE_INTERVAL = 60
+_prediction_cache = {'path': None, 'entries': OrderedDict(), 'dirty': False, 'saved': time.monotonic()}
+
+
+def _load_prediction_cache(path=PREDICTION_CACHE_PATH):
+    """예측값 캐시를 파일에서 한 번 읽어 옵니다 (파일이 없거나 읽을 수 없으면 빈 캐시)."""
+    if _prediction_cache['path'] != path:
+        _save_prediction_cache()
+        entries = OrderedDict()
+        try:
+            with open(path, encoding='utf-8') as f:
+                for version, schema, row, value in json.load(f)['entries'][-PREDICTION_CACHE_SIZE:]:
+                    entries[(version, schema, tuple(row))] = value
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Ignoring unreadable prediction cache {path}: {e}")
+        _prediction_cache.update(path=path, entries=entries, dirty=False)
+    return _prediction_cache['entries']
+
+
+@atexit.register
+def _save_prediction_cache():
+    """
+    바뀐 예측값 캐시를 임시 파일에 쓴 뒤 이름을 바꾸어 저장합니다. 파일에 쓰지 못하면 경고만 출력하고
+    다음 저장 때 다시 시도합니다. 프로그램이 끝날 때도 호출됩니다.
+    """
+    path = _prediction_cache['path']
+    if path is None or not _prediction_cache['dirty']:
+        return
+    entries = [[version, schema, list(row), value] for (version, schema, row), value in _prediction_cache['entries'].items()]
+    _prediction_cache['saved'] = time.monotonic()
+    tmp_path = None
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.json.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({'entries': entries}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        _prediction_cache['dirty'] = False
+    except OSError as e:
+        print(f"Could not write prediction cache {path}: {e}")
+        if tmp_path is not None:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+
+def predict_with_cache(model, version, X_predict, path=PREDICTION_CACHE_PATH):
+    """
+    같은 모델 version으로 같은 피처를 예측한 적이 있는 행은 캐시된 예측값을 사용하고, 나머지 행만
+    모델로 한 번에 예측합니다. 새로 예측한 값은 PREDICTION_CACHE_SAVE_INTERVAL초에 한 번, 그리고
+    프로그램이 끝날 때 캐시 파일에 저장되어 다음 실행에서도 사용됩니다.
+
+    같은 항차는 매일의 크롤링 결과에 최대 10일 동안 반복해서 나오고 대부분은 피처가 바뀌지 않으므로
+    호출일마다 다시 예측할 필요가 없습니다. LightGBM은 열 dtype에 따라 입력 정밀도를 정하므로 열
+    이름과 dtype도 키에 포함합니다.
+
+    Returns:
+        np.ndarray: 행별 예측값.
+    """
+    entries = _load_prediction_cache(path)
+    schema = ','.join(f"{column}:{dtype}" for column, dtype in X_predict.dtypes.items())
+    columns = [[None if value is None or value != value else value for value in X_predict[column].tolist()]
+               for column in X_predict.columns]
+    keys = [(version, schema, row) for row in zip(*columns)]
+
+    predicted = np.array([entries.get(key, np.nan) for key in keys], dtype=float)
+    missing = [i for i, key in enumerate(keys) if key not in entries]
+    for key in keys:
+        if key in entries:
+            entries.move_to_end(key)
+    if missing:
+        predicted[missing] = model.predict(X_predict.iloc[missing])
+        for i in missing:
+            entries[keys[i]] = float(predicted[i])
+        while len(entries) > PREDICTION_CACHE_SIZE:
+            entries.popitem(last=False)
+        _prediction_cache['dirty'] = True
+        if time.monotonic() - _prediction_cache['saved'] >= PREDICTION_CACHE_SAVE_INTERVAL:
+            _save_prediction_cache()
+    return predicted
+
+
 def predict_work_time(crawled_df):
     """
     크롤링된 데이터프레임을 받아 전처리 후, 작업소요시간을 예측하여 반환
@@ -405,8 +520,9 @@ def predict_work_time(crawled_df):
        - 날짜/시간 관련 피처(입항시간, 요일, 분기, 계절)를 생성
        - '양적하물량' 등 모델에 사용될 피처를 계산
     2. 전처리된 데이터프레임(`processed_df`) 생성
-    3. `lgbm_model.pkl` 파일을 로드하여 예측 모델을 준비
+    3. `load_lgbm_model()`로 예측 모델을 준비 (프로세스당 한 번 로드, 파일이 바뀌면 다시 로드)
     4. `processed_df`에서 모델이 학습한 피처들을 선택하여 예측을 수행
+       (`predict_with_cache()`: 이전 실행을 포함해 피처가 같았던 선박은 다시 예측하지 않음)
     5. 예측 결과를 `processed_df`에 'predicted_work_time'이라는 새로운 컬럼으로 추가하여 반환
 
     Args:
@@ -417,8 +533,7 @@ def predict_work_time(crawled_df):
     """
     processed_df = preprocess_for_prediction(crawled_df)
 
-    with open('lgbm_weight.pkl', 'rb') as f:
-        lgbm_model = pickle.load(f)
+    lgbm_model = load_lgbm_model()
 
     # Features for the new model (without '선사')
     features = ['입항시간', '입항요일', '입항분기', '입항계절', '총톤수', '양적하물량', 'shift']
@@ -429,7 +544,7 @@ def predict_work_time(crawled_df):
 
     X_predict = processed_df[features]
         
-    predicted_time = lgbm_model.predict(X_predict)
+    predicted_time = predict_with_cache(lgbm_model, _lgbm_model['version'], X_predict)
     processed_df['predicted_work_time'] = predicted_time
 
     return processed_df
@@ -483,48 +598,48 @@ def run_milp_model(processed_df):
     # --- 2. Gurobi 모델 생성 ---
     model = gp.Model("BAIPOT")
 
-    # --- 3. 결정 변수 ---
-    t = model.addVars(N, vtype=GRB.CONTINUOUS, lb=0, name="start_time")
-    p = model.addVars(N, vtype=GRB.CONTINUOUS, lb=0, ub=L, name="position")
-    w = model.addVars(N, vtype=GRB.CONTINUOUS, lb=0, name="waiting_time")
-    x = model.addVars(N, N, vtype=GRB.BINARY, name="left_of")
-    y = model.addVars(N, N, vtype=GRB.BINARY, name="before")
+    # --- 3. 결정 변수 (행렬 API) ---
+    s_arr, a_arr, l_arr = np.array(s_i, dtype=float), np.array(a_i_minutes, dtype=float), np.array(l_i, dtype=float)
+    t = model.addMVar(N, vtype=GRB.CONTINUOUS, lb=0, name="start_time")
+    p = model.addMVar(N, vtype=GRB.CONTINUOUS, lb=0, ub=L, name="position")
+    w = model.addMVar(N, vtype=GRB.CONTINUOUS, lb=0, name="waiting_time")
+    x = model.addMVar((N, N), vtype=GRB.BINARY, name="left_of")
+    y = model.addMVar((N, N), vtype=GRB.BINARY, name="before")
 
     # --- 4. 목적 함수 ---
-    model.setObjective(gp.quicksum(w[i] for i in range(N)), GRB.MINIMIZE)
+    model.setObjective(w.sum(), GRB.MINIMIZE)
 
     # --- 5. 제약 조건 ---
-    model.addConstrs((w[i] == t[i] - a_i_minutes[i] for i in range(N)), name="waiting_time")
-    model.addConstrs((t[i] >= a_i_minutes[i] for i in range(N)), name="arrival_constraints")
-    model.addConstrs((p[i] + l_i[i] <= L for i in range(N)), name="berth_length_constraints")
+    model.addConstr(w == t - a_arr, name="waiting_time")
+    model.addConstr(t >= a_arr, name="arrival_constraints")
+    model.addConstr(p + l_arr <= L, name="berth_length_constraints")
 
     M_time = sum(s_i) + max(a_i_minutes) if a_i_minutes else sum(s_i)
     M_space = 2 * L
 
-    for i in range(N):
-        for j in range(N):
-            if i != j:
-                model.addConstr(p[i] + l_i[i] <= p[j] + M_space * (1 - x[i,j]), name=f"spatial_left_{i}_{j}")
-                model.addConstr(p[j] + l_i[j] <= p[i] + M_space * (1 - x[j,i]), name=f"spatial_right_{i}_{j}")
-                model.addConstr(t[i] + s_i[i] + buffer_minutes <= t[j] + M_time * (1 - y[i,j]), name=f"temporal_before_{i}_{j}")
-                model.addConstr(t[j] + s_i[j] + buffer_minutes <= t[i] + M_time * (1 - y[j,i]), name=f"temporal_after_{i}_{j}")
+    # 순서쌍 (i, j), i != j 에 대한 공간/시간 제약을 NumPy 인덱스 배열로 일괄 추가
+    I, J = np.nonzero(~np.eye(N, dtype=bool))
+    model.addConstr(p[I] + l_arr[I] <= p[J] + M_space * (1 - x[I, J]), name="spatial_left")
+    model.addConstr(t[I] + s_arr[I] + buffer_minutes <= t[J] + M_time * (1 - y[I, J]), name="temporal_before")
 
-    model.addConstrs((x[i,j] + x[j,i] + y[i,j] + y[j,i] >= 1 for i in range(N) for j in range(i + 1, N)), name="separation_required")
+    U, V = np.triu_indices(N, k=1)
+    model.addConstr(x[U, V] + x[V, U] + y[U, V] + y[V, U] >= 1, name="separation_required")
 
     # --- 6. 모델 최적화 ---
     model.optimize()
 
     # --- 7. 결과 처리 및 시각화 ---
     if model.status == GRB.OPTIMAL:
+        t_x, w_x, p_x = t.X, w.X, p.X
         solution = []
         for i in range(N):
-            start_minutes = t[i].x
+            start_minutes = t_x[i]
             start_hours = start_minutes / 60
-            waiting_minutes = w[i].x
+            waiting_minutes = w_x[i]
             waiting_hours = waiting_minutes / 60
             completion_minutes = start_minutes + s_i[i]
             completion_hours = completion_minutes / 60
-            position_m = p[i].x
+            position_m = p_x[i]
 
             solution.append({
                 'Ship': processed_df.iloc[i]['선명'],